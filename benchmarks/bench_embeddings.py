@@ -0,0 +1,78 @@
+"""
+Benchmark: dense SVD embeddings vs the full TF-IDF similarity path
+Reports top-k overlap with the exact TF-IDF neighbors, latency per query
+and memory for several embedding sizes
+
+Usage:
+    python benchmarks/bench_embeddings.py [--k 10] [--queries 300] [--dims 128 192 256]
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+# Add parent directory to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.film_embeddings import FilmEmbeddings
+from utils.film_engine import FilmRecommendationEngine
+from utils.film_similarity import top_k
+
+
+def per_query_ms(fn, queries):
+    start = time.perf_counter()
+    results = [fn(q) for q in queries]
+    return (time.perf_counter() - start) / len(queries) * 1000, results
+
+
+def overlap(found, truth):
+    return np.mean([len(set(f) & set(t)) / len(t) for f, t in zip(found, truth)])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--queries", type=int, default=300)
+    parser.add_argument("--dims", type=int, nargs="+", default=[128, 192, 256])
+    args = parser.parse_args()
+
+    engine = FilmRecommendationEngine()
+    model = engine.similarity_model
+    tfidf = model.tfidf_matrix
+    exact_index = model.neighbor_index
+    n_films = tfidf.shape[0]
+
+    rng = np.random.default_rng(0)
+    queries = rng.choice(n_films, min(args.queries, n_films), replace=False)
+    texts = engine.df['description'].to_numpy()[queries[:50]]
+
+    # Full TF-IDF path: sparse row product against the whole matrix (no precomputed table)
+    exact_ms, truth = per_query_ms(lambda q: top_k(exact_index.similarity_row(q), args.k, exclude=q)[0], queries)
+    exact_mb = exact_index.memory_usage()['tfidf_matrix'] / 1024 ** 2
+    text_truth = [exact_index.search_query(model.vectorizer.transform([t]), args.k)[0] for t in texts]
+
+    print(f"films: {n_films:,}  k: {args.k}  queries: {len(queries)}  TF-IDF features: {tfidf.shape[1]:,}")
+    print()
+    print(f"{'path':>14} {'overlap@k':>10} {'text overlap':>13} {'ms/query':>9} {'batch ms/q':>11} {'vectors MB':>11} "
+          f"{'projection MB':>14}")
+    print(f"{'tfidf (exact)':>14} {1.0:>10.3f} {1.0:>13.3f} {exact_ms:>9.3f} {'':>11} {exact_mb:>11.1f} {'':>14}")
+
+    for dim in args.dims:
+        embeddings = FilmEmbeddings.fit(tfidf, n_components=dim)
+        ms, found = per_query_ms(lambda q: embeddings.most_similar(q, args.k)[0], queries)
+        start = time.perf_counter()
+        embeddings.most_similar_batch(queries, args.k)
+        batch_ms = (time.perf_counter() - start) / len(queries) * 1000
+        text_found = [embeddings.search_query(model.vectorizer.transform([t]), args.k)[0] for t in texts]
+        usage = embeddings.memory_usage()
+
+        print(f"{f'svd-{dim}':>14} {overlap(found, truth):>10.3f} {overlap(text_found, text_truth):>13.3f} "
+              f"{ms:>9.3f} {batch_ms:>11.3f} {usage['vectors'] / 1024 ** 2:>11.1f} "
+              f"{usage['projection'] / 1024 ** 2:>14.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""
+Benchmark: one-shot vs chunked film dataset ingestion
+Reports build time, peak traced memory and the final frame size of the
+previous read_csv + whole-frame soup path against the chunked pipeline for
+several chunk sizes
+
+Usage:
+    python benchmarks/bench_ingest.py [--scale 4] [--chunk-sizes 500 2000 8000]
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import pandas as pd
+
+# Add parent directory to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sklearn.feature_extraction.text import TfidfVectorizer
+
+from utils.film_engine import FilmRecommendationEngine
+from utils.film_ingest import clean_chunk, film_soups
+from utils.film_parsing import parse_list_column
+from utils.film_tfidf import VECTORIZER_PARAMS
+
+DATASET = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                       "data", "film", "AllMovies_CLEANED.csv")
+
+
+def one_shot(path):
+    """Previous path: default-dtype read_csv, soup column on the full frame"""
+    df = pd.read_csv(path)
+    genres = parse_list_column(df['genres_list'])
+    actors = parse_list_column(df['actors'])
+    clean_chunk(df)
+    df['soup'] = film_soups(df, genres, actors)
+    vectorizer = TfidfVectorizer(**VECTORIZER_PARAMS)
+    tfidf_matrix = vectorizer.fit_transform(df['soup'])
+    return df, tfidf_matrix
+
+
+def traced(fn):
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = fn()
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak / 1024 ** 2, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--scale", type=int, default=4, help="Repeat the catalogue to simulate a larger one")
+    parser.add_argument("--chunk-sizes", type=int, nargs="+", default=[500, 2000, 8000])
+    args = parser.parse_args()
+
+    engine = FilmRecommendationEngine()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "films.csv")
+        source = pd.read_csv(DATASET, dtype=str, keep_default_na=False)
+        pd.concat([source] * args.scale, ignore_index=True).to_csv(path, index=False)
+        del source
+
+        elapsed, peak_mb, (df, tfidf_matrix) = traced(lambda: one_shot(path))
+        print(f"films: {len(df):,}  csv: {os.path.getsize(path) / 1024 ** 2:.1f} MB  "
+              f"TF-IDF: {tfidf_matrix.data.nbytes / 1024 ** 2:.1f} MB")
+        print()
+        print(f"{'path':>16} {'seconds':>9} {'peak MB':>9} {'frame MB':>9}")
+        print(f"{'one-shot':>16} {elapsed:>9.2f} {peak_mb:>9.1f} {df.memory_usage(deep=True).sum() / 1024 ** 2:>9.1f}")
+        del df, tfidf_matrix
+
+        for chunk_size in args.chunk_sizes:
+            engine.chunk_size = chunk_size
+            elapsed, peak_mb, _ = traced(lambda: engine._ingest(path))
+            frame_mb = engine.df.memory_usage(deep=True).sum() / 1024 ** 2
+            print(f"{f'chunks of {chunk_size}':>16} {elapsed:>9.2f} {peak_mb:>9.1f} {frame_mb:>9.1f}")
+
+
+if __name__ == "__main__":
+    main()
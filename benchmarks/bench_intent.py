@@ -0,0 +1,72 @@
+"""
+Benchmark: local mood intent routing
+Routes a labelled set of typical chat messages through MoodIntentRouter and
+reports the fraction answered locally, the accuracy of the local answers,
+the routing latency and the Gemini calls saved
+
+Usage:
+    python benchmarks/bench_intent.py [--threshold 0.6]
+"""
+
+import argparse
+import os
+import sys
+import time
+
+# Add parent directory to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.mood_intent import MoodIntentRouter
+
+# (message, expected mood or None when the message needs the LLM)
+MESSAGES = [
+    ("saya sedih", "Sad"), ("Saya sedang sedih", "Sad"), ("aku lagi galauuu banget", "Sad"),
+    ("ditinggal pacar", "Sad"), ("patah hati nih", "Sad"), ("kecewa sama hasil ujian", "Sad"),
+    ("I feel so lonely tonight", "Sad"), ("heartbroken, need some songs", "Sad"),
+    ("I'm happy", "Happy"), ("I'm feeling happy!", "Happy"), ("lagi senang banget", "Happy"),
+    ("hari ini aku bahagia", "Happy"), ("semangat pagi!", "Happy"), ("so excited for the weekend", "Happy"),
+    ("Lagu untuk mood calm", "Calm"), ("capek banget habis kerja", "Calm"), ("aku ingin tenang", "Calm"),
+    ("butuh ketenangan", "Calm"), ("im tired", "Calm"), ("want to relax and chill", "Calm"),
+    ("lagi pusing kuliah nih", "Tense"), ("stres banget", "Tense"), ("aku cemas", "Tense"),
+    ("panik deadline besok", "Tense"), ("I feel so stressed about exams", "Tense"), ("mood tense", "Tense"),
+    ("Rekomendasi musik energik", None), ("aku tidak sedih", None), ("I am not happy", None),
+    ("senang tapi capek", None), ("sedih dan cemas", None), ("lagu sedih dari adele", None),
+    ("prediksi mood: danceability 0.7, energy 0.8, valence 0.9", None), ("yang lain dong", None),
+    ("siapa presiden indonesia", None), ("lagu yang mirip dengan yellow tapi lebih sedih", None),
+    ("recommend songs by coldplay", None), ("genre apa yang cocok buat belajar", None),
+]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--threshold", type=float, default=0.6)
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    router = MoodIntentRouter(threshold=args.threshold)
+    build_ms = (time.perf_counter() - start) * 1000
+
+    start = time.perf_counter()
+    decisions = [router.route(message) for message, _ in MESSAGES]
+    route_ms = (time.perf_counter() - start) * 1000 / len(MESSAGES)
+
+    local = [(d, expected) for d, (_, expected) in zip(decisions, MESSAGES) if d.mood]
+    correct = sum(d.mood == expected for d, expected in local)
+    mood_requests = sum(expected is not None for _, expected in MESSAGES)
+
+    for (message, expected), decision in zip(MESSAGES, decisions):
+        marker = "" if decision.mood == expected else "  <-"
+        print(f"{message[:46]:<46} {str(expected):>6} {str(decision.mood):>6} {decision.reason:>14}{marker}")
+
+    stats = router.stats()
+    print()
+    print(f"router build: {build_ms:.0f} ms  routing: {route_ms:.2f} ms/message")
+    print(f"answered locally: {stats['local']}/{stats['messages']} ({stats['local_fraction']:.0%}) "
+          f"of {mood_requests} plain mood requests")
+    print(f"local accuracy: {correct}/{len(local)}")
+    print(f"Gemini calls saved: {2 * stats['local']} (a tool-calling turn costs at least two)")
+    print(f"sent to the LLM by reason: {stats['llm_reasons']}")
+
+
+if __name__ == "__main__":
+    main()
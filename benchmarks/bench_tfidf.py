@@ -0,0 +1,80 @@
+"""
+Benchmark: serial vs multi-process TF-IDF build
+Times TfidfVectorizer.fit_transform against the process-pool build for
+several worker counts and checks the vocabulary and matrix match
+
+Usage:
+    python benchmarks/bench_tfidf.py [--workers 1 2 4] [--scale 1] [--chunk-size 0] [--repeat 1]
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+# Add parent directory to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sklearn.feature_extraction.text import TfidfVectorizer
+
+from utils.film_ingest import iter_film_soups
+from utils.film_tfidf import VECTORIZER_PARAMS, parallel_fit_vectorizer
+
+
+DATASET = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                       "data", "film", "AllMovies_CLEANED.csv")
+
+
+def best_of(fn, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        timings.append(time.perf_counter() - start)
+    return min(timings), result
+
+
+def fit_serial(docs):
+    vectorizer = TfidfVectorizer(**VECTORIZER_PARAMS)
+    return vectorizer, vectorizer.fit_transform(docs)
+
+
+def max_difference(a, b):
+    a, b = a.copy(), b.copy()
+    a.sort_indices()
+    b.sort_indices()
+    if not (np.array_equal(a.indptr, b.indptr) and np.array_equal(a.indices, b.indices)):
+        return np.inf
+    return float(np.abs(a.data - b.data).max(initial=0.0))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--scale", type=int, default=1, help="Repeat the catalogue to simulate a larger one")
+    parser.add_argument("--chunk-size", type=int, default=0, help="Documents per chunk (0 = automatic)")
+    parser.add_argument("--repeat", type=int, default=1)
+    args = parser.parse_args()
+
+    docs = [soup for chunk in iter_film_soups(DATASET) for soup in chunk] * args.scale
+
+    serial_time, (serial_vectorizer, serial_matrix) = best_of(lambda: fit_serial(docs), args.repeat)
+
+    print(f"documents: {len(docs):,}  features: {serial_matrix.shape[1]:,}  cores: {os.cpu_count()}")
+    print()
+    print(f"{'build':>12} {'seconds':>9} {'speedup':>8} {'same vocab':>11} {'max |diff|':>11}")
+    print(f"{'serial':>12} {serial_time:>9.2f} {1.0:>7.2f}x {'':>11} {'':>11}")
+
+    for workers in args.workers:
+        elapsed, (vectorizer, matrix) = best_of(
+            lambda: parallel_fit_vectorizer(docs, n_jobs=workers, chunk_size=args.chunk_size or None,
+                                            **VECTORIZER_PARAMS), args.repeat)
+        same_vocab = vectorizer.vocabulary_ == serial_vectorizer.vocabulary_
+        print(f"{f'{workers} workers':>12} {elapsed:>9.2f} {serial_time / elapsed:>7.2f}x {str(same_vocab):>11} "
+              f"{max_difference(matrix, serial_matrix):>11.1e}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+"""
+Benchmark: prompt tokens of the film agent loop with and without the token budget
+Replays a scripted conversation through the film chatbot's real tools and
+reports, per turn, the prompt tokens sent against the previous prompts (full
+tool payloads, whole max_turns window), plus the cost of building a prompt
+
+Usage:
+    python benchmarks/bench_tokens.py [--history-tokens 2000] [--max-turns 10]
+"""
+
+import argparse
+import os
+import sys
+import time
+import uuid
+
+# Add parent directory to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from langchain_core.messages import AIMessage, HumanMessage
+
+from utils.chat_memory import stale_messages
+from utils.chat_stream import tool_content
+from utils.film_chatbot_engine import FilmChatbot
+from utils.film_engine import FilmRecommendationEngine
+from utils.token_budget import TokenBudget
+
+# (user message, tool, tool args)
+CONVERSATION = [
+    ("info film Inception", "search_movie", {"title": "Inception"}),
+    ("film yang mirip Inception", "recommend_movie", {"title": "Inception"}),
+    ("film rating tertinggi", "search_free", {"query": "rating tertinggi"}),
+    ("film horror terbaik", "search_free", {"query": "horror"}),
+    ("film tahun 2010", "search_free", {"query": "film tahun 2010"}),
+    ("ceritakan film The Dark Knight", "search_movie", {"title": "The Dark Knight"}),
+    ("rekomendasi mirip The Dark Knight", "recommend_movie", {"title": "The Dark Knight"}),
+    ("film comedy bagus", "search_free", {"query": "comedy"}),
+    ("film tahun 2015", "search_free", {"query": "film tahun 2015"}),
+    ("info film Interstellar", "search_movie", {"title": "Interstellar"}),
+    ("film mirip Interstellar", "recommend_movie", {"title": "Interstellar"}),
+    ("film romance", "search_free", {"query": "romance"}),
+]
+
+
+def answer_text(result):
+    """Stand-in for the model's answer: one line per film in the tool result"""
+    if isinstance(result, dict):
+        films = result.get("recommendations", [result])
+    else:
+        films = result
+    lines = []
+    for film in films:
+        title = film.get("title") or film.get("Judul") or film.get("Detail film") or film.get("error")
+        rating = film.get("rating") or film.get("Rating") or ""
+        lines.append(f"🎬 {title} ⭐ {rating}")
+    return "\n".join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--history-tokens", type=int, default=2000)
+    parser.add_argument("--max-turns", type=int, default=10)
+    args = parser.parse_args()
+
+    engine = FilmRecommendationEngine()
+    chatbot = FilmChatbot(engine)
+    tools = {tool.name: tool for tool in chatbot._create_tools()}
+    budget = TokenBudget(max_history_tokens=args.history_tokens)
+
+    thread = []
+    build_ms = []
+    print(f"{'turn':<36} {'sent':>6} {'before':>7} {'saved':>6}")
+    for message, name, tool_args in CONVERSATION:
+        budget.start_turn()
+        thread.append(HumanMessage(content=message))
+
+        # Two LLM calls per turn: before the tool call and after the tool result
+        for step in range(2):
+            window = thread[len(stale_messages(thread, args.max_turns)):]
+            start = time.perf_counter()
+            budget.prompt(chatbot.system_prompt, window)
+            build_ms.append((time.perf_counter() - start) * 1000)
+
+            if step == 0:
+                call = {"name": name, "args": tool_args, "id": f"call_{uuid.uuid4().hex}"}
+                tool_message = tools[name].invoke({**call, "type": "tool_call"})
+                thread.extend([AIMessage(content="", tool_calls=[call]), tool_message])
+
+        thread.append(AIMessage(content=answer_text(tool_content(thread[-1]))))
+        thread = thread[len(stale_messages(thread, args.max_turns)):]
+
+        report = budget.end_turn()
+        print(f"{message[:36]:<36} {report['prompt_tokens']:>6} {report['baseline_tokens']:>7} "
+              f"{report['saved_fraction']:>6.0%}")
+
+    stats = budget.stats()
+    print()
+    print(f"total: {stats['prompt_tokens']} tokens sent vs {stats['baseline_tokens']} before "
+          f"({stats['saved_tokens']} saved, {stats['saved_fraction']:.0%}) over {stats['llm_calls']} LLM calls")
+    print(f"prompt build: {sum(build_ms) / len(build_ms):.2f} ms/call")
+
+
+if __name__ == "__main__":
+    main()
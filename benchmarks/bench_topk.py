@@ -0,0 +1,75 @@
+"""
+Benchmark: top-k selection over a similarity row
+Compares the old sorted(enumerate(row)) path with np.argsort and the shared
+argpartition-based top_k, for single queries and a batch of queries
+
+Usage:
+    python benchmarks/bench_topk.py [--sizes 10000 100000 1000000] [--k 5] [--batch 8] [--repeat 3]
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+# Add parent directory to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.film_similarity import top_k
+
+
+def sorted_enumerate(row, idx, k):
+    """Previous implementation (get_similar_films / recommend_movie)"""
+    sim_scores = sorted(list(enumerate(row)), key=lambda x: x[1], reverse=True)
+    return [i for i, _ in sim_scores if i != idx][:k]
+
+
+def full_argsort(row, idx, k):
+    order = np.argsort(-row, kind='stable')
+    return order[order != idx][:k]
+
+
+def best_of(fn, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        timings.append(time.perf_counter() - start)
+    return min(timings), result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10000, 100000, 1000000])
+    parser.add_argument("--k", type=int, default=5)
+    parser.add_argument("--batch", type=int, default=8, help="Queries per batched call")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    print(f"{'films':>10} {'sorted(enumerate)':>18} {'np.argsort':>12} {'top_k':>10} "
+          f"{'batch loop':>12} {'batch top_k':>12} {'speedup':>9}")
+
+    for n in args.sizes:
+        scores = rng.random((args.batch, n), dtype=np.float32)
+        queries = rng.choice(n, args.batch, replace=False)
+        row, idx = scores[0], int(queries[0])
+
+        old_time, old = best_of(lambda: sorted_enumerate(row, idx, args.k), 1 if n > 100000 else args.repeat)
+        sort_time, by_sort = best_of(lambda: full_argsort(row, idx, args.k), args.repeat)
+        new_time, (new, _) = best_of(lambda: top_k(row, args.k, exclude=idx), args.repeat)
+        assert list(old) == list(by_sort) == new.tolist(), "top-k results differ"
+
+        loop_time, looped = best_of(
+            lambda: [top_k(r, args.k, exclude=q)[0] for r, q in zip(scores, queries)], args.repeat)
+        batch_time, (batched, _) = best_of(lambda: top_k(scores, args.k, exclude=queries), args.repeat)
+        assert (np.stack(looped) == batched).all(), "batched top-k differs from per-query top-k"
+
+        print(f"{n:>10,} {old_time * 1000:>15.2f} ms {sort_time * 1000:>9.2f} ms {new_time * 1000:>7.2f} ms "
+              f"{loop_time * 1000:>9.2f} ms {batch_time * 1000:>9.2f} ms {old_time / new_time:>8.0f}x")
+
+
+if __name__ == "__main__":
+    main()
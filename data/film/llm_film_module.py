@@ -6,18 +6,36 @@ This module contains the chatbot logic using LangChain + Gemini AI
 """
 
 import os
+import sys
 import json
 import re
 import pandas as pd
-from typing import Dict, Any, List
+from typing import Dict, Any, AsyncIterator, List
 from langchain.tools import tool
 from langchain_google_genai import ChatGoogleGenerativeAI
-from langchain_core.messages import HumanMessage, AIMessage, SystemMessage, ToolMessage
+from langchain_core.messages import HumanMessage, AIMessage, ToolMessage
+from langchain_core.runnables import RunnableLambda
 from langgraph.graph import StateGraph, MessagesState, START, END
 from langgraph.prebuilt import ToolNode
-from langgraph.checkpoint.memory import MemorySaver
-from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.metrics.pairwise import cosine_similarity
+
+# Shared similarity backend lives in utils/ at the project root
+project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from utils.chat_memory import DEFAULT_MAX_TURNS, create_checkpointer, remove_messages, stale_messages, window_update
+from utils.chat_stream import AgentStream, current_turn, message_text, replay_turn, tool_content, turn_events
+from utils.film_similarity import FilmSimilarityModel
+from utils.response_cache import ResponseCache, thread_context
+from utils.title_index import TitleIndex
+from utils.token_budget import DEFAULT_HISTORY_TOKENS, TokenBudget, project, tool_payload
+
+# Fields the model needs from each tool result (the UI reads the full result
+# from the ToolMessage artifact). search_movie feeds the full info format, so
+# it is only compacted.
+RECOMMENDATION_PROMPT_FIELDS = ["Judul", "Tahun", "Genre", "Rating"]
+SEARCH_PROMPT_FIELDS = ["title", "release_year", "genres_list", "rating", "directors", "actors"]
+SEARCH_PROMPT_LIMITS = {"directors": 60, "actors": 80}
 
 
 class FilmLLMChatbot:
@@ -25,15 +43,25 @@ class FilmLLMChatbot:
     Film recommendation chatbot using Gemini 2.5 Flash
     """
 
-    def __init__(self, film_df, tfidf_matrix=None, cosine_sim=None, api_key=None):
+    def __init__(self, film_df, similarity_model=None, api_key=None, title_index=None, llm=None,
+                 cache_size=256, cache_ttl=600.0, max_turns=DEFAULT_MAX_TURNS, memory=None,
+                 max_history_tokens=DEFAULT_HISTORY_TOKENS):
         """
-        Initialize chatbot with film data and similarity matrices
+        Initialize chatbot with film data and the shared similarity model
 
         Args:
             film_df: DataFrame with film data
-            tfidf_matrix: Pre-computed TF-IDF matrix (optional, will build if None)
-            cosine_sim: Pre-computed cosine similarity matrix (optional, will build if None)
+            similarity_model: Fitted FilmSimilarityModel (optional, will build if None)
             api_key: Google API key (optional, can use env var)
+            title_index: Shared TitleIndex for fuzzy title lookup (optional, will build if None)
+            llm: Chat model to use instead of Gemini (optional, e.g. a local fake)
+            cache_size: Agent turns kept in the response cache (0 disables it)
+            cache_ttl: Seconds a cached turn stays valid (None = no expiry)
+            max_turns: User turns of a thread kept and sent to the LLM
+            memory: LangGraph checkpointer (optional, default: create_checkpointer(),
+                in-process or SQLite when CHAT_MEMORY_PATH is set)
+            max_history_tokens: Tokens of earlier turns sent with each LLM call
+                (None = the whole max_turns window)
         """
         self.film_df = film_df
         self.api_key = api_key or os.getenv("GOOGLE_API_KEY")
@@ -41,24 +69,32 @@ class FilmLLMChatbot:
         self.agent = None
         self.chat_history = []
         self.last_query = ""
-
-        # Build or use pre-computed matrices
-        if tfidf_matrix is None or cosine_sim is None:
-            self.vectorizer, self.tfidf_matrix, self.cosine_sim = self._build_similarity_matrices()
-        else:
-            self.vectorizer = TfidfVectorizer(stop_words='english', max_features=50000)
-            self.tfidf_matrix = tfidf_matrix
-            self.cosine_sim = cosine_sim
-
-        # Build title index
-        self.film_df["title_clean"] = (
+        self.response_cache = ResponseCache(maxsize=cache_size, ttl=cache_ttl) if cache_size else None
+        self.max_turns = max_turns
+        self.memory = memory
+        self.token_budget = TokenBudget(max_history_tokens)
+
+        # Reuse the engine's fitted model, only build one when running standalone
+        if similarity_model is None:
+            similarity_model = self._build_similarity_model()
+        self.similarity_model = similarity_model
+
+        # Build title index (kept off film_df, which is shared with the engine)
+        title_clean = (
             self.film_df["title"]
             .astype(str)
             .str.lower()
             .str.replace(r"[^a-z0-9]", "", regex=True)
             .str.strip()
         )
-        self.indices = pd.Series(self.film_df.index, index=self.film_df["title_clean"]).drop_duplicates()
+        # First film per title (remakes share a title; a lookup must give one row)
+        self.indices = pd.Series(self.film_df.index, index=title_clean)
+        self.indices = self.indices[~self.indices.index.duplicated()]
+
+        # Typo-tolerant fallback shared with FilmRecommendationEngine
+        if title_index is None:
+            title_index = TitleIndex(self.film_df["title"], self.film_df["rating"])
+        self.title_index = title_index
 
         # System prompt (from notebook cell-27)
         self.system_prompt = """
@@ -96,18 +132,12 @@ CATATAN:
 
         self.non_film_keywords = ["presiden", "politik", "agama", "integral", "anjing", "kucing", "cuaca"]
 
-        # Initialize if API key available
-        if self.api_key:
-            self._initialize_llm()
-
-    def _build_similarity_matrices(self):
-        """Build TF-IDF and cosine similarity matrices"""
-        vectorizer = TfidfVectorizer(
-            stop_words='english',
-            ngram_range=(1, 3),
-            max_features=50000
-        )
+        # Initialize if API key (or an injected model) available
+        if llm is not None or self.api_key:
+            self._initialize_llm(llm)
 
+    def _build_similarity_model(self):
+        """Fit a FilmSimilarityModel when no shared one is provided"""
         # Create soup (description + actors + directors + genres)
         def clean_text(x):
             if isinstance(x, str):
@@ -121,16 +151,13 @@ CATATAN:
             self.film_df["genres_list"].astype(str).str.lower().str.replace(" ", "_")
         )
 
-        tfidf_matrix = vectorizer.fit_transform(soup)
-        cosine_sim = cosine_similarity(tfidf_matrix, tfidf_matrix)
+        return FilmSimilarityModel.fit(soup)
 
-        return vectorizer, tfidf_matrix, cosine_sim
-
-    def _initialize_llm(self):
+    def _initialize_llm(self, llm=None):
         """Initialize Gemini LLM and LangGraph agent"""
         try:
-            # Initialize Gemini LLM
-            self.llm = ChatGoogleGenerativeAI(
+            # Initialize Gemini LLM unless a model was injected
+            self.llm = llm or ChatGoogleGenerativeAI(
                 model="gemini-2.5-flash",
                 temperature=0.2,
                 api_key=self.api_key,
@@ -152,115 +179,153 @@ CATATAN:
     def _create_tools(self):
         """Create LangChain tools for the chatbot"""
 
-        @tool
+        @tool(response_format="content_and_artifact")
         def search_movie(title: str):
             """Mencari detail film berdasarkan judul."""
-            clean = re.sub(r"[^a-z0-9]", "", str(title).lower()).strip()
+            return tool_payload(self._search_movie(title), self._movie_payload)
 
-            # Exact match
-            if clean in self.indices:
-                idx = self.indices[clean]
-            else:
-                # Fuzzy fallback
-                matches = [k for k in self.indices.index if clean in k]
-                if matches:
-                    idx = self.indices[matches[0]]
-                else:
-                    return {"error": f"Film '{title}' tidak ditemukan."}
+        @tool(response_format="content_and_artifact")
+        def recommend_movie(title: str):
+            """Memberi rekomendasi film mirip berdasarkan judul."""
+            return tool_payload(self._recommend_movie(title), self._recommendation_payload)
 
-            row = self.film_df.iloc[idx]
+        @tool(response_format="content_and_artifact")
+        def search_free(query: str = ""):
+            """
+            Pencarian bebas: rating tertinggi/terendah, aktor, sutradara, genre, tahun
+            """
+            return tool_payload(self._search_free(query), self._search_payload)
 
-            return {
-                "Detail film": row.get("title"),
-                "Deskripsi": row.get("description"),
-                "Tahun Rilis": row.get("release_year"),
+        return [search_movie, recommend_movie, search_free]
+
+    def _search_movie(self, title: str) -> Dict[str, Any]:
+        """Details of one film (body of the search_movie tool)"""
+        idx = self._resolve_title(title)
+        if idx is None:
+            return {"error": f"Film '{title}' tidak ditemukan."}
+
+        row = self.film_df.iloc[idx]
+
+        return {
+            "Detail film": row.get("title"),
+            "Deskripsi": row.get("description"),
+            "Tahun Rilis": row.get("release_year"),
+            "Genre": row.get("genres_list"),
+            "Rating": row.get("rating"),
+            "Sutradara": row.get("directors"),
+            "Aktor": row.get("actors"),
+            "Durasi": row.get("runtime_minutes")
+        }
+
+    def _recommend_movie(self, title: str) -> Dict[str, Any]:
+        """Five films most similar to a title (body of the recommend_movie tool)"""
+        idx = self._resolve_title(title)
+        if idx is None:
+            return {"error": f"Film '{title}' tidak ditemukan."}
+
+        film_indices, scores = self.similarity_model.most_similar(idx, 5)
+
+        rec = []
+        for i, score in zip(film_indices, scores):
+            row = self.film_df.iloc[i]
+            rec.append({
+                "Judul": row.get("title"),
+                "Tahun": row.get("release_year"),
                 "Genre": row.get("genres_list"),
                 "Rating": row.get("rating"),
-                "Sutradara": row.get("directors"),
-                "Aktor": row.get("actors"),
-                "Durasi": row.get("runtime_minutes")
-            }
+                "Durasi": row.get("runtime_minutes"),
+                "Similarity": float(score)
+            })
 
-        @tool
-        def recommend_movie(title: str):
-            """Memberi rekomendasi film mirip berdasarkan judul."""
-            t = re.sub(r"[^a-z0-9]", "", title.lower()).strip()
+        return {"recommendations": rec}
 
-            if t not in self.indices:
-                return {"error": f"Film '{title}' tidak ditemukan."}
+    def _search_free(self, query: str = "") -> List[Dict[str, Any]]:
+        """Free-form search by rating, genre, year or title (body of the search_free tool)"""
+        q = str(query).lower().strip()
 
-            idx = self.indices[t]
-            sim_scores = list(enumerate(self.cosine_sim[idx]))
-            sim_scores = sorted(sim_scores, key=lambda x: x[1], reverse=True)[1:6]
+        # Rating tertinggi
+        if "rating tertinggi" in q or "rating tinggi" in q or "paling bagus" in q:
+            return self._top_rated(self.film_df, 5, ascending=False).to_dict(orient="records")
 
-            rec = []
-            for i, score in sim_scores:
-                row = self.film_df.iloc[i]
-                rec.append({
-                    "Judul": row.get("title"),
-                    "Tahun": row.get("release_year"),
-                    "Genre": row.get("genres_list"),
-                    "Rating": row.get("rating"),
-                    "Durasi": row.get("runtime_minutes"),
-                    "Similarity": float(score)
-                })
-
-            return {"recommendations": rec}
-
-        @tool
-        def search_free(query: str = ""):
-            """
-            Pencarian bebas: rating tertinggi/terendah, aktor, sutradara, genre, tahun
-            """
-            q = str(query).lower().strip()
-
-            # Rating tertinggi
-            if "rating tertinggi" in q or "rating tinggi" in q or "paling bagus" in q:
-                self.film_df["rating_num"] = pd.to_numeric(self.film_df["rating"], errors="coerce")
-                hasil = self.film_df.sort_values("rating_num", ascending=False).head(5)
-                return hasil.to_dict(orient="records")
-
-            # Rating terendah
-            if "rating terendah" in q or "rating rendah" in q:
-                self.film_df["rating_num"] = pd.to_numeric(self.film_df["rating"], errors="coerce")
-                hasil = self.film_df.sort_values("rating_num", ascending=True).head(5)
-                return hasil.to_dict(orient="records")
-
-            # Genre
-            genres = ["action", "horror", "drama", "comedy", "thriller", "romance"]
-            for g in genres:
-                if g in q:
-                    subset = self.film_df[self.film_df["genres_list"].astype(str).str.lower().str.contains(g)]
-                    if not subset.empty:
-                        subset["rating_num"] = pd.to_numeric(subset["rating"], errors="coerce")
-                        return subset.sort_values("rating_num", ascending=False).head(5).to_dict(orient="records")
-
-            # Tahun
-            year_match = re.search(r"\b(19|20)\d{2}\b", q)
-            if year_match:
-                yr = int(year_match.group(0))
-                subset = self.film_df[self.film_df["release_year"].astype(int) == yr]
+        # Rating terendah
+        if "rating terendah" in q or "rating rendah" in q:
+            return self._top_rated(self.film_df, 5, ascending=True).to_dict(orient="records")
+
+        # Genre
+        genres = ["action", "horror", "drama", "comedy", "thriller", "romance"]
+        for g in genres:
+            if g in q:
+                subset = self.film_df[self.film_df["genres_list"].astype(str).str.lower().str.contains(g)]
                 if not subset.empty:
-                    return subset.head(10).to_dict(orient="records")
+                    return self._top_rated(subset, 5, ascending=False).to_dict(orient="records")
 
-            # Judul contains query
-            subset = self.film_df[self.film_df["title"].astype(str).str.lower().str.contains(q)]
+        # Tahun
+        year_match = re.search(r"\b(19|20)\d{2}\b", q)
+        if year_match:
+            yr = int(year_match.group(0))
+            subset = self.film_df[self.film_df["release_year"].astype(int) == yr]
             if not subset.empty:
-                return subset.head(5).to_dict(orient="records")
+                return subset.head(10).to_dict(orient="records")
+
+        # Judul contains query
+        subset = self.film_df[self.film_df["title"].astype(str).str.lower().str.contains(q)]
+        if not subset.empty:
+            return subset.head(5).to_dict(orient="records")
+
+        return [{"error": "Tidak ada film yang cocok dengan query."}]
+
+    @staticmethod
+    def _movie_payload(film: Dict[str, Any]) -> Dict[str, Any]:
+        """What the model reads of a search_movie result (every field, compacted)"""
+        return project(film, list(film))
+
+    @staticmethod
+    def _recommendation_payload(result: Dict[str, Any]) -> Dict[str, Any]:
+        """What the model reads of a recommend_movie result (RECOMMENDATION_PROMPT_FIELDS only)"""
+        if "recommendations" not in result:
+            return result
+        return {"recommendations": [project(film, RECOMMENDATION_PROMPT_FIELDS) for film in result["recommendations"]]}
+
+    @staticmethod
+    def _search_payload(films: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """What the model reads of a search_free result (no descriptions, long credits shortened)"""
+        return [project(film, SEARCH_PROMPT_FIELDS, SEARCH_PROMPT_LIMITS) for film in films]
+
+    @staticmethod
+    def _top_rated(films, n, ascending=False):
+        """First n films by numeric rating, without adding a column to films"""
+        rating = pd.to_numeric(films["rating"], errors="coerce")
+        return films.loc[rating.sort_values(ascending=ascending).index[:n]]
+
+    def _resolve_title(self, title):
+        """
+        Map a (possibly misspelled) title to a row position
 
-            return [{"error": "Tidak ada film yang cocok dengan query."}]
+        Args:
+            title: Title mentioned by the user
 
-        return [search_movie, recommend_movie, search_free]
+        Returns:
+            Row position of the best match, or None
+        """
+        clean = re.sub(r"[^a-z0-9]", "", str(title).lower()).strip()
+
+        # Exact match
+        if clean in self.indices:
+            return self.indices[clean]
+
+        # Fuzzy fallback (typo-tolerant, bounded latency)
+        rows, _ = self.title_index.fuzzy(title, limit=1)
+        return int(rows[0]) if len(rows) else None
 
     def _retrieve_context(self, question, top_k=3):
         """RAG retrieval for context"""
         try:
-            q_vec = self.vectorizer.transform([question])
-            sims = cosine_similarity(q_vec, self.tfidf_matrix).flatten()
-            top_idx = sims.argsort()[::-1][:top_k]
+            top_idx, scores = self.similarity_model.search_text(question, top_k)
 
             ctx = []
-            for i in top_idx:
+            for i, score in zip(top_idx, scores):
+                if score <= 0:
+                    continue
                 row = self.film_df.iloc[i]
                 ctx.append(f"Judul: {row.get('title')} | Genre: {row.get('genres_list')} | Rating: {row.get('rating')}")
             return "\n".join(ctx)
@@ -283,19 +348,34 @@ CATATAN:
 
         tool_node = ToolNode(tools)
 
-        def call_llm(state: AgentState):
-            """Call LLM with system prompt and messages"""
-            messages = state["messages"]
+        # Bind tools to LLM
+        llm_with_tools = self.llm.bind_tools(tools)
+
+        def prompt_messages(messages, config):
+            """(RAG-grounded) system prompt and the turns that fit the token budget, counted for the turn report"""
+            system_prompt = self.system_prompt
 
-            # Add system prompt if first message
-            if len(messages) == 0 or not isinstance(messages[0], SystemMessage):
-                messages = [SystemMessage(content=self.system_prompt)] + messages
+            # RAG: ground a fresh user turn with the closest films in the dataset
+            if messages and isinstance(messages[-1], HumanMessage):
+                context = self._retrieve_context(messages[-1].content)
+                if context:
+                    system_prompt += f"\nFILM TERKAIT DARI DATASET:\n{context}\n"
 
-            # Bind tools to LLM
-            llm_with_tools = self.llm.bind_tools(tools)
-            response = llm_with_tools.invoke(messages)
+            return self.token_budget.prompt(system_prompt, messages, config["configurable"].get("thread_id"))
 
-            return {"messages": [response]}
+        def call_llm(state: AgentState, config):
+            """Call LLM with system prompt and the last max_turns turns (older ones are dropped)"""
+            stale = stale_messages(state["messages"], self.max_turns)
+            response = llm_with_tools.invoke(prompt_messages(state["messages"][len(stale):], config))
+            self.token_budget.record_usage(response, config["configurable"].get("thread_id"))
+            return {"messages": remove_messages(stale) + [response]}
+
+        async def acall_llm(state: AgentState, config):
+            """Async variant of call_llm, used by astream()/achat()"""
+            stale = stale_messages(state["messages"], self.max_turns)
+            response = await llm_with_tools.ainvoke(prompt_messages(state["messages"][len(stale):], config))
+            self.token_budget.record_usage(response, config["configurable"].get("thread_id"))
+            return {"messages": remove_messages(stale) + [response]}
 
         def should_continue(state: AgentState):
             """Check if we should continue or end"""
@@ -312,7 +392,7 @@ CATATAN:
         workflow = StateGraph(MessagesState)
 
         # Add nodes
-        workflow.add_node("agent", call_llm)
+        workflow.add_node("agent", RunnableLambda(call_llm, afunc=acall_llm))
         workflow.add_node("tools", tool_node)
 
         # Set entry point
@@ -322,9 +402,10 @@ CATATAN:
         workflow.add_conditional_edges("agent", should_continue, ["tools", END])
         workflow.add_edge("tools", "agent")
 
-        # Compile with memory
-        memory = MemorySaver()
-        app = workflow.compile(checkpointer=memory)
+        # Compile with bounded memory (message window, idle threads evicted)
+        if self.memory is None:
+            self.memory = create_checkpointer()
+        app = workflow.compile(checkpointer=self.memory)
 
         return app
 
@@ -392,26 +473,22 @@ CATATAN:
 
         return cleaned_response.strip()
 
-    def chat(self, user_message: str, thread_id: str = "default") -> Dict[str, Any]:
+    def _precheck(self, user_message: str):
         """
-        Main chat function
-
-        Args:
-            user_message: User's message
-            thread_id: Thread ID for conversation (default: "default")
+        Resolve follow-ups and guard rails before the agent runs
 
         Returns:
-            Dict with 'text' (response) and 'films' (list of film data)
+            Tuple (message for the agent, canned reply or None)
         """
         if not self.llm or not self.agent:
-            return {
+            return user_message, {
                 "text": "Error: Chatbot belum diinisialisasi. Pastikan GOOGLE_API_KEY sudah diset.",
                 "films": []
             }
 
         # Check if film-related
         if not self.is_film_related(user_message):
-            return {
+            return user_message, {
                 "text": "Maaf, saya hanya dapat membantu rekomendasi film. Coba tanya tentang film yuk! 🎬",
                 "films": []
             }
@@ -421,90 +498,242 @@ CATATAN:
             if self.last_query:
                 user_message = self.last_query
             else:
-                return {
+                return user_message, {
                     "text": "Silakan tanyakan tentang film yang ingin Anda cari! 🎬",
                     "films": []
                 }
 
         self.last_query = user_message
+        return user_message, None
 
-        try:
-            # Invoke agent with thread_id
-            config = {"configurable": {"thread_id": thread_id}}
-            result = self.agent.invoke(
-                {"messages": [HumanMessage(content=user_message)]},
-                config=config
-            )
-
-            # Get last message
-            last_message = result["messages"][-1]
-            response = last_message.content
+    def _build_response(self, messages) -> Dict[str, Any]:
+        """
+        Reply dict from the messages of one agent turn
 
-            # Clean internal reasoning/thinking from response
-            response = self._clean_response(response)
+        Args:
+            messages: AI and tool messages produced for the latest user message
 
-            # Extract film data from tool results
-            films = []
-            for message in result["messages"]:
-                if isinstance(message, ToolMessage):
-                    try:
-                        tool_result = json.loads(message.content) if isinstance(message.content, str) else message.content
+        Returns:
+            Dict with 'text' (response) and 'films' (list of film data)
+        """
+        # Get last message
+        response = message_text(messages[-1].content) if messages else ""
+
+        # Clean internal reasoning/thinking from response
+        response = self._clean_response(response)
+
+        # Extract film data from tool results
+        films = []
+        for message in messages:
+            if isinstance(message, ToolMessage):
+                try:
+                    tool_result = tool_content(message)
+                    if isinstance(tool_result, str):
+                        continue
 
-                        # Handle search_movie tool result (single film)
-                        if "Detail film" in tool_result:
+                    # Handle search_movie tool result (single film)
+                    if "Detail film" in tool_result:
+                        films.append({
+                            "title": tool_result.get("Detail film", ""),
+                            "description": tool_result.get("Deskripsi", ""),
+                            "rating": tool_result.get("Rating", 0),
+                            "genres_list": tool_result.get("Genre", ""),
+                            "year": tool_result.get("Tahun Rilis", ""),
+                            "directors": tool_result.get("Sutradara", ""),
+                            "actors": tool_result.get("Aktor", ""),
+                            "runtime_minutes": tool_result.get("Durasi", "")
+                        })
+
+                    # Handle recommend_movie tool result (list of recommendations)
+                    elif "recommendations" in tool_result:
+                        for rec in tool_result["recommendations"]:
                             films.append({
-                                "title": tool_result.get("Detail film", ""),
-                                "description": tool_result.get("Deskripsi", ""),
-                                "rating": tool_result.get("Rating", 0),
-                                "genres_list": tool_result.get("Genre", ""),
-                                "year": tool_result.get("Tahun Rilis", ""),
-                                "directors": tool_result.get("Sutradara", ""),
-                                "actors": tool_result.get("Aktor", ""),
-                                "runtime_minutes": tool_result.get("Durasi", "")
+                                "title": rec.get("Judul", ""),
+                                "description": "",  # Recommendations don't have description
+                                "rating": rec.get("Rating", 0),
+                                "genres_list": rec.get("Genre", ""),
+                                "year": rec.get("Tahun", ""),
+                                "directors": "",
+                                "actors": "",
+                                "runtime_minutes": rec.get("Durasi", "")
                             })
 
-                        # Handle recommend_movie tool result (list of recommendations)
-                        elif "recommendations" in tool_result:
-                            for rec in tool_result["recommendations"]:
+                    # Handle search_free tool result (list of films)
+                    elif isinstance(tool_result, list):
+                        for film in tool_result:
+                            if "error" not in film:
                                 films.append({
-                                    "title": rec.get("Judul", ""),
-                                    "description": "",  # Recommendations don't have description
-                                    "rating": rec.get("Rating", 0),
-                                    "genres_list": rec.get("Genre", ""),
-                                    "year": rec.get("Tahun", ""),
-                                    "directors": "",
-                                    "actors": "",
-                                    "runtime_minutes": rec.get("Durasi", "")
+                                    "title": film.get("title", ""),
+                                    "description": film.get("description", ""),
+                                    "rating": film.get("rating", 0),
+                                    "genres_list": ", ".join(film.get("genres_list", [])) if isinstance(film.get("genres_list"), list) else film.get("genres_list", ""),
+                                    "year": film.get("release_year", ""),
+                                    "directors": film.get("directors", ""),
+                                    "actors": film.get("actors", ""),
+                                    "runtime_minutes": film.get("runtime_minutes", "")
                                 })
+                except (json.JSONDecodeError, TypeError, KeyError) as e:
+                    continue
 
-                        # Handle search_free tool result (list of films)
-                        elif isinstance(tool_result, list):
-                            for film in tool_result:
-                                if "error" not in film:
-                                    films.append({
-                                        "title": film.get("title", ""),
-                                        "description": film.get("description", ""),
-                                        "rating": film.get("rating", 0),
-                                        "genres_list": ", ".join(film.get("genres_list", [])) if isinstance(film.get("genres_list"), list) else film.get("genres_list", ""),
-                                        "year": film.get("release_year", ""),
-                                        "directors": film.get("directors", ""),
-                                        "actors": film.get("actors", ""),
-                                        "runtime_minutes": film.get("runtime_minutes", "")
-                                    })
-                    except (json.JSONDecodeError, TypeError, KeyError) as e:
-                        continue
+        return {
+            "text": response,
+            "films": films
+        }
+
+    def _cached_turn(self, user_message: str, messages):
+        """
+        Stored turn for a message, looked up in the thread's current context
+
+        Args:
+            user_message: User's message (after follow-up resolution)
+            messages: Checkpointed messages of the thread so far
+
+        Returns:
+            Tuple (cached {'messages', 'response'} or None, context for _cache_turn)
+        """
+        if self.response_cache is None:
+            return None, None
+        context = thread_context(messages)
+        return self.response_cache.lookup(user_message, context, version=id(self.film_df)), context
+
+    def _cache_turn(self, user_message: str, context, messages, response: Dict[str, Any]):
+        """Store a completed agent turn (empty answers are not cached)"""
+        if self.response_cache is not None and response.get("text"):
+            self.response_cache.store(user_message, {"messages": messages, "response": response},
+                                      context, version=id(self.film_df))
+
+    def _record_turn(self, config, history, turn):
+        """Add a replayed turn to the thread, trimming it to max_turns"""
+        self.agent.update_state(config, {"messages": window_update(history, turn, self.max_turns)}, as_node="agent")
+
+    async def _arecord_turn(self, config, history, turn):
+        """Async variant of _record_turn"""
+        await self.agent.aupdate_state(config, {"messages": window_update(history, turn, self.max_turns)}, as_node="agent")
+
+    def cache_stats(self) -> Dict[str, Any]:
+        """Hit/miss counters of the response cache (None when caching is off)"""
+        return self.response_cache.stats() if self.response_cache is not None else None
+
+    def token_stats(self) -> Dict[str, Any]:
+        """
+        Prompt tokens of all agent turns, sent vs without the token budget
+
+        Returns:
+            Dict from TokenBudget.stats() (turns, llm_calls, prompt_tokens,
+            baseline_tokens, saved_tokens, saved_fraction)
+        """
+        return self.token_budget.stats()
+
+    def chat(self, user_message: str, thread_id: str = "default") -> Dict[str, Any]:
+        """
+        Main chat function
+
+        Args:
+            user_message: User's message
+            thread_id: Thread ID for conversation (default: "default")
+
+        Returns:
+            Dict with 'text' (response) and 'films' (list of film data); turns
+            that ran the agent also carry 'usage', the token report of
+            TokenBudget.end_turn()
+        """
+        user_message, early = self._precheck(user_message)
+        if early is not None:
+            return early
+
+        try:
+            config = {"configurable": {"thread_id": thread_id}}
+
+            # Repeated questions are replayed from the cache without a network call
+            history = self.agent.get_state(config).values.get("messages", [])
+            cached, context = self._cached_turn(user_message, history)
+            if cached is not None:
+                self._record_turn(config, history, replay_turn(user_message, cached["messages"]))
+                return dict(cached["response"])
+
+            # Invoke agent with thread_id
+            self.token_budget.start_turn(thread_id)
+            result = self.agent.invoke(
+                {"messages": [HumanMessage(content=user_message)]},
+                config=config
+            )
+
+            # Only this turn's messages (the thread keeps earlier tool results)
+            messages = current_turn(result["messages"])
+            response = self._build_response(messages)
+            self._cache_turn(user_message, context, messages, response)
+            return {**response, "usage": self.token_budget.end_turn(thread_id)}
 
+        except Exception as e:
             return {
-                "text": response,
-                "films": films
+                "text": f"Maaf, terjadi error: {str(e)}",
+                "films": []
             }
 
+    async def astream(self, user_message: str, thread_id: str = "default") -> AsyncIterator[Dict[str, Any]]:
+        """
+        Stream a reply as it is generated
+
+        Args:
+            user_message: User's message
+            thread_id: Thread ID for conversation (default: "default")
+
+        Yields:
+            Event dicts (see utils/chat_stream.py): 'token', 'tool_call' and
+            'tool_result' while the agent runs, then one 'done' event carrying
+            the same 'text' / 'films' (and 'usage') as chat(). Tokens are the raw model
+            output; 'done' has the cleaned text.
+        """
+        user_message, early = self._precheck(user_message)
+        if early is not None:
+            yield {"type": "done", **early}
+            return
+
+        try:
+            config = {"configurable": {"thread_id": thread_id}}
+
+            state = await self.agent.aget_state(config)
+            cached, context = self._cached_turn(user_message, state.values.get("messages", []))
+            if cached is not None:
+                turn = replay_turn(user_message, cached["messages"])
+                await self._arecord_turn(config, state.values.get("messages", []), turn)
+                for event in turn_events(turn[1:]):
+                    yield event
+                yield {"type": "done", **cached["response"]}
+                return
+
+            self.token_budget.start_turn(thread_id)
+            turn = AgentStream(self.agent, user_message, config)
+            async for event in turn.events():
+                yield event
+            response = self._build_response(turn.messages)
+            self._cache_turn(user_message, context, turn.messages, response)
+            response = {**response, "usage": self.token_budget.end_turn(thread_id)}
         except Exception as e:
-            return {
+            response = {
                 "text": f"Maaf, terjadi error: {str(e)}",
                 "films": []
             }
 
+        yield {"type": "done", **response}
+
+    async def achat(self, user_message: str, thread_id: str = "default") -> Dict[str, Any]:
+        """
+        Async chat, returning the same dictionary as chat()
+
+        Args:
+            user_message: User's message
+            thread_id: Thread ID for conversation (default: "default")
+
+        Returns:
+            Dict with 'text' (response) and 'films' (list of film data)
+        """
+        response = {}
+        async for event in self.astream(user_message, thread_id):
+            if event["type"] == "done":
+                response = {key: value for key, value in event.items() if key != "type"}
+        return response
+
     def clear_history(self):
         """Clear chat history"""
         self.chat_history = []
@@ -512,17 +741,26 @@ CATATAN:
 
 
 # Convenience function for easy import
-def create_chatbot(film_df, tfidf_matrix=None, cosine_sim=None, api_key=None):
+def create_chatbot(film_df, similarity_model=None, api_key=None, title_index=None, llm=None,
+                   cache_size=256, cache_ttl=600.0, max_turns=DEFAULT_MAX_TURNS, memory=None,
+                   max_history_tokens=DEFAULT_HISTORY_TOKENS):
     """
     Create a film chatbot instance
 
     Args:
         film_df: DataFrame with film data
-        tfidf_matrix: Pre-computed TF-IDF matrix (optional)
-        cosine_sim: Pre-computed cosine similarity matrix (optional)
+        similarity_model: Fitted FilmSimilarityModel (optional)
         api_key: Google API key (optional)
+        title_index: Shared TitleIndex (optional)
+        llm: Chat model to use instead of Gemini (optional)
+        cache_size: Agent turns kept in the response cache (0 disables it)
+        cache_ttl: Seconds a cached turn stays valid (None = no expiry)
+        max_turns: User turns of a thread kept and sent to the LLM
+        memory: LangGraph checkpointer (optional)
+        max_history_tokens: Tokens of earlier turns sent with each LLM call
 
     Returns:
         FilmLLMChatbot instance
     """
-    return FilmLLMChatbot(film_df, tfidf_matrix, cosine_sim, api_key)
+    return FilmLLMChatbot(film_df, similarity_model, api_key, title_index, llm, cache_size, cache_ttl,
+                          max_turns, memory, max_history_tokens)
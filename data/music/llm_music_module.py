@@ -6,15 +6,50 @@ This module contains the chatbot logic using LangChain + LangGraph + Gemini AI
 """
 
 import os
+import sys
 import json
+import uuid
 import numpy as np
-from typing import Dict, Any, List
+import pandas as pd
+from typing import Dict, Any, AsyncIterator, List, Tuple
 from langchain.tools import tool
 from langchain_google_genai import ChatGoogleGenerativeAI
-from langchain_core.messages import HumanMessage, AIMessage, SystemMessage, ToolMessage
+from langchain_core.messages import HumanMessage, AIMessage, ToolMessage
+from langchain_core.runnables import RunnableLambda
 from langgraph.graph import StateGraph, MessagesState, START, END
 from langgraph.prebuilt import ToolNode
-from langgraph.checkpoint.memory import MemorySaver
+
+# Shared helpers live in utils/ at the project root
+project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from utils.chat_memory import DEFAULT_MAX_TURNS, create_checkpointer, remove_messages, stale_messages, window_update
+from utils.chat_stream import AgentStream, current_turn, message_text, replay_turn, tool_content, turn_events
+from utils.mood_intent import MoodIntentRouter
+from utils.mood_rules import ENERGY_THRESHOLD, VALENCE_THRESHOLD, classify_mood
+from utils.response_cache import ResponseCache, thread_context
+from utils.token_budget import DEFAULT_HISTORY_TOKENS, TokenBudget, compact_json, project, tool_payload
+
+# Song fields the model needs for FORMAT OUTPUT WAJIB (the UI reads the full
+# recommend_music result from the ToolMessage artifact)
+SONG_PROMPT_FIELDS = ["title", "artist", "genre", "popularity"]
+
+# Closing line of locally answered mood requests, per mood and language
+EMPATHY_LINES = {
+    'id': {
+        'Sad': "Semoga lagu-lagu ini bisa nemenin kamu ya, pelan-pelan pasti membaik 💙",
+        'Happy': "Ikut senang! Semoga lagu-lagu ini bikin harimu makin seru ✨",
+        'Calm': "Istirahat dulu ya, semoga lagu-lagu ini bikin kamu lebih tenang 🌙",
+        'Tense': "Tarik napas dulu, semoga lagu-lagu ini bantu meredakan pikiranmu 🍃",
+    },
+    'en': {
+        'Sad': "I hope these songs keep you company, it will get better 💙",
+        'Happy': "Love that! Hope these songs make your day even better ✨",
+        'Calm': "Take it easy, I hope these songs help you unwind 🌙",
+        'Tense': "Take a deep breath, I hope these songs help ease your mind 🍃",
+    },
+}
 
 
 class MusicLLMChatbot:
@@ -22,23 +57,48 @@ class MusicLLMChatbot:
     Music recommendation chatbot using Gemini 2.5 Flash
     """
 
-    def __init__(self, music_df, model=None, label_encoder=None, api_key=None):
+    def __init__(self, music_df, model=None, label_encoder=None, api_key=None, llm=None, local_routing=True,
+                 cache_size=256, cache_ttl=600.0, max_turns=DEFAULT_MAX_TURNS, memory=None,
+                 max_history_tokens=DEFAULT_HISTORY_TOKENS, valence_threshold=VALENCE_THRESHOLD,
+                 energy_threshold=ENERGY_THRESHOLD):
         """
         Initialize chatbot with music data and model
 
         Args:
-            music_df: DataFrame with music data
+            music_df: DataFrame with music data, or a data provider such as
+                MusicRecommendationEngine: its .df is read on every use and its
+                .revision (bumped by add_tracks) versions the response cache
             model: Trained ML model for mood prediction (optional)
             label_encoder: Label encoder for mood classes (optional)
             api_key: Google API key (optional, can use env var)
+            llm: Chat model to use instead of Gemini (optional, e.g. a local fake)
+            local_routing: Answer plain mood requests with MoodIntentRouter
+                instead of the LLM (default: True)
+            cache_size: Agent turns kept in the response cache (0 disables it)
+            cache_ttl: Seconds a cached turn stays valid (None = no expiry)
+            max_turns: User turns of a thread kept and sent to the LLM
+            memory: LangGraph checkpointer (optional, default: create_checkpointer(),
+                in-process or SQLite when CHAT_MEMORY_PATH is set)
+            max_history_tokens: Tokens of earlier turns sent with each LLM call
+                (None = the whole max_turns window)
+            valence_threshold: Valence threshold of the rule-based mood fallback
+                (pass the engine's, so predict_mood agrees with the catalogue)
+            energy_threshold: Energy threshold of the rule-based mood fallback
         """
-        self.music_df = music_df
+        self.data_source = music_df
         self.model = model
         self.label_encoder = label_encoder
+        self.valence_threshold = valence_threshold
+        self.energy_threshold = energy_threshold
         self.api_key = api_key or os.getenv("GOOGLE_API_KEY")
         self.llm = None
         self.agent = None
         self.chat_history = []
+        self.intent_router = MoodIntentRouter() if local_routing else None
+        self.response_cache = ResponseCache(maxsize=cache_size, ttl=cache_ttl) if cache_size else None
+        self.max_turns = max_turns
+        self.memory = memory
+        self.token_budget = TokenBudget(max_history_tokens)
 
         # System prompt (from notebook cell-22)
         self.system_prompt = """
@@ -118,15 +178,15 @@ tanpa improvisasi, tanpa menjawab dari luar dataset.
 SELALU tampilkan hasil lengkap dari tool.
 """
 
-        # Initialize if API key available
-        if self.api_key:
-            self._initialize_llm()
+        # Initialize if API key (or an injected model) available
+        if llm is not None or self.api_key:
+            self._initialize_llm(llm)
 
-    def _initialize_llm(self):
+    def _initialize_llm(self, llm=None):
         """Initialize LLM and agent"""
         try:
-            # Initialize Gemini 2.5 Flash (free tier compatible)
-            self.llm = ChatGoogleGenerativeAI(
+            # Initialize Gemini 2.5 Flash (free tier compatible) unless a model was injected
+            self.llm = llm or ChatGoogleGenerativeAI(
                 model="gemini-2.5-flash",
                 temperature=0.3,
                 api_key=self.api_key,
@@ -166,60 +226,62 @@ SELALU tampilkan hasil lengkap dari tool.
                     mood = self.label_encoder.inverse_transform([pred])[0]
                 else:
                     # Rule-based fallback
-                    valence = float(data['valence'])
-                    energy = float(data['energy'])
-
-                    if valence >= 0.5 and energy >= 0.5:
-                        mood = 'Happy'
-                    elif valence < 0.5 and energy < 0.5:
-                        mood = 'Sad'
-                    elif valence >= 0.5 and energy < 0.5:
-                        mood = 'Calm'
-                    else:
-                        mood = 'Tense'
+                    mood = classify_mood(float(data['valence']), float(data['energy']),
+                                         self.valence_threshold, self.energy_threshold)
 
                 return {"predicted_mood": mood}
             except Exception as e:
                 return {"error": f"Error predicting mood: {str(e)}"}
 
-        @tool
-        def recommend_music(mood: str) -> Dict[str, Any]:
+        @tool(response_format="content_and_artifact")
+        def recommend_music(mood: str) -> Tuple[str, Dict[str, Any]]:
             """Rekomendasi 5 lagu berdasarkan mood tertentu."""
-            try:
-                mood = mood.strip().capitalize()
-
-                # Validate mood
-                valid_moods = ['Happy', 'Sad', 'Calm', 'Tense']
-                if mood not in valid_moods:
-                    return {"error": f"Mood harus salah satu dari: {', '.join(valid_moods)}"}
-
-                # Get recommendations from dataset
-                mood_songs = self.music_df[self.music_df['mood'] == mood].copy()
-
-                if mood_songs.empty:
-                    return {"error": f"Tidak ada lagu dengan mood {mood}."}
-
-                # Sort by popularity and get top 5
-                recommendations = mood_songs.nlargest(5, 'popularity')
-
-                # Format results
-                songs = []
-                for _, row in recommendations.iterrows():
-                    songs.append({
-                        "title": row['track_name'],
-                        "artist": row['artists'],
-                        "album": row.get('album_name', 'Unknown Album'),
-                        "genre": row['track_genre'],
-                        "popularity": int(row['popularity']),
-                        "track_id": row['track_id']
-                    })
-
-                return {"recommendations": songs}
-            except Exception as e:
-                return {"error": f"Error getting recommendations: {str(e)}"}
+            return tool_payload(self._recommend_music(mood), self._prompt_payload)
 
         return [predict_mood, recommend_music]
 
+    def _recommend_music(self, mood: str) -> Dict[str, Any]:
+        """Top 5 songs of a mood by popularity (body of the recommend_music tool)"""
+        try:
+            mood = mood.strip().capitalize()
+
+            # Validate mood
+            valid_moods = ['Happy', 'Sad', 'Calm', 'Tense']
+            if mood not in valid_moods:
+                return {"error": f"Mood harus salah satu dari: {', '.join(valid_moods)}"}
+
+            # Get recommendations from dataset
+            mood_songs = self.music_df[self.music_df['mood'] == mood].copy()
+
+            if mood_songs.empty:
+                return {"error": f"Tidak ada lagu dengan mood {mood}."}
+
+            # Sort by popularity and get top 5
+            recommendations = mood_songs.nlargest(5, 'popularity')
+
+            # Format results
+            songs = []
+            for _, row in recommendations.iterrows():
+                songs.append({
+                    "title": row['track_name'],
+                    "artist": row['artists'],
+                    "album": row.get('album_name', 'Unknown Album'),
+                    "genre": row['track_genre'],
+                    "popularity": int(row['popularity']),
+                    "track_id": row['track_id']
+                })
+
+            return {"recommendations": songs}
+        except Exception as e:
+            return {"error": f"Error getting recommendations: {str(e)}"}
+
+    @staticmethod
+    def _prompt_payload(result: Dict[str, Any]) -> Dict[str, Any]:
+        """What the model reads of a recommend_music result (SONG_PROMPT_FIELDS only)"""
+        if "recommendations" not in result:
+            return result
+        return {"recommendations": [project(song, SONG_PROMPT_FIELDS) for song in result["recommendations"]]}
+
     def _build_agent(self, tools):
         """Build LangGraph agent workflow"""
 
@@ -228,19 +290,26 @@ SELALU tampilkan hasil lengkap dari tool.
 
         tool_node = ToolNode(tools)
 
-        def call_llm(state: AgentState):
-            """Call LLM with system prompt and messages"""
-            messages = state["messages"]
+        # Bind tools to LLM
+        llm_with_tools = self.llm.bind_tools(tools)
 
-            # Add system prompt if first message
-            if len(messages) == 0 or not isinstance(messages[0], SystemMessage):
-                messages = [SystemMessage(content=self.system_prompt)] + messages
+        def prompt_messages(messages, config):
+            """System prompt and the turns that fit the token budget, counted for the turn report"""
+            return self.token_budget.prompt(self.system_prompt, messages, config["configurable"].get("thread_id"))
 
-            # Bind tools to LLM
-            llm_with_tools = self.llm.bind_tools(tools)
-            response = llm_with_tools.invoke(messages)
+        def call_llm(state: AgentState, config):
+            """Call LLM with system prompt and the last max_turns turns (older ones are dropped)"""
+            stale = stale_messages(state["messages"], self.max_turns)
+            response = llm_with_tools.invoke(prompt_messages(state["messages"][len(stale):], config))
+            self.token_budget.record_usage(response, config["configurable"].get("thread_id"))
+            return {"messages": remove_messages(stale) + [response]}
 
-            return {"messages": [response]}
+        async def acall_llm(state: AgentState, config):
+            """Async variant of call_llm, used by astream()/achat()"""
+            stale = stale_messages(state["messages"], self.max_turns)
+            response = await llm_with_tools.ainvoke(prompt_messages(state["messages"][len(stale):], config))
+            self.token_budget.record_usage(response, config["configurable"].get("thread_id"))
+            return {"messages": remove_messages(stale) + [response]}
 
         def should_continue(state: AgentState):
             """Check if we should continue or end"""
@@ -257,7 +326,7 @@ SELALU tampilkan hasil lengkap dari tool.
         workflow = StateGraph(MessagesState)
 
         # Add nodes
-        workflow.add_node("agent", call_llm)
+        workflow.add_node("agent", RunnableLambda(call_llm, afunc=acall_llm))
         workflow.add_node("tools", tool_node)
 
         # Set entry point
@@ -267,9 +336,10 @@ SELALU tampilkan hasil lengkap dari tool.
         workflow.add_conditional_edges("agent", should_continue, ["tools", END])
         workflow.add_edge("tools", "agent")
 
-        # Compile with memory
-        memory = MemorySaver()
-        app = workflow.compile(checkpointer=memory)
+        # Compile with bounded memory (message window, idle threads evicted)
+        if self.memory is None:
+            self.memory = create_checkpointer()
+        app = workflow.compile(checkpointer=self.memory)
 
         return app
 
@@ -283,6 +353,163 @@ SELALU tampilkan hasil lengkap dari tool.
         text_lower = text.lower()
         return any(keyword in text_lower for keyword in keywords)
 
+    def _precheck(self, user_message: str):
+        """Canned reply when the message cannot go to the agent, else None"""
+        if not self.llm or not self.agent:
+            return {"text": "Error: Chatbot belum diinisialisasi. Pastikan GOOGLE_API_KEY sudah diset."}
+
+        # Check if music-related
+        if not self.is_music_related(user_message):
+            return {"text": "Maaf, saya hanya dapat membantu rekomendasi musik berdasarkan mood. Coba tanya tentang musik yuk! 🎵"}
+
+        return None
+
+    def _build_response(self, messages) -> Dict[str, Any]:
+        """
+        Reply dict from the messages of one agent turn
+
+        Args:
+            messages: AI and tool messages produced for the latest user message
+
+        Returns:
+            Dictionary with 'text' and optionally 'songs' (full song data)
+        """
+        # Get last message
+        response_text = message_text(messages[-1].content) if messages else ""
+
+        # Extract full song data from tool results
+        songs = []
+        for message in messages:
+            if isinstance(message, ToolMessage):
+                # Check if this is a recommend_music tool result
+                tool_result = tool_content(message)
+                if isinstance(tool_result, dict) and "recommendations" in tool_result:
+                    # Extract full song data from recommendations
+                    for song in tool_result["recommendations"]:
+                        songs.append({
+                            "title": song.get("title", "Unknown"),
+                            "artist": song.get("artist", "Unknown Artist"),
+                            "album": song.get("album", "Unknown Album"),
+                            "genre": song.get("genre", "Unknown"),
+                            "popularity": song.get("popularity", 0),
+                            "track_id": song.get("track_id", "")
+                        })
+
+        # Return both text and full song data
+        response = {"text": response_text}
+        if songs:
+            response["songs"] = songs
+
+        return response
+
+    def _route(self, user_message: str):
+        """Mood of a message the intent router can answer locally, else None"""
+        if self.intent_router is None:
+            return None
+        decision = self.intent_router.route(user_message)
+        return decision if decision.mood else None
+
+    @staticmethod
+    def _format_recommendations(mood: str, songs: List[Dict[str, Any]], language: str) -> str:
+        """Reply in the system prompt's FORMAT OUTPUT WAJIB"""
+        header = f"**Song Recommendations for Mood {mood}:**" if language == "en" else f"**Rekomendasi Lagu untuk Mood {mood}:**"
+        lines = [header, ""]
+        for i, song in enumerate(songs, 1):
+            lines.append(f"{i}. **{song['title']}** - {song['artist']}")
+            lines.append(f"   Genre: {song['genre']} | Popularity: {song['popularity']}")
+            lines.append("")
+        lines.append(EMPATHY_LINES[language][mood])
+        return "\n".join(lines)
+
+    def _local_turn(self, user_message: str, decision) -> List[Any]:
+        """
+        Messages of a turn answered without the LLM
+
+        Same shape as an agent turn (tool call, tool result, answer), so the
+        checkpointed thread and _build_response treat it like any other.
+        """
+        result = self._recommend_music(decision.mood)
+        if "recommendations" in result:
+            text = self._format_recommendations(decision.mood, result["recommendations"], decision.language)
+        else:
+            text = result["error"]
+
+        call_id = f"local_{uuid.uuid4().hex}"
+        return [
+            HumanMessage(content=user_message),
+            AIMessage(content="", tool_calls=[{"name": "recommend_music", "args": {"mood": decision.mood}, "id": call_id}]),
+            ToolMessage(content=compact_json(self._prompt_payload(result)), artifact=result,
+                        name="recommend_music", tool_call_id=call_id),
+            AIMessage(content=text),
+        ]
+
+    def routing_stats(self) -> Dict[str, Any]:
+        """
+        How many messages were answered locally vs by the LLM
+
+        Returns:
+            Dictionary from MoodIntentRouter.stats() (messages, local, llm,
+            local_fraction, llm_reasons), or None when local routing is off
+        """
+        return self.intent_router.stats() if self.intent_router is not None else None
+
+    @property
+    def music_df(self):
+        """Current catalogue: the DataFrame given, or the data provider's frame"""
+        if isinstance(self.data_source, pd.DataFrame):
+            return self.data_source
+        return self.data_source.df
+
+    def _cache_version(self):
+        """Data version of cached turns: the provider's revision (a DataFrame given as is never changes)"""
+        if isinstance(self.data_source, pd.DataFrame):
+            return 0
+        return self.data_source.revision
+
+    def _cached_turn(self, user_message: str, messages):
+        """
+        Stored turn for a message, looked up in the thread's current context
+
+        Args:
+            user_message: User's message
+            messages: Checkpointed messages of the thread so far
+
+        Returns:
+            Tuple (cached {'messages', 'response'} or None, context for _cache_turn)
+        """
+        if self.response_cache is None:
+            return None, None
+        context = thread_context(messages)
+        return self.response_cache.lookup(user_message, context, version=self._cache_version()), context
+
+    def _cache_turn(self, user_message: str, context, messages, response: Dict[str, Any]):
+        """Store a completed agent turn (empty answers are not cached)"""
+        if self.response_cache is not None and response.get("text"):
+            self.response_cache.store(user_message, {"messages": messages, "response": response},
+                                      context, version=self._cache_version())
+
+    def _record_turn(self, config, history, turn):
+        """Add a turn answered without the agent to the thread, trimming it to max_turns"""
+        self.agent.update_state(config, {"messages": window_update(history, turn, self.max_turns)}, as_node="agent")
+
+    async def _arecord_turn(self, config, history, turn):
+        """Async variant of _record_turn"""
+        await self.agent.aupdate_state(config, {"messages": window_update(history, turn, self.max_turns)}, as_node="agent")
+
+    def cache_stats(self) -> Dict[str, Any]:
+        """Hit/miss counters of the response cache (None when caching is off)"""
+        return self.response_cache.stats() if self.response_cache is not None else None
+
+    def token_stats(self) -> Dict[str, Any]:
+        """
+        Prompt tokens of all agent turns, sent vs without the token budget
+
+        Returns:
+            Dictionary from TokenBudget.stats() (turns, llm_calls, prompt_tokens,
+            baseline_tokens, saved_tokens, saved_fraction)
+        """
+        return self.token_budget.stats()
+
     def chat(self, user_message: str, thread_id: str = "default") -> Dict[str, Any]:
         """
         Main chat function
@@ -292,77 +519,158 @@ SELALU tampilkan hasil lengkap dari tool.
             thread_id: Thread ID for conversation (default: "default")
 
         Returns:
-            Dictionary with 'text' and optionally 'songs' (full song data)
+            Dictionary with 'text' and optionally 'songs' (full song data); turns
+            that ran the agent also carry 'usage', the token report of
+            TokenBudget.end_turn()
         """
-        if not self.llm or not self.agent:
-            return {"text": "Error: Chatbot belum diinisialisasi. Pastikan GOOGLE_API_KEY sudah diset."}
+        config = {"configurable": {"thread_id": thread_id}}
 
-        # Check if music-related
-        if not self.is_music_related(user_message):
-            return {"text": "Maaf, saya hanya dapat membantu rekomendasi musik berdasarkan mood. Coba tanya tentang musik yuk! 🎵"}
+        # Plain mood requests are answered without an LLM round-trip
+        decision = self._route(user_message)
+        if decision is not None:
+            try:
+                turn = self._local_turn(user_message, decision)
+                if self.agent:
+                    # Keep the thread complete for follow-ups that do reach the LLM
+                    self._record_turn(config, self.agent.get_state(config).values.get("messages", []), turn)
+                return self._build_response(turn[1:])
+            except Exception as e:
+                return {"text": f"Maaf, terjadi error: {str(e)}"}
+
+        early = self._precheck(user_message)
+        if early is not None:
+            return early
 
         try:
+            # Repeated questions are replayed from the cache without a network call
+            history = self.agent.get_state(config).values.get("messages", [])
+            cached, context = self._cached_turn(user_message, history)
+            if cached is not None:
+                self._record_turn(config, history, replay_turn(user_message, cached["messages"]))
+                return dict(cached["response"])
+
             # Invoke agent
-            config = {"configurable": {"thread_id": thread_id}}
+            self.token_budget.start_turn(thread_id)
             result = self.agent.invoke(
                 {"messages": [HumanMessage(content=user_message)]},
                 config=config
             )
 
-            # Get last message
-            last_message = result["messages"][-1]
-            response_text = last_message.content
-
-            # Extract full song data from tool results
-            songs = []
-            for message in result["messages"]:
-                if isinstance(message, ToolMessage):
-                    # Check if this is a recommend_music tool result
-                    try:
-                        # Parse the tool result
-                        tool_result = json.loads(message.content)
-                        if "recommendations" in tool_result:
-                            # Extract full song data from recommendations
-                            for song in tool_result["recommendations"]:
-                                songs.append({
-                                    "title": song.get("title", "Unknown"),
-                                    "artist": song.get("artist", "Unknown Artist"),
-                                    "album": song.get("album", "Unknown Album"),
-                                    "genre": song.get("genre", "Unknown"),
-                                    "popularity": song.get("popularity", 0),
-                                    "track_id": song.get("track_id", "")
-                                })
-                    except (json.JSONDecodeError, TypeError, KeyError):
-                        # If parsing fails, skip this message
-                        continue
-
-            # Return both text and full song data
-            response = {"text": response_text}
-            if songs:
-                response["songs"] = songs
-
-            return response
+            # Only this turn's messages (the thread keeps earlier tool results)
+            messages = current_turn(result["messages"])
+            response = self._build_response(messages)
+            self._cache_turn(user_message, context, messages, response)
+            return {**response, "usage": self.token_budget.end_turn(thread_id)}
 
         except Exception as e:
             return {"text": f"Maaf, terjadi error: {str(e)}"}
 
+    async def astream(self, user_message: str, thread_id: str = "default") -> AsyncIterator[Dict[str, Any]]:
+        """
+        Stream a reply as it is generated
+
+        Args:
+            user_message: User's message
+            thread_id: Thread ID for conversation (default: "default")
+
+        Yields:
+            Event dicts (see utils/chat_stream.py): 'token', 'tool_call' and
+            'tool_result' while the agent runs, then one 'done' event carrying
+            the same 'text' / 'songs' (and 'usage') as chat()
+        """
+        config = {"configurable": {"thread_id": thread_id}}
+
+        decision = self._route(user_message)
+        if decision is not None:
+            try:
+                turn = self._local_turn(user_message, decision)
+                if self.agent:
+                    state = await self.agent.aget_state(config)
+                    await self._arecord_turn(config, state.values.get("messages", []), turn)
+            except Exception as e:
+                yield {"type": "done", "text": f"Maaf, terjadi error: {str(e)}"}
+                return
+            for event in turn_events(turn[1:]):
+                yield event
+            yield {"type": "done", **self._build_response(turn[1:])}
+            return
+
+        early = self._precheck(user_message)
+        if early is not None:
+            yield {"type": "done", **early}
+            return
+
+        try:
+            state = await self.agent.aget_state(config)
+            cached, context = self._cached_turn(user_message, state.values.get("messages", []))
+            if cached is not None:
+                turn = replay_turn(user_message, cached["messages"])
+                await self._arecord_turn(config, state.values.get("messages", []), turn)
+                for event in turn_events(turn[1:]):
+                    yield event
+                yield {"type": "done", **cached["response"]}
+                return
+
+            self.token_budget.start_turn(thread_id)
+            turn = AgentStream(self.agent, user_message, config)
+            async for event in turn.events():
+                yield event
+            response = self._build_response(turn.messages)
+            self._cache_turn(user_message, context, turn.messages, response)
+            response = {**response, "usage": self.token_budget.end_turn(thread_id)}
+        except Exception as e:
+            response = {"text": f"Maaf, terjadi error: {str(e)}"}
+
+        yield {"type": "done", **response}
+
+    async def achat(self, user_message: str, thread_id: str = "default") -> Dict[str, Any]:
+        """
+        Async chat, returning the same dictionary as chat()
+
+        Args:
+            user_message: User's message
+            thread_id: Thread ID for conversation (default: "default")
+
+        Returns:
+            Dictionary with 'text' and optionally 'songs' (full song data)
+        """
+        response = {}
+        async for event in self.astream(user_message, thread_id):
+            if event["type"] == "done":
+                response = {key: value for key, value in event.items() if key != "type"}
+        return response
+
     def clear_history(self):
         """Clear chat history"""
         self.chat_history = []
 
 
 # Convenience function for easy import
-def create_chatbot(music_df, model=None, label_encoder=None, api_key=None):
+def create_chatbot(music_df, model=None, label_encoder=None, api_key=None, llm=None, local_routing=True,
+                   cache_size=256, cache_ttl=600.0, max_turns=DEFAULT_MAX_TURNS, memory=None,
+                   max_history_tokens=DEFAULT_HISTORY_TOKENS, valence_threshold=VALENCE_THRESHOLD,
+                   energy_threshold=ENERGY_THRESHOLD):
     """
     Create a music chatbot instance
 
     Args:
-        music_df: DataFrame with music data
+        music_df: DataFrame with music data, or a data provider with .df and
+            .revision (e.g. MusicRecommendationEngine)
         model: Trained ML model (optional)
         label_encoder: Label encoder (optional)
         api_key: Google API key (optional)
+        llm: Chat model to use instead of Gemini (optional)
+        local_routing: Answer plain mood requests without the LLM (default: True)
+        cache_size: Agent turns kept in the response cache (0 disables it)
+        cache_ttl: Seconds a cached turn stays valid (None = no expiry)
+        max_turns: User turns of a thread kept and sent to the LLM
+        memory: LangGraph checkpointer (optional)
+        max_history_tokens: Tokens of earlier turns sent with each LLM call
+        valence_threshold: Valence threshold of the rule-based mood fallback
+        energy_threshold: Energy threshold of the rule-based mood fallback
 
     Returns:
         MusicLLMChatbot instance
     """
-    return MusicLLMChatbot(music_df, model, label_encoder, api_key)
+    return MusicLLMChatbot(music_df, model, label_encoder, api_key, llm, local_routing, cache_size, cache_ttl,
+                           max_turns, memory, max_history_tokens, valence_threshold, energy_threshold)
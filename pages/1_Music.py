@@ -12,6 +12,8 @@ sys.path.append(os.path.dirname(os.path.dirname(__file__)))
 
 from utils.music_engine import MusicRecommendationEngine
 from utils.chatbot_engine import MusicChatbot
+from utils.chat_stream import run_stream
+from utils.mood_rules import classify_mood
 from utils.visualizations import (
     create_mood_pie_chart,
     create_valence_energy_scatter,
@@ -140,19 +142,24 @@ with col_title:
 
 st.divider()
 
+# Engine constructor options (MusicRecommendationEngine); each distinct set
+# is loaded once and cached as its own engine
+MUSIC_ENGINE_OPTIONS = {}
+
 # Initialize engine
 @st.cache_resource
-def load_music_engine():
-    return MusicRecommendationEngine()
+def load_music_engine(**options):
+    """Initialize music engine, cached per constructor options"""
+    return MusicRecommendationEngine(**options)
 
 @st.cache_resource
-def load_chatbot(_engine):
-    """Initialize chatbot with music engine"""
+def load_chatbot(_engine, **engine_options):
+    """Initialize chatbot with music engine, one per engine options"""
     return MusicChatbot(_engine)
 
 with st.spinner("🎵 Loading music library..."):
-    engine = load_music_engine()
-    chatbot = load_chatbot(engine)
+    engine = load_music_engine(**MUSIC_ENGINE_OPTIONS)
+    chatbot = load_chatbot(engine, **MUSIC_ENGINE_OPTIONS)
 
 # Filters
 st.write("")  # Spacing
@@ -364,14 +371,7 @@ elif selected_tab == "🎯 Predict Mood":
             predicted_mood = engine.label_encoder.inverse_transform([prediction])[0]
         else:
             # Rule-based fallback
-            if valence >= 0.5 and energy >= 0.5:
-                predicted_mood = 'Happy'
-            elif valence < 0.5 and energy < 0.5:
-                predicted_mood = 'Sad'
-            elif valence >= 0.5 and energy < 0.5:
-                predicted_mood = 'Calm'
-            else:
-                predicted_mood = 'Tense'
+            predicted_mood = classify_mood(valence, energy, engine.valence_threshold, engine.energy_threshold)
 
         # Display result - Full page design
         st.write("")
@@ -662,13 +662,26 @@ elif selected_tab == "💬 Chat Assistant":
 
                     # Get bot response with error handling
                     try:
-                        with st.spinner("🎵 Thinking..."):
-                            # Generate unique thread_id per session
-                            if 'thread_id' not in st.session_state:
-                                import uuid
-                                st.session_state.thread_id = str(uuid.uuid4())
-
-                            bot_response = chatbot.chat(user_message, thread_id=st.session_state.thread_id)
+                        # Generate unique thread_id per session
+                        if 'thread_id' not in st.session_state:
+                            import uuid
+                            st.session_state.thread_id = str(uuid.uuid4())
+
+                        # Render the reply as it streams in
+                        progress = st.empty()
+                        progress.info("🎵 Thinking...")
+
+                        def show_progress(text, event):
+                            if event['type'] == 'tool_call':
+                                progress.info("🎵 Mencari lagu...")
+                            elif text:
+                                progress.markdown(text + " ▌")
+
+                        bot_response = run_stream(
+                            chatbot.astream(user_message, thread_id=st.session_state.thread_id),
+                            show_progress
+                        )
+                        progress.empty()
 
                         # Handle dictionary response (with text and optional songs)
                         if isinstance(bot_response, dict):
@@ -734,6 +747,18 @@ elif selected_tab == "💬 Chat Assistant":
                 st.markdown("### 📊 Stats")
                 st.metric("Messages", len(st.session_state.chat_history))
                 st.metric("Model", "Gemini 2.5")
+                routing = chatbot.routing_stats()
+                if routing and routing['messages']:
+                    st.metric("Answered locally", f"{routing['local_fraction']:.0%}",
+                              help="Mood requests answered by the local intent router without a Gemini call (all sessions)")
+                cache = chatbot.cache_stats()
+                if cache and cache['hits'] + cache['misses']:
+                    st.metric("Cache hit rate", f"{cache['hit_rate']:.0%}",
+                              help="Repeated questions replayed from the response cache (all sessions)")
+                tokens = chatbot.token_stats()
+                if tokens['llm_calls']:
+                    st.metric("Prompt tokens saved", f"{tokens['saved_fraction']:.0%}",
+                              help="Gemini prompt tokens saved by trimmed tool payloads and history (all sessions)")
                 st.caption("Powered by Google AI")
 
 elif selected_tab == "📊 Analytics":
@@ -13,6 +13,7 @@ sys.path.append(os.path.dirname(os.path.dirname(__file__)))
 
 from utils.film_engine import FilmRecommendationEngine
 from utils.film_chatbot_engine import FilmChatbot
+from utils.chat_stream import run_stream
 from utils.visualizations import (
     create_rating_histogram,
     create_year_line_chart,
@@ -147,19 +148,24 @@ with col_title:
 
 st.divider()
 
+# Engine constructor options (FilmRecommendationEngine); each distinct set
+# is loaded once and cached as its own engine
+FILM_ENGINE_OPTIONS = {}
+
 # Initialize engine
 @st.cache_resource
-def load_film_engine():
-    return FilmRecommendationEngine()
+def load_film_engine(**options):
+    """Initialize film engine, cached per constructor options"""
+    return FilmRecommendationEngine(**options)
 
 @st.cache_resource
-def load_film_chatbot(_engine):
-    """Initialize chatbot with film engine"""
+def load_film_chatbot(_engine, **engine_options):
+    """Initialize chatbot with film engine, one per engine options"""
     return FilmChatbot(_engine)
 
 with st.spinner("🎬 Loading film database..."):
-    engine = load_film_engine()
-    film_chatbot = load_film_chatbot(engine)
+    engine = load_film_engine(**FILM_ENGINE_OPTIONS)
+    film_chatbot = load_film_chatbot(engine, **FILM_ENGINE_OPTIONS)
 
 # Horizontal filters at top
 st.write("")  # Spacing
@@ -199,6 +205,13 @@ selected_genres = st.multiselect(
     placeholder="Select genres...",
     label_visibility="visible"
 )
+genre_match = st.radio(
+    "Genre match",
+    options=["any", "all", "none"],
+    format_func={"any": "Any selected genre", "all": "All selected genres", "none": "None of the selected genres"}.get,
+    horizontal=True,
+    label_visibility="collapsed"
+)
 
 st.write("")
 
@@ -239,11 +252,15 @@ if selected_tab == "🎬 Recommendations":
             # Search by title
             results = engine.search_by_title(search_query, fuzzy=True)
 
+            # Nothing matched literally: fall back to typo-tolerant matching
+            if results.empty:
+                results = engine.match_titles(search_query, n=5)
+
             if not results.empty:
                 st.success(f"Found {len(results)} film(s) matching '{search_query}'")
 
                 # Show main film
-                main_film = results.iloc[0]
+                main_film = results.head(1).iloc[0]
 
                 with st.container(border=True):
                     st.markdown(f"### {main_film['title']}")
@@ -308,14 +325,22 @@ if selected_tab == "🎬 Recommendations":
                 min_rating=rating_range[0],
                 max_rating=rating_range[1],
                 year=selected_year,
-                genres=selected_genres if selected_genres else None
+                genres=selected_genres if selected_genres else None,
+                genre_match=genre_match
             )
 
+            # Start from the first page whenever the filters change
+            filter_key = (rating_range, selected_year, tuple(selected_genres), genre_match)
+            if st.session_state.get('film_filter_key') != filter_key:
+                st.session_state.film_filter_key = filter_key
+                st.session_state.film_pages_shown = 1
+
             if not results.empty:
-                st.success(f"Found {len(results)} film(s) matching your criteria")
+                st.success(f"Found {results.total} film(s) matching your criteria")
 
-                # Display top results
-                display_count = min(20, len(results))
+                # Only the pages on screen are materialized
+                pages_shown = min(st.session_state.film_pages_shown, results.n_pages)
+                display_count = min(pages_shown * results.page_size, results.total)
 
                 for idx, film in results.head(display_count).iterrows():
                     with st.container(border=True):
@@ -338,8 +363,11 @@ if selected_tab == "🎬 Recommendations":
                             platform_html += '</div>'
                             st.markdown(platform_html, unsafe_allow_html=True)
 
-                if len(results) > display_count:
-                    st.info(f"Showing top {display_count} results. Refine filters for more specific results.")
+                if results.total > display_count:
+                    st.caption(f"Showing {display_count} of {results.total} results")
+                    if st.button("Show more", key="film_show_more"):
+                        st.session_state.film_pages_shown += 1
+                        st.rerun()
 
             else:
                 st.warning("No films found matching your criteria. Try adjusting the filters.")
@@ -586,8 +614,20 @@ elif selected_tab == "💬 Chat Assistant":
 
                     # Get bot response with error handling
                     try:
-                        with st.spinner("🎬 Thinking..."):
-                            bot_response = film_chatbot.chat(user_msg_to_process, thread_id=st.session_state.film_thread_id)
+                        # Render the reply as it streams in
+                        progress = st.empty()
+
+                        def show_progress(text, event):
+                            if event['type'] == 'tool_call':
+                                progress.info("🎬 Mencari film...")
+                            elif text:
+                                progress.markdown(text + " ▌")
+
+                        bot_response = run_stream(
+                            film_chatbot.astream(user_msg_to_process, thread_id=st.session_state.film_thread_id),
+                            show_progress
+                        )
+                        progress.empty()
 
                         # Handle dictionary response
                         if isinstance(bot_response, dict):
@@ -655,6 +695,14 @@ elif selected_tab == "💬 Chat Assistant":
                 st.markdown("### 📊 Stats")
                 st.metric("Messages", len(st.session_state.film_chat_history))
                 st.metric("Model", "Gemini 2.5")
+                cache = film_chatbot.cache_stats()
+                if cache and cache['hits'] + cache['misses']:
+                    st.metric("Cache hit rate", f"{cache['hit_rate']:.0%}",
+                              help="Repeated questions replayed from the response cache (all sessions)")
+                tokens = film_chatbot.token_stats()
+                if tokens['llm_calls']:
+                    st.metric("Prompt tokens saved", f"{tokens['saved_fraction']:.0%}",
+                              help="Gemini prompt tokens saved by trimmed tool payloads and history (all sessions)")
                 st.caption("Powered by Google AI")
 
 elif selected_tab == "📊 Analytics":
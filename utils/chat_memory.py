@@ -0,0 +1,212 @@
+"""
+Chat Memory
+Bounded LangGraph checkpointers for the music and film chatbots
+
+MemorySaver keeps every checkpoint of every thread forever, and each session
+gets a new thread, so memory grows for as long as the app runs. The agents
+that build on this module store conversations in three bounded layers:
+
+- Message window: each thread keeps its last max_turns user turns. Older
+  messages are removed from the graph state with RemoveMessage, so they are
+  neither stored nor resent to the model.
+- Checkpoint pruning: only the latest checkpoint of a thread is kept,
+  together with its channel blobs and pending writes. The chatbots never
+  time-travel, so earlier checkpoints are dead weight.
+- Thread eviction: threads idle for longer than idle_ttl, and the least
+  recently used threads beyond max_threads, are deleted.
+
+create_checkpointer() returns the in-process BoundedMemorySaver, or the
+on-disk BoundedSqliteSaver (utils/chat_memory_sqlite.py, which needs the
+optional langgraph-checkpoint-sqlite package) when a path is given.
+
+Pruning assumes plain (non-Delta) channels such as MessagesState, whose
+latest checkpoint holds the full state.
+"""
+
+import os
+import threading
+import time
+from collections import OrderedDict
+
+from langchain_core.messages import HumanMessage, RemoveMessage
+from langgraph.checkpoint.memory import InMemorySaver
+
+DEFAULT_MAX_TURNS = 10
+DEFAULT_MAX_THREADS = 1000
+DEFAULT_IDLE_TTL = 6 * 3600.0
+
+
+def stale_messages(messages, max_turns=DEFAULT_MAX_TURNS):
+    """
+    Messages that fall outside the window of the last max_turns user turns
+
+    The cut is made at a HumanMessage, so a tool call is never separated from
+    its result.
+
+    Args:
+        messages: Thread messages, oldest first
+        max_turns (int): User turns to keep (None keeps everything)
+
+    Returns:
+        list: The leading messages to drop
+    """
+    if max_turns is None:
+        return []
+    starts = [i for i, message in enumerate(messages) if isinstance(message, HumanMessage)]
+    if len(starts) <= max_turns:
+        return []
+    return list(messages[:starts[-max_turns]])
+
+
+def remove_messages(messages):
+    """RemoveMessage markers for stored messages (the add_messages reducer deletes them by id)"""
+    return [RemoveMessage(id=message.id) for message in messages if message.id]
+
+
+def window_update(history, turn, max_turns=DEFAULT_MAX_TURNS):
+    """
+    State update that appends a finished turn and trims the window
+
+    Args:
+        history: Messages already in the thread
+        turn: New messages of the turn (HumanMessage first)
+        max_turns (int): User turns to keep
+
+    Returns:
+        list: RemoveMessage markers for stale history followed by the turn
+    """
+    return remove_messages(stale_messages(list(history) + list(turn), max_turns)) + list(turn)
+
+
+class BoundedMemorySaver(InMemorySaver):
+    """
+    InMemorySaver that keeps one checkpoint per thread and evicts idle threads
+
+    Thread-safe: the chatbots are shared across Streamlit sessions.
+    """
+
+    def __init__(self, max_threads=DEFAULT_MAX_THREADS, idle_ttl=DEFAULT_IDLE_TTL):
+        """
+        Args:
+            max_threads (int): Threads kept (least recently used evicted first)
+            idle_ttl (float): Seconds without activity before a thread is evicted (None = never)
+        """
+        super().__init__()
+        self.max_threads = max_threads
+        self.idle_ttl = idle_ttl
+        self._last_used = OrderedDict()
+        self._lock = threading.RLock()
+        self.evictions = 0
+
+    def _touch(self, thread_id):
+        with self._lock:
+            self._last_used[thread_id] = time.monotonic()
+            self._last_used.move_to_end(thread_id)
+
+    def get_tuple(self, config):
+        with self._lock:
+            thread_id = config["configurable"]["thread_id"]
+            saved = super().get_tuple(config)
+            if saved is not None:
+                self._touch(thread_id)
+            elif thread_id not in self._last_used:
+                # InMemorySaver's defaultdict storage adds an empty entry for every lookup
+                self.storage.pop(thread_id, None)
+            return saved
+
+    def put(self, config, checkpoint, metadata, new_versions):
+        with self._lock:
+            saved = super().put(config, checkpoint, metadata, new_versions)
+            thread_id = config["configurable"]["thread_id"]
+            self._prune(thread_id, config["configurable"]["checkpoint_ns"], checkpoint["id"])
+            self._touch(thread_id)
+            self.evict(keep=thread_id)
+            return saved
+
+    def put_writes(self, config, writes, task_id, task_path=""):
+        with self._lock:
+            super().put_writes(config, writes, task_id, task_path)
+
+    def _prune(self, thread_id, checkpoint_ns, checkpoint_id):
+        """Drop every checkpoint of a thread namespace except checkpoint_id, with its blobs and writes"""
+        checkpoints = self.storage[thread_id][checkpoint_ns]
+        stale = [cid for cid in checkpoints if cid != checkpoint_id]
+        if not stale:
+            return
+
+        # Every blob was written as the current version of some checkpoint, so
+        # the stale checkpoints' versions cover everything that can go
+        current = self.serde.loads_typed(checkpoints[checkpoint_id][0])["channel_versions"]
+        for cid in stale:
+            versions = self.serde.loads_typed(checkpoints.pop(cid)[0])["channel_versions"]
+            self.writes.pop((thread_id, checkpoint_ns, cid), None)
+            for channel, version in versions.items():
+                if current.get(channel) != version:
+                    self.blobs.pop((thread_id, checkpoint_ns, channel, version), None)
+
+    def evict(self, keep=None):
+        """
+        Delete idle threads and the least recently used ones beyond max_threads
+
+        Args:
+            keep (str, optional): Thread that must survive (the one being written)
+
+        Returns:
+            int: Threads deleted
+        """
+        evicted = 0
+        with self._lock:
+            cutoff = time.monotonic() - self.idle_ttl if self.idle_ttl is not None else None
+            for thread_id, last_used in list(self._last_used.items()):
+                if len(self._last_used) <= self.max_threads and (cutoff is None or last_used >= cutoff):
+                    break
+                if thread_id != keep:
+                    self.delete_thread(thread_id)
+                    evicted += 1
+            self.evictions += evicted
+        return evicted
+
+    def delete_thread(self, thread_id):
+        with self._lock:
+            super().delete_thread(thread_id)
+            self._last_used.pop(thread_id, None)
+
+    def stats(self):
+        """
+        Memory counters
+
+        Returns:
+            dict: threads, checkpoints, blobs and evictions so far
+        """
+        with self._lock:
+            return {
+                'threads': len(self._last_used),
+                'checkpoints': sum(len(ns) for thread in self.storage.values() for ns in thread.values()),
+                'blobs': len(self.blobs),
+                'evictions': self.evictions,
+            }
+
+
+def create_checkpointer(path=None, max_threads=DEFAULT_MAX_THREADS, idle_ttl=DEFAULT_IDLE_TTL):
+    """
+    Bounded checkpointer for a chatbot agent
+
+    Args:
+        path (str, optional): SQLite file for on-disk memory; defaults to the
+            CHAT_MEMORY_PATH environment variable, in-process when unset
+        max_threads (int): Threads kept (least recently used evicted first)
+        idle_ttl (float): Seconds without activity before a thread is evicted
+
+    Returns:
+        BoundedMemorySaver or BoundedSqliteSaver
+    """
+    path = path or os.getenv("CHAT_MEMORY_PATH")
+    if not path:
+        return BoundedMemorySaver(max_threads=max_threads, idle_ttl=idle_ttl)
+
+    try:
+        from utils.chat_memory_sqlite import BoundedSqliteSaver
+    except ImportError:
+        raise ImportError("On-disk chat memory requires langgraph-checkpoint-sqlite: "
+                          "pip install langgraph-checkpoint-sqlite")
+    return BoundedSqliteSaver.open(path, max_threads=max_threads, idle_ttl=idle_ttl)
@@ -0,0 +1,152 @@
+"""
+Chat Memory (SQLite)
+On-disk counterpart of BoundedMemorySaver
+
+Needs the optional langgraph-checkpoint-sqlite package; use
+utils.chat_memory.create_checkpointer(path) rather than importing this
+module directly. Conversations survive restarts, and the same bounds apply:
+one checkpoint per thread, idle and least recently used threads deleted.
+Last-use times are kept in a thread_access table, so eviction also covers
+threads written before a restart.
+
+SqliteSaver itself has no async methods. The bounded saver runs them
+synchronously, the same way InMemorySaver does, so the chatbots' astream()
+and achat() work with either backend.
+"""
+
+import sqlite3
+import time
+
+from langgraph.checkpoint.sqlite import SqliteSaver
+
+from utils.chat_memory import DEFAULT_IDLE_TTL, DEFAULT_MAX_THREADS
+
+
+class BoundedSqliteSaver(SqliteSaver):
+    """
+    SqliteSaver that keeps one checkpoint per thread and evicts idle threads
+    """
+
+    def __init__(self, conn, max_threads=DEFAULT_MAX_THREADS, idle_ttl=DEFAULT_IDLE_TTL):
+        """
+        Args:
+            conn (sqlite3.Connection): Connection opened with check_same_thread=False
+            max_threads (int): Threads kept (least recently used evicted first)
+            idle_ttl (float): Seconds without activity before a thread is evicted (None = never)
+        """
+        super().__init__(conn)
+        self.max_threads = max_threads
+        self.idle_ttl = idle_ttl
+        self.evictions = 0
+
+    @classmethod
+    def open(cls, path, **limits):
+        """Saver on a SQLite file (created if missing)"""
+        return cls(sqlite3.connect(path, check_same_thread=False), **limits)
+
+    def setup(self):
+        # Called by cursor() with the lock held
+        if self.is_setup:
+            return
+        super().setup()
+        self.conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS thread_access (
+                thread_id TEXT PRIMARY KEY,
+                last_used REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS thread_access_last_used ON thread_access (last_used);
+            """
+        )
+
+    def _touch(self, thread_id):
+        with self.cursor() as cur:
+            cur.execute(
+                "INSERT INTO thread_access (thread_id, last_used) VALUES (?, ?) "
+                "ON CONFLICT (thread_id) DO UPDATE SET last_used = excluded.last_used",
+                (str(thread_id), time.time()),
+            )
+
+    def get_tuple(self, config):
+        saved = super().get_tuple(config)
+        if saved is not None:
+            self._touch(config["configurable"]["thread_id"])
+        return saved
+
+    def put(self, config, checkpoint, metadata, new_versions):
+        saved = super().put(config, checkpoint, metadata, new_versions)
+        thread_id = str(config["configurable"]["thread_id"])
+        checkpoint_ns = config["configurable"]["checkpoint_ns"]
+        with self.cursor() as cur:
+            # Channel values are stored inline, so the latest checkpoint is self-contained
+            cur.execute(
+                "DELETE FROM checkpoints WHERE thread_id = ? AND checkpoint_ns = ? AND checkpoint_id != ?",
+                (thread_id, checkpoint_ns, checkpoint["id"]),
+            )
+            cur.execute(
+                "DELETE FROM writes WHERE thread_id = ? AND checkpoint_ns = ? AND checkpoint_id != ?",
+                (thread_id, checkpoint_ns, checkpoint["id"]),
+            )
+        self._touch(thread_id)
+        self.evict(keep=thread_id)
+        return saved
+
+    def evict(self, keep=None):
+        """
+        Delete idle threads and the least recently used ones beyond max_threads
+
+        Args:
+            keep (str, optional): Thread that must survive (the one being written)
+
+        Returns:
+            int: Threads deleted
+        """
+        stale = set()
+        with self.cursor(transaction=False) as cur:
+            if self.idle_ttl is not None:
+                cur.execute("SELECT thread_id FROM thread_access WHERE last_used < ?", (time.time() - self.idle_ttl,))
+                stale.update(row[0] for row in cur.fetchall())
+            cur.execute("SELECT thread_id FROM thread_access ORDER BY last_used DESC LIMIT -1 OFFSET ?",
+                        (self.max_threads,))
+            stale.update(row[0] for row in cur.fetchall())
+        stale.discard(keep)
+
+        for thread_id in stale:
+            self.delete_thread(thread_id)
+        self.evictions += len(stale)
+        return len(stale)
+
+    def delete_thread(self, thread_id):
+        super().delete_thread(thread_id)
+        with self.cursor() as cur:
+            cur.execute("DELETE FROM thread_access WHERE thread_id = ?", (str(thread_id),))
+
+    def stats(self):
+        """
+        Memory counters
+
+        Returns:
+            dict: threads, checkpoints and evictions so far
+        """
+        with self.cursor(transaction=False) as cur:
+            threads = cur.execute("SELECT COUNT(*) FROM thread_access").fetchone()[0]
+            checkpoints = cur.execute("SELECT COUNT(*) FROM checkpoints").fetchone()[0]
+        return {'threads': threads, 'checkpoints': checkpoints, 'evictions': self.evictions}
+
+    # SqliteSaver has no async API; local SQLite calls are short, run them inline
+
+    async def aget_tuple(self, config):
+        return self.get_tuple(config)
+
+    async def alist(self, config, *, filter=None, before=None, limit=None):
+        for item in self.list(config, filter=filter, before=before, limit=limit):
+            yield item
+
+    async def aput(self, config, checkpoint, metadata, new_versions):
+        return self.put(config, checkpoint, metadata, new_versions)
+
+    async def aput_writes(self, config, writes, task_id, task_path=""):
+        return self.put_writes(config, writes, task_id, task_path)
+
+    async def adelete_thread(self, thread_id):
+        return self.delete_thread(thread_id)
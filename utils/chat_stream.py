@@ -0,0 +1,216 @@
+"""
+Chat Streaming
+Incremental events from a LangGraph agent turn
+
+Shared by the music and film chatbots. A turn is streamed with the graph's
+"messages" mode (LLM tokens as they are generated) and "updates" mode
+(complete messages per node), and turned into plain event dicts:
+
+    {"type": "token", "text": "..."}                      answer text so far, in pieces
+    {"type": "tool_call", "name": "...", "args": {...}}   the agent requested a tool
+    {"type": "tool_result", "name": "...", "content": ...} the tool returned (JSON parsed)
+
+The chatbots close a turn with {"type": "done", ...} carrying the same dict
+chat() returns. iter_events() and run_stream() drive an async event stream
+from synchronous code such as a Streamlit script.
+"""
+
+import asyncio
+import json
+import uuid
+
+from langchain_core.messages import AIMessage, AIMessageChunk, HumanMessage, RemoveMessage, ToolMessage
+
+
+def message_text(content):
+    """Plain text of a message content (a string or a list of content parts)"""
+    if isinstance(content, str):
+        return content
+    parts = []
+    for part in content or []:
+        if isinstance(part, str):
+            parts.append(part)
+        elif isinstance(part, dict) and part.get("type") == "text":
+            parts.append(part.get("text", ""))
+    return "".join(parts)
+
+
+def tool_content(message):
+    """
+    Tool result of a ToolMessage, JSON-decoded when possible
+
+    Tools that send the model a trimmed payload keep the full result on
+    message.artifact, which is returned instead.
+    """
+    if message.artifact is not None:
+        return message.artifact
+    content = message.content
+    if isinstance(content, str):
+        try:
+            return json.loads(content)
+        except json.JSONDecodeError:
+            return content
+    return content
+
+
+def current_turn(messages):
+    """Messages after the latest user message (the checkpointed thread keeps older turns)"""
+    for i in range(len(messages) - 1, -1, -1):
+        if isinstance(messages[i], HumanMessage):
+            return messages[i + 1:]
+    return list(messages)
+
+
+def turn_events(messages):
+    """
+    Events of a turn that is already complete (answered locally or from a cache)
+
+    Args:
+        messages: AI and tool messages of the turn, in order
+
+    Yields:
+        dict: tool_call / tool_result / token events, as AgentStream would emit them
+    """
+    for message in messages:
+        if isinstance(message, ToolMessage):
+            yield {"type": "tool_result", "name": message.name, "content": tool_content(message)}
+        elif isinstance(message, AIMessage):
+            for call in message.tool_calls:
+                yield {"type": "tool_call", "name": call["name"], "args": call["args"]}
+            text = message_text(message.content)
+            if text:
+                yield {"type": "token", "text": text}
+
+
+def replay_turn(user_message, messages):
+    """
+    A stored turn re-issued for another thread
+
+    Message ids are cleared (the checkpointer would otherwise replace the
+    originals) and tool call ids renewed, keeping calls and results paired.
+
+    Args:
+        user_message (str): The new user message
+        messages: AI and tool messages of the stored turn
+
+    Returns:
+        list: HumanMessage followed by fresh copies of the messages
+    """
+    ids = {}
+    turn = [HumanMessage(content=user_message)]
+    for message in messages:
+        if isinstance(message, ToolMessage):
+            turn.append(message.model_copy(update={"id": None, "tool_call_id": ids.get(message.tool_call_id, message.tool_call_id)}))
+        elif isinstance(message, AIMessage) and message.tool_calls:
+            calls = []
+            for call in message.tool_calls:
+                ids[call["id"]] = f"call_{uuid.uuid4().hex}"
+                calls.append({**call, "id": ids[call["id"]]})
+            turn.append(message.model_copy(update={"id": None, "tool_calls": calls}))
+        else:
+            turn.append(message.model_copy(update={"id": None}))
+    return turn
+
+
+class AgentStream:
+    """
+    One streamed agent turn
+
+    Iterate events() for token / tool_call / tool_result events; afterwards
+    messages holds the AI and tool messages of the turn in order.
+    """
+
+    def __init__(self, agent, user_message, config, llm_node="agent"):
+        """
+        Args:
+            agent: Compiled LangGraph agent
+            user_message (str): User's message
+            config (dict): Run config (thread_id for the checkpointer)
+            llm_node (str): Graph node whose LLM tokens are streamed
+        """
+        self.agent = agent
+        self.user_message = user_message
+        self.config = config
+        self.llm_node = llm_node
+        self.messages = []
+
+    async def events(self):
+        """Yield events as the graph produces them"""
+        streamed = False
+        async for mode, payload in self.agent.astream(
+            {"messages": [HumanMessage(content=self.user_message)]},
+            config=self.config,
+            stream_mode=["messages", "updates"],
+        ):
+            if mode == "messages":
+                chunk, metadata = payload
+                if metadata.get("langgraph_node") == self.llm_node and isinstance(chunk, AIMessageChunk):
+                    text = message_text(chunk.content)
+                    if text:
+                        streamed = True
+                        yield {"type": "token", "text": text}
+                continue
+
+            for update in payload.values():
+                for message in (update or {}).get("messages", []):
+                    if isinstance(message, RemoveMessage):
+                        # History trimming, not part of the turn
+                        continue
+                    self.messages.append(message)
+                    if isinstance(message, ToolMessage):
+                        yield {"type": "tool_result", "name": message.name, "content": tool_content(message)}
+                    elif isinstance(message, AIMessage):
+                        for call in message.tool_calls:
+                            yield {"type": "tool_call", "name": call["name"], "args": call["args"]}
+                        # Models that do not stream still surface their answer
+                        text = message_text(message.content)
+                        if text and not streamed:
+                            yield {"type": "token", "text": text}
+                        streamed = False
+
+
+def iter_events(events):
+    """
+    Iterate an async event stream from synchronous code
+
+    Args:
+        events: Async iterator, e.g. chatbot.astream(...)
+
+    Yields:
+        dict: The events, one at a time
+    """
+    loop = asyncio.new_event_loop()
+    try:
+        while True:
+            try:
+                yield loop.run_until_complete(events.__anext__())
+            except StopAsyncIteration:
+                break
+    finally:
+        loop.run_until_complete(events.aclose())
+        loop.close()
+
+
+def run_stream(events, on_update=None):
+    """
+    Drive a chatbot event stream from synchronous code
+
+    Args:
+        events: Async iterator from chatbot.astream(...)
+        on_update (callable, optional): Called as on_update(text_so_far, event)
+            for every token / tool event, e.g. to redraw a Streamlit placeholder
+
+    Returns:
+        dict: The reply of the 'done' event (same keys as chat())
+    """
+    text = ""
+    response = {}
+    for event in iter_events(events):
+        if event["type"] == "done":
+            response = {key: value for key, value in event.items() if key != "type"}
+            continue
+        if event["type"] == "token":
+            text += event["text"]
+        if on_update is not None:
+            on_update(text, event)
+    return response
@@ -22,20 +22,26 @@ class MusicChatbot(MusicLLMChatbot):
     Inherits all functionality from the music module
     """
 
-    def __init__(self, music_engine):
+    def __init__(self, music_engine, llm=None, local_routing=True):
         """
         Initialize chatbot with MusicRecommendationEngine
 
         Args:
             music_engine: MusicRecommendationEngine instance from Streamlit
+            llm: Chat model to use instead of Gemini (optional)
+            local_routing: Answer plain mood requests without the LLM (default: True)
         """
-        # Extract components from engine
-        music_df = music_engine.df
+        # The engine is the data provider: the chatbot reads its current
+        # catalogue and caches answers per engine revision
+        self.music_engine = music_engine
         model = music_engine.model
         label_encoder = music_engine.label_encoder
 
         # Initialize parent class
-        super().__init__(music_df, model, label_encoder)
+        # Same mood thresholds as the engine, so predict_mood agrees with the catalogue
+        super().__init__(music_engine, model, label_encoder, llm=llm, local_routing=local_routing,
+                         valence_threshold=music_engine.valence_threshold,
+                         energy_threshold=music_engine.energy_threshold)
 
 
 # Export for easy import in Streamlit
@@ -0,0 +1,151 @@
+"""
+Fake Chat Model
+Local stand-in for Gemini that streams tool calls, for running the chatbots offline
+
+LangChain's GenericFakeChatModel only streams text, so an agent step that
+should call a tool ends with "No generations found in stream". FakeToolChat
+answers every user message with one tool call, streamed as tool_call_chunks
+the way a provider does (name and id first, then the arguments in pieces),
+and answers the tool result with text streamed word by word:
+
+    chatbot = MusicChatbot(engine, llm=FakeToolChat(tool_name="recommend_music",
+                                                    tool_args={"mood": "sad"}))
+
+Check the astream() tool round-trip of both chatbots with:
+    python -m utils.fake_chat
+"""
+
+import asyncio
+import json
+import sys
+
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk, HumanMessage
+from langchain_core.messages.utils import count_tokens_approximately
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+
+# Characters of tool-call arguments per streamed chunk
+ARGS_CHUNK_CHARS = 8
+
+
+class FakeToolChat(BaseChatModel):
+    """
+    Scripted chat model: a tool call for each user message, then a text answer
+
+    Attributes:
+        tool_name (str): Tool called for each user message (None = answer directly)
+        tool_args (dict): Arguments of the tool call
+        answer (str): Text returned once the tool result is in
+    """
+
+    tool_name: str = None
+    tool_args: dict = {}
+    answer: str = "Berikut hasilnya dari dataset."
+    calls: int = 0
+
+    @property
+    def _llm_type(self):
+        return "fake-tool-chat"
+
+    def bind_tools(self, tools, **kwargs):
+        """Tools are not checked; the scripted call is made whatever is bound"""
+        return self
+
+    def _reply(self, messages):
+        self.calls += 1
+        if self.tool_name is not None and isinstance(messages[-1], HumanMessage):
+            call = {"name": self.tool_name, "args": self.tool_args, "id": f"call_fake_{self.calls}"}
+            return AIMessage(content="", tool_calls=[call])
+        return AIMessage(content=self.answer)
+
+    def _usage(self, messages, reply):
+        input_tokens = count_tokens_approximately(messages)
+        output_tokens = count_tokens_approximately([reply])
+        return {"input_tokens": input_tokens, "output_tokens": output_tokens,
+                "total_tokens": input_tokens + output_tokens}
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs):
+        reply = self._reply(messages)
+        reply.usage_metadata = self._usage(messages, reply)
+        return ChatResult(generations=[ChatGeneration(message=reply)])
+
+    def _stream(self, messages, stop=None, run_manager=None, **kwargs):
+        reply = self._reply(messages)
+        usage = self._usage(messages, reply)
+
+        if reply.tool_calls:
+            call = reply.tool_calls[0]
+            args = json.dumps(call["args"], ensure_ascii=False)
+            pieces = [args[i:i + ARGS_CHUNK_CHARS] for i in range(0, len(args), ARGS_CHUNK_CHARS)] or [""]
+            for i, piece in enumerate(pieces):
+                first = i == 0
+                yield ChatGenerationChunk(message=AIMessageChunk(
+                    content="",
+                    tool_call_chunks=[{"name": call["name"] if first else None, "args": piece,
+                                       "id": call["id"] if first else None, "index": 0}],
+                    usage_metadata=usage if i == len(pieces) - 1 else None,
+                ))
+            return
+
+        words = reply.content.split(" ")
+        for i, word in enumerate(words):
+            text = word if i == len(words) - 1 else word + " "
+            chunk = ChatGenerationChunk(message=AIMessageChunk(
+                content=text, usage_metadata=usage if i == len(words) - 1 else None))
+            if run_manager:
+                run_manager.on_llm_new_token(text, chunk=chunk)
+            yield chunk
+
+
+async def _round_trip(chatbot, message, items_key):
+    """Event types of one streamed turn and the 'done' event, checked for a full tool round-trip"""
+    events = [event async for event in chatbot.astream(message, thread_id="fake-chat-check")]
+    types = [event["type"] for event in events]
+    done = events[-1]
+    problems = []
+    if types[:2] != ["tool_call", "tool_result"]:
+        problems.append(f"expected tool_call, tool_result first, got {types}")
+    if "token" not in types:
+        problems.append("no token events after the tool result")
+    if types[-1] != "done" or done.get("text", "").startswith("Maaf"):
+        problems.append(f"turn did not finish: {done.get('text')}")
+    if not done.get(items_key):
+        problems.append(f"'done' carries no {items_key}")
+    return types, done, problems
+
+
+def main():
+    """Drive astream() of the music and film chatbots through a tool round-trip with FakeToolChat"""
+    # Imported here: the engines load the datasets
+    from utils.chatbot_engine import MusicChatbot
+    from utils.film_chatbot_engine import FilmChatbot
+    from utils.film_engine import FilmRecommendationEngine
+    from utils.music_engine import MusicRecommendationEngine
+
+    music_engine = MusicRecommendationEngine()
+    film_engine = FilmRecommendationEngine()
+    title = film_engine.df['title'].iloc[0]
+
+    checks = [
+        ("music", MusicChatbot(music_engine, local_routing=False,
+                               llm=FakeToolChat(tool_name="recommend_music", tool_args={"mood": "sad"})),
+         "aku lagi sedih", "songs"),
+        ("film", FilmChatbot(film_engine, llm=FakeToolChat(tool_name="search_movie", tool_args={"title": title})),
+         f"info film {title}", "films"),
+    ]
+
+    failed = False
+    for name, chatbot, message, items_key in checks:
+        types, done, problems = asyncio.run(_round_trip(chatbot, message, items_key))
+        status = "FAIL" if problems else "ok"
+        print(f"{name}: {status} ({types.count('token')} tokens, {len(done.get(items_key) or [])} {items_key}, "
+              f"usage {done.get('usage', {}).get('reported_input_tokens')} input tokens)")
+        for problem in problems:
+            print(f"  {problem}")
+        failed = failed or bool(problems)
+
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
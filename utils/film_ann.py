@@ -0,0 +1,321 @@
+"""
+Film ANN Backend
+Approximate nearest-neighbor search for large film catalogues
+
+The TF-IDF matrix is reduced to dense, L2-normalized float32 vectors
+(FilmEmbeddings, truncated SVD), which are clustered into inverted lists
+(IVF) with k-means.
+A query is scored only against the films in its `nprobe` closest lists, so
+the cost per query no longer grows with the whole catalogue:
+    - nprobe: lists scanned per query (recall up, latency up)
+    - rerank: best IVF candidates re-scored with exact TF-IDF cosine
+    - spill: lists each film is stored in (recall up, memory up)
+
+No neighbor table is precomputed, so building the index is O(N) instead of
+the O(N^2) all-pairs pass of SparseNeighborIndex. The index runs locally
+and can be saved to and loaded from a directory of .npy files.
+"""
+
+import json
+import os
+import shutil
+
+import numpy as np
+from sklearn.cluster import MiniBatchKMeans
+
+from utils.film_embeddings import FilmEmbeddings, normalize_rows
+from utils.film_similarity import top_k
+
+ANN_FORMAT_VERSION = 1
+
+_ARRAYS = ('components', 'centroids', 'list_offsets', 'list_ids', 'list_vectors', 'slot_of')
+
+
+class IVFNeighborIndex:
+    """
+    SVD-reduced TF-IDF vectors in k-means inverted lists
+
+    Exposes the same query methods as SparseNeighborIndex (most_similar,
+    most_similar_batch, search_query, similarity_row, memory_usage) so it
+    can back a FilmSimilarityModel.
+    """
+
+    def __init__(self, components, centroids, list_offsets, list_ids, list_vectors, slot_of,
+                 nprobe=16, rerank=500, tfidf_matrix=None):
+        """
+        Args:
+            components (ndarray): (d, n_features) SVD projection
+            centroids (ndarray): (n_lists, d) normalized list centroids
+            list_offsets (ndarray): (n_lists + 1,) start of each list in list_ids
+            list_ids (ndarray): Film row positions grouped by list
+            list_vectors (ndarray): Film vectors in list_ids order
+            slot_of (ndarray): Film row position -> slot in list_ids
+            nprobe (int): Lists scanned per query
+            rerank (int): IVF candidates re-scored with exact TF-IDF (0 = off)
+            tfidf_matrix: Sparse TF-IDF matrix for re-ranking (optional)
+        """
+        self.components = components
+        self.centroids = centroids
+        self.list_offsets = list_offsets
+        self.list_ids = list_ids
+        self.list_vectors = list_vectors
+        self.slot_of = slot_of
+        self.nprobe = nprobe
+        self.rerank = rerank
+        self.tfidf_matrix = tfidf_matrix
+
+    @classmethod
+    def build(cls, tfidf_matrix, n_components=128, n_lists=None, nprobe=16, rerank=500,
+              spill=1, keep_tfidf=True, random_state=0):
+        """
+        Embed the TF-IDF matrix and build the inverted lists
+
+        Args:
+            tfidf_matrix: Sparse TF-IDF matrix (rows L2-normalized)
+            n_components (int): Embedding dimensions
+            n_lists (int, optional): Number of inverted lists (default: sqrt(N))
+            nprobe (int): Default lists scanned per query
+            rerank (int): Default IVF candidates re-scored exactly (0 = off)
+            spill (int): Lists each film is stored in (> 1 trades memory for recall)
+            keep_tfidf (bool): Keep a reference to the TF-IDF matrix for re-ranking
+            random_state (int): Seed for SVD and k-means
+
+        Returns:
+            IVFNeighborIndex: Built index
+        """
+        tfidf_matrix = tfidf_matrix.tocsr()
+        embeddings = FilmEmbeddings.fit(tfidf_matrix, n_components, random_state=random_state)
+        return cls.from_embeddings(embeddings, n_lists=n_lists, nprobe=nprobe, rerank=rerank, spill=spill,
+                                   tfidf_matrix=tfidf_matrix if keep_tfidf else None,
+                                   random_state=random_state)
+
+    @classmethod
+    def from_embeddings(cls, embeddings, n_lists=None, nprobe=16, rerank=500, spill=1,
+                        tfidf_matrix=None, random_state=0):
+        """
+        Build the inverted lists over existing film embeddings
+
+        Args:
+            embeddings (FilmEmbeddings): Fitted film embeddings
+            n_lists, nprobe, rerank, spill: See build()
+            tfidf_matrix: Sparse TF-IDF matrix for re-ranking (optional)
+            random_state (int): Seed for k-means
+
+        Returns:
+            IVFNeighborIndex: Built index
+        """
+        vectors = embeddings.vectors
+        n_films = len(vectors)
+
+        # Spherical k-means: cluster normalized vectors, then renormalize the centroids
+        n_lists = max(1, min(n_lists or int(np.sqrt(n_films)), n_films))
+        kmeans = MiniBatchKMeans(n_clusters=n_lists, n_init=3, random_state=random_state,
+                                 batch_size=min(n_films, 4096))
+        kmeans.fit(vectors[:min(n_films, 256 * n_lists)])
+        centroids = normalize_rows(kmeans.cluster_centers_)
+
+        # Each film goes to its `spill` closest lists
+        spill = max(1, min(spill, n_lists))
+        closest, _ = top_k(vectors @ centroids.T, spill)
+        assignment = closest.ravel()
+        films = np.repeat(np.arange(n_films, dtype=np.int32), spill)
+
+        by_list = np.argsort(assignment, kind='stable')
+        list_ids = films[by_list]
+        list_offsets = np.zeros(n_lists + 1, dtype=np.int64)
+        np.cumsum(np.bincount(assignment, minlength=n_lists), out=list_offsets[1:])
+        slot_of = np.empty(n_films, dtype=np.int32)
+        slot_of[list_ids[::-1]] = np.arange(len(list_ids) - 1, -1, -1, dtype=np.int32)
+
+        return cls(embeddings.components, centroids, list_offsets, list_ids,
+                   np.ascontiguousarray(vectors[list_ids]), slot_of,
+                   nprobe=nprobe, rerank=rerank,
+                   tfidf_matrix=None if tfidf_matrix is None else tfidf_matrix.tocsr())
+
+    def __len__(self):
+        return len(self.slot_of)
+
+    def __getstate__(self):
+        # The TF-IDF matrix is persisted separately (artifact cache), not inside the index
+        state = self.__dict__.copy()
+        state['tfidf_matrix'] = None
+        return state
+
+    @property
+    def n_lists(self):
+        return len(self.centroids)
+
+    @property
+    def spilled(self):
+        """True if films are stored in more than one list"""
+        return len(self.list_ids) > len(self.slot_of)
+
+    def vector(self, idx):
+        """Reduced vector of one film"""
+        return self.list_vectors[self.slot_of[idx]]
+
+    def project(self, tfidf_rows):
+        """Reduce TF-IDF rows to normalized vectors"""
+        return normalize_rows(tfidf_rows @ self.components.T)
+
+    def _candidates(self, query, min_count, nprobe):
+        """Films in the nprobe closest lists (more if fewer than min_count)"""
+        order = np.argsort(-(self.centroids @ query), kind='stable')
+        starts, stops = self.list_offsets[order], self.list_offsets[order + 1]
+        enough = np.searchsorted(np.cumsum(stops - starts), min_count * (len(self.list_ids) // len(self))) + 1
+        probe = order[:max(nprobe, enough)]
+        slots = np.concatenate([np.arange(self.list_offsets[l], self.list_offsets[l + 1]) for l in probe])
+        ids = self.list_ids[slots]
+        if self.spilled:
+            # Films stored in several lists are scored once
+            ids, first = np.unique(ids, return_index=True)
+            slots = slots[first]
+        return ids, self.list_vectors[slots] @ query
+
+    def _search(self, query, n, nprobe=None, rerank=None, exclude=None, exact_scores=None):
+        """Top-n films for one reduced query vector"""
+        nprobe = self.nprobe if nprobe is None else nprobe
+        rerank = self.rerank if rerank is None else rerank
+        n = max(0, min(n, len(self) - (exclude is not None)))
+
+        ids, scores = self._candidates(query, n + 1, nprobe)
+        if exclude is not None:
+            keep = ids != exclude
+            ids, scores = ids[keep], scores[keep]
+
+        if rerank and exact_scores is not None:
+            # Re-score the best candidates with exact TF-IDF cosine
+            shortlist, _ = top_k(scores, max(n, rerank))
+            ids = ids[shortlist]
+            scores = exact_scores(ids)
+
+        top, top_scores = top_k(scores, n)
+        return ids[top].astype(np.int32), top_scores
+
+    def most_similar(self, idx, n=5, nprobe=None, rerank=None):
+        """
+        Approximate n most similar films (excluding the film itself)
+
+        Args:
+            idx (int): Row position of the film
+            n (int): Number of neighbors
+            nprobe (int, optional): Lists scanned (default: self.nprobe)
+            rerank (int, optional): Candidates re-scored exactly (default: self.rerank)
+
+        Returns:
+            tuple: (row positions, similarity scores), best first
+        """
+        exact = None
+        if self.tfidf_matrix is not None:
+            row = self.tfidf_matrix[idx].T
+            exact = lambda ids: (self.tfidf_matrix[ids] @ row).toarray().ravel()
+        return self._search(self.vector(idx), n, nprobe, rerank, exclude=idx, exact_scores=exact)
+
+    def most_similar_batch(self, indices, n=5, nprobe=None, rerank=None):
+        """
+        Approximate n most similar films for many films
+
+        Returns:
+            tuple: (row positions, similarity scores), each (len(indices), n), best first
+        """
+        n = max(0, min(n, len(self) - 1))
+        neighbors = np.empty((len(indices), n), dtype=np.int32)
+        scores = np.empty((len(indices), n), dtype=np.float32)
+        for i, idx in enumerate(indices):
+            neighbors[i], scores[i] = self.most_similar(idx, n, nprobe, rerank)
+        return neighbors, scores
+
+    def search_query(self, query_tfidf, n=3, nprobe=None, rerank=None):
+        """
+        Approximate top-n films for a TF-IDF query row (e.g. free text)
+
+        Returns:
+            tuple: (row positions, similarity scores), best first
+        """
+        exact = None
+        if self.tfidf_matrix is not None:
+            row = query_tfidf.T
+            exact = lambda ids: (self.tfidf_matrix[ids] @ row).toarray().ravel()
+        return self._search(self.project(query_tfidf)[0], n, nprobe, rerank, exact_scores=exact)
+
+    def similarity_row(self, idx):
+        """Reduced-space cosine of one film against the whole catalogue"""
+        row = np.empty(len(self), dtype=np.float32)
+        row[self.list_ids] = self.list_vectors @ self.vector(idx)
+        return row
+
+    def readonly_arrays(self):
+        """Arrays shared with consumers (frozen by FilmSimilarityModel)"""
+        return [getattr(self, name) for name in _ARRAYS]
+
+    def memory_usage(self):
+        """
+        Memory held by the index (the optional TF-IDF matrix is reported separately)
+
+        Returns:
+            dict: Bytes used by the projection, vectors and lists
+        """
+        usage = {
+            'projection': self.components.nbytes,
+            'vectors': self.list_vectors.nbytes,
+            'lists': (self.centroids.nbytes + self.list_offsets.nbytes
+                      + self.list_ids.nbytes + self.slot_of.nbytes),
+        }
+        if self.tfidf_matrix is not None:
+            m = self.tfidf_matrix
+            usage['tfidf_matrix'] = m.data.nbytes + m.indices.nbytes + m.indptr.nbytes
+        usage['total'] = sum(usage.values())
+        return usage
+
+    def save(self, path):
+        """
+        Write the index to a directory (replaced atomically)
+
+        Args:
+            path (str): Target directory
+        """
+        tmp_path = path + ".tmp"
+        shutil.rmtree(tmp_path, ignore_errors=True)
+        os.makedirs(tmp_path)
+        for name in _ARRAYS:
+            np.save(os.path.join(tmp_path, f"{name}.npy"), getattr(self, name))
+
+        # Manifest last, so a half-written index is never picked up
+        with open(os.path.join(tmp_path, "manifest.json"), "w") as f:
+            json.dump({
+                'version': ANN_FORMAT_VERSION,
+                'n_films': len(self),
+                'n_lists': self.n_lists,
+                'n_components': int(self.components.shape[0]),
+                'nprobe': self.nprobe,
+                'rerank': self.rerank,
+            }, f, indent=2)
+
+        shutil.rmtree(path, ignore_errors=True)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path, tfidf_matrix=None, mmap=True):
+        """
+        Load an index written by save()
+
+        Args:
+            path (str): Index directory
+            tfidf_matrix: Sparse TF-IDF matrix for re-ranking (optional)
+            mmap (bool): Memory-map the arrays instead of reading them
+
+        Returns:
+            IVFNeighborIndex or None: Index, or None if missing or from another format
+        """
+        manifest_path = os.path.join(path, "manifest.json")
+        if not os.path.exists(manifest_path):
+            return None
+        with open(manifest_path) as f:
+            manifest = json.load(f)
+        if manifest.get('version') != ANN_FORMAT_VERSION:
+            return None
+
+        arrays = {name: np.load(os.path.join(path, f"{name}.npy"), mmap_mode='r' if mmap else None)
+                  for name in _ARRAYS}
+        return cls(**arrays, nprobe=manifest['nprobe'], rerank=manifest['rerank'],
+                   tfidf_matrix=None if tfidf_matrix is None else tfidf_matrix.tocsr())
@@ -0,0 +1,256 @@
+"""
+Film Artifact Cache
+Persists the fitted film model so engine startup skips the CSV parse and TF-IDF fit
+
+Artifacts are keyed by a content hash of AllMovies_CLEANED.csv and stored in
+data/film/.artifacts/<key>-<backend>-<options hash>/, one set per similarity
+backend, so switching backends does not overwrite the others:
+    - metadata.pkl    parsed film DataFrame
+    - vectorizer.pkl  fitted TfidfVectorizer
+    - tfidf.npz       CSR TF-IDF matrix (absent for the embedding backend)
+    - neighbors.npy   top-k neighbor ids (memory-mapped on load)
+    - scores.npy      top-k neighbor scores (memory-mapped on load)
+    - <name>.pkl      extra prebuilt indexes (e.g. the title index)
+    - manifest.json   key, format version, similarity backend and its build
+                      options, shapes and extras
+
+A set built with another backend or other build options (e.g. a different
+n_components) is a cache miss.
+
+Build them ahead of time with:
+    python -m utils.film_artifacts [--force] [--backend tfidf|embedding|ann]
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import time
+
+import joblib
+import numpy as np
+import pandas as pd
+from scipy import sparse
+
+# Bump when the preprocessing or file layout changes to invalidate old caches
+ARTIFACT_VERSION = 5
+
+DEFAULT_CACHE_DIR = os.path.normpath(
+    os.path.join(os.path.dirname(__file__), "..", "data", "film", ".artifacts")
+)
+
+# Sets are written into a unique temp dir and renamed into place; prune()
+# leaves temp dirs alone unless a crashed writer left them this long ago
+TMP_PREFIX = ".tmp-"
+TMP_MAX_AGE = 3600.0
+
+
+def dataset_key(dataset_path, chunk_size=1024 * 1024):
+    """
+    Content hash of the dataset combined with the artifact format version
+
+    Args:
+        dataset_path (str): Path to the film CSV
+        chunk_size (int): Bytes read per hashing step
+
+    Returns:
+        str: Hex digest identifying the artifact set
+    """
+    digest = hashlib.sha256(f"film-artifacts-v{ARTIFACT_VERSION}".encode())
+    with open(dataset_path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def build_spec(backend, options=None):
+    """
+    Similarity backend and build options as recorded in the manifest
+
+    Args:
+        backend (str): Similarity backend name
+        options (dict, optional): Options the index was built with
+
+    Returns:
+        dict: JSON-normalized spec, comparable with a loaded manifest
+    """
+    return json.loads(json.dumps({'backend': backend, 'options': options or {}}, sort_keys=True, default=str))
+
+
+class FilmArtifactStore:
+    """
+    Versioned on-disk cache for the film metadata, TF-IDF model and neighbor table
+    """
+
+    def __init__(self, cache_dir=DEFAULT_CACHE_DIR):
+        self.cache_dir = cache_dir
+
+    def _path(self, key, build=None):
+        name = key[:16]
+        if build is not None:
+            options = hashlib.sha256(json.dumps(build['options'], sort_keys=True).encode()).hexdigest()
+            name += f"-{build['backend']}-{options[:8]}"
+        return os.path.join(self.cache_dir, name)
+
+    def exists(self, key, build=None):
+        """
+        Check whether a complete artifact set exists for the key and build
+
+        Args:
+            key (str): Key from dataset_key()
+            build (dict, optional): build_spec() the set must have been built with
+        """
+        manifest_path = os.path.join(self._path(key, build), "manifest.json")
+        if not os.path.exists(manifest_path):
+            return False
+        with open(manifest_path) as f:
+            manifest = json.load(f)
+        if manifest.get("key") != key or manifest.get("version") != ARTIFACT_VERSION:
+            return False
+        return build is None or manifest.get("build") == build
+
+    def load(self, key, build=None):
+        """
+        Load the artifact set for a dataset key
+
+        Args:
+            key (str): Key from dataset_key()
+            build (dict, optional): build_spec() the set must match
+
+        Returns:
+            dict or None: Loaded artifacts, or None on a cache miss
+        """
+        if not self.exists(key, build):
+            return None
+
+        path = self._path(key, build)
+        try:
+            with open(os.path.join(path, "manifest.json")) as f:
+                extras = json.load(f).get("extras", [])
+
+            artifacts = {
+                'df': pd.read_pickle(os.path.join(path, "metadata.pkl")),
+                'vectorizer': joblib.load(os.path.join(path, "vectorizer.pkl")),
+                'tfidf_matrix': (sparse.load_npz(os.path.join(path, "tfidf.npz")).tocsr()
+                                 if os.path.exists(os.path.join(path, "tfidf.npz")) else None),
+                'neighbors': np.load(os.path.join(path, "neighbors.npy"), mmap_mode='r'),
+                'scores': np.load(os.path.join(path, "scores.npy"), mmap_mode='r'),
+            }
+            for name in extras:
+                artifacts[name] = joblib.load(os.path.join(path, f"{name}.pkl"))
+            return artifacts
+        except Exception as e:
+            print(f"Could not load film artifacts: {e}")
+            return None
+
+    def save(self, key, df, vectorizer, tfidf_matrix, neighbors, scores, extras=None, build=None):
+        """
+        Write an artifact set and drop the ones it supersedes
+
+        Args:
+            key (str): Key from dataset_key()
+            df (DataFrame): Parsed film metadata
+            vectorizer: Fitted TfidfVectorizer
+            tfidf_matrix: Sparse TF-IDF matrix (None if the backend does not keep it)
+            neighbors (ndarray): Top-k neighbor ids
+            scores (ndarray): Top-k neighbor scores
+            extras (dict, optional): Name -> picklable prebuilt index
+            build (dict, optional): build_spec() of the similarity index
+        """
+        extras = extras or {}
+        os.makedirs(self.cache_dir, exist_ok=True)
+        path = self._path(key, build)
+        # Unique per writer: several processes may build the same set at once
+        tmp_path = tempfile.mkdtemp(prefix=TMP_PREFIX, dir=self.cache_dir)
+
+        df.to_pickle(os.path.join(tmp_path, "metadata.pkl"))
+        joblib.dump(vectorizer, os.path.join(tmp_path, "vectorizer.pkl"))
+        if tfidf_matrix is not None:
+            sparse.save_npz(os.path.join(tmp_path, "tfidf.npz"), sparse.csr_matrix(tfidf_matrix))
+        np.save(os.path.join(tmp_path, "neighbors.npy"), np.ascontiguousarray(neighbors))
+        np.save(os.path.join(tmp_path, "scores.npy"), np.ascontiguousarray(scores))
+        for name, obj in extras.items():
+            joblib.dump(obj, os.path.join(tmp_path, f"{name}.pkl"))
+
+        # Manifest last, so a half-written set is never picked up
+        with open(os.path.join(tmp_path, "manifest.json"), "w") as f:
+            json.dump({
+                'key': key,
+                'version': ARTIFACT_VERSION,
+                'build': build,
+                'n_films': int(len(df)),
+                'n_features': len(vectorizer.vocabulary_),
+                'n_neighbors': int(neighbors.shape[1]),
+                'extras': sorted(extras),
+            }, f, indent=2)
+
+        # Renames only, so the set at path is always complete: move the old
+        # set aside, then put the new one in place
+        old_path = tempfile.mkdtemp(prefix=TMP_PREFIX, dir=self.cache_dir)
+        try:
+            os.replace(path, os.path.join(old_path, "set"))
+        except FileNotFoundError:
+            pass
+        try:
+            os.replace(tmp_path, path)
+        except OSError:
+            # Another writer put the same set in place first; keep theirs
+            if not os.path.isdir(path):
+                raise
+            shutil.rmtree(tmp_path, ignore_errors=True)
+        shutil.rmtree(old_path, ignore_errors=True)
+        self.prune(keep=key, build=build)
+
+    def prune(self, keep, build=None):
+        """
+        Remove artifact sets of other datasets, and other builds of the same backend
+
+        Sets of other backends are kept, and so are temp dirs of writers
+        that may still be running.
+
+        Args:
+            keep (str): Key of the current dataset
+            build (dict, optional): build_spec() of the set just written
+        """
+        keep_name = os.path.basename(self._path(keep, build))
+        backend_prefix = f"{keep[:16]}-{build['backend']}-" if build is not None else None
+        for name in os.listdir(self.cache_dir):
+            path = os.path.join(self.cache_dir, name)
+            if name.startswith(TMP_PREFIX):
+                try:
+                    abandoned = time.time() - os.path.getmtime(path) > TMP_MAX_AGE
+                except OSError:
+                    continue
+                if abandoned:
+                    shutil.rmtree(path, ignore_errors=True)
+                continue
+            if name == keep_name:
+                continue
+            other_dataset = name.split("-", 1)[0] != keep[:16]
+            same_backend = backend_prefix is not None and name.startswith(backend_prefix)
+            if other_dataset or same_backend:
+                shutil.rmtree(path, ignore_errors=True)
+
+
+def main():
+    """Build (or refresh) the film artifact cache"""
+    parser = argparse.ArgumentParser(description="Build the film model artifact cache")
+    parser.add_argument("--force", action="store_true", help="Rebuild even if the cache is up to date")
+    parser.add_argument("--backend", choices=["tfidf", "embedding", "ann"], default="tfidf",
+                        help="Similarity backend to build (exact top-k table, dense embeddings or IVF index)")
+    parser.add_argument("--jobs", type=int, default=None,
+                        help="Processes for the TF-IDF build (-1 = all cores, default: in process)")
+    args = parser.parse_args()
+
+    # Imported here to avoid a circular import with the engine
+    from utils.film_engine import FilmRecommendationEngine
+
+    engine = FilmRecommendationEngine(use_artifacts=not args.force, similarity_backend=args.backend,
+                                      tfidf_jobs=args.jobs)
+    print(f"Film artifacts ready: {engine.data_version[:16]}")
+
+
+if __name__ == "__main__":
+    main()
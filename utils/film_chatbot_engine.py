@@ -22,20 +22,23 @@ class FilmChatbot(FilmLLMChatbot):
     Inherits all functionality from the film module
     """
 
-    def __init__(self, film_engine):
+    def __init__(self, film_engine, llm=None):
         """
         Initialize chatbot with FilmRecommendationEngine
 
         Args:
             film_engine: FilmRecommendationEngine instance from Streamlit
+            llm: Chat model to use instead of Gemini (optional)
         """
         # Extract components from engine
         film_df = film_engine.df
-        tfidf_matrix = film_engine.tfidf_matrix
-        cosine_sim = film_engine.cosine_sim
+
+        # Reuse the engine's fitted vectorizer, neighbor index and title index (read-only)
+        similarity_model = film_engine.similarity_model
+        title_index = film_engine.title_index
 
         # Initialize parent class
-        super().__init__(film_df, tfidf_matrix, cosine_sim)
+        super().__init__(film_df, similarity_model, title_index=title_index, llm=llm)
 
 
 # Export for easy import in Streamlit
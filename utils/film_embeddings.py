@@ -0,0 +1,139 @@
+"""
+Film Embeddings
+Dense LSA embeddings of the film soup as a similarity backend
+
+The TF-IDF matrix is projected with truncated SVD into a few hundred dense
+dimensions, L2-normalized and stored as one contiguous float32 array. Cosine
+similarity of a film against the catalogue is then a single BLAS
+matrix-vector product, and no sparse matrix has to stay in memory.
+The same embeddings feed the IVF lists of utils/film_ann.py.
+"""
+
+import numpy as np
+from sklearn.decomposition import TruncatedSVD
+
+from utils.film_similarity import top_k
+
+DEFAULT_COMPONENTS = 192
+
+
+def normalize_rows(vectors):
+    """L2-normalize rows as float32 (zero rows stay zero)"""
+    vectors = np.asarray(vectors, dtype=np.float32)
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return vectors / norms
+
+
+class FilmEmbeddings:
+    """
+    L2-normalized float32 film vectors plus the SVD projection for new text
+
+    Exposes the same query methods as SparseNeighborIndex (most_similar,
+    most_similar_batch, search_query, similarity_row, memory_usage) so it
+    can back a FilmSimilarityModel.
+    """
+
+    # No sparse matrix is kept (FilmSimilarityModel.tfidf_matrix is None)
+    tfidf_matrix = None
+
+    def __init__(self, components, vectors):
+        """
+        Args:
+            components (ndarray): (d, n_features) SVD projection
+            vectors (ndarray): (n_films, d) L2-normalized film vectors
+        """
+        self.components = np.ascontiguousarray(components, dtype=np.float32)
+        self.vectors = np.ascontiguousarray(vectors, dtype=np.float32)
+
+    @classmethod
+    def fit(cls, tfidf_matrix, n_components=DEFAULT_COMPONENTS, random_state=0):
+        """
+        Fit the SVD projection and embed every film
+
+        Args:
+            tfidf_matrix: Sparse TF-IDF matrix
+            n_components (int): Embedding dimensions
+            random_state (int): Seed for the randomized SVD
+
+        Returns:
+            FilmEmbeddings: Fitted embeddings
+        """
+        n_films, n_features = tfidf_matrix.shape
+        n_components = max(1, min(n_components, n_features - 1, n_films - 1))
+        svd = TruncatedSVD(n_components=n_components, random_state=random_state)
+        vectors = normalize_rows(svd.fit_transform(tfidf_matrix))
+        return cls(svd.components_, vectors)
+
+    def __len__(self):
+        return len(self.vectors)
+
+    @property
+    def dim(self):
+        return self.vectors.shape[1]
+
+    def transform(self, tfidf_rows):
+        """
+        Embed TF-IDF rows (e.g. a vectorized text query)
+
+        Args:
+            tfidf_rows: (m, n_features) sparse TF-IDF rows
+
+        Returns:
+            ndarray: (m, d) normalized float32 vectors
+        """
+        return normalize_rows(tfidf_rows @ self.components.T)
+
+    def similarity_row(self, idx):
+        """Embedding cosine of one film against the whole catalogue"""
+        return self.vectors @ self.vectors[idx]
+
+    def most_similar(self, idx, n=5):
+        """
+        Get the n most similar films (excluding the film itself)
+
+        Args:
+            idx (int): Row position of the film
+            n (int): Number of neighbors
+
+        Returns:
+            tuple: (row positions, similarity scores), best first
+        """
+        return top_k(self.similarity_row(idx), n, exclude=idx)
+
+    def most_similar_batch(self, indices, n=5):
+        """
+        Get the n most similar films for many films (one matrix-matrix product)
+
+        Returns:
+            tuple: (row positions, similarity scores), each (len(indices), n), best first
+        """
+        indices = np.asarray(indices, dtype=np.int64)
+        return top_k(self.vectors[indices] @ self.vectors.T, n, exclude=indices)
+
+    def search_query(self, query_tfidf, n=3):
+        """
+        Top-n films for a TF-IDF query row (e.g. free text)
+
+        Returns:
+            tuple: (row positions, similarity scores), best first
+        """
+        return top_k(self.vectors @ self.transform(query_tfidf)[0], n)
+
+    def readonly_arrays(self):
+        """Arrays shared with consumers (frozen by FilmSimilarityModel)"""
+        return [self.components, self.vectors]
+
+    def memory_usage(self):
+        """
+        Memory held by the embeddings
+
+        Returns:
+            dict: Bytes used by the projection and the film vectors
+        """
+        usage = {
+            'projection': self.components.nbytes,
+            'vectors': self.vectors.nbytes,
+        }
+        usage['total'] = sum(usage.values())
+        return usage
@@ -3,132 +3,284 @@ Film Recommendation Engine
 Handles film data loading, filtering, and recommendations
 """
 
+import inspect
 import pandas as pd
 import numpy as np
 import os
-import re
-import streamlit as st
-from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.metrics.pairwise import cosine_similarity
+
+from utils.film_ann import IVFNeighborIndex
+from utils.film_artifacts import FilmArtifactStore, build_spec, dataset_key
+from utils.film_embeddings import FilmEmbeddings
+from utils.film_filters import FilmFilterIndex
+from utils.film_ingest import (
+    DEFAULT_CHUNK_SIZE, FILM_COLUMNS, LIST_COLUMNS, clean_chunk, film_soups, read_film_chunks
+)
+from utils.film_parsing import ListColumnBuilder, list_bitmasks
+from utils.film_results import FilmResultCursor
+from utils.film_similarity import FilmSimilarityModel, SparseNeighborIndex
+from utils.result_cache import QueryCache
+from utils.title_index import TitleIndex
+
+# Similarity backends: exact sparse top-k table, dense SVD embeddings,
+# or approximate IVF search over the embeddings
+SIMILARITY_BACKENDS = ('tfidf', 'embedding', 'ann')
+
+# Backend options applied at query time; changing them needs no rebuild
+QUERY_OPTIONS = {'ann': ('nprobe', 'rerank')}
+
+# Genre filter semantics: at least one, every one, or none of the selected genres
+GENRE_MATCH_MODES = ('any', 'all', 'none')
 
 
 class FilmRecommendationEngine:
     """
     Modular film recommendation engine
     Supports content-based filtering using TF-IDF and cosine similarity
+
+    similarity_backend selects how similar films are found:
+        - 'tfidf': exact cosine, precomputed top-k table (default)
+        - 'embedding': dense float32 SVD embeddings, one BLAS product per
+          query (utils/film_embeddings.py); backend_options go to FilmEmbeddings.fit
+        - 'ann': approximate IVF lists for catalogues too large for an
+          all-pairs pass (utils/film_ann.py); backend_options go to
+          IVFNeighborIndex.build
+
+    When the model is built rather than loaded, the CSV is streamed
+    chunk_size rows at a time (utils/film_ingest.py) and tfidf_jobs spreads
+    the TF-IDF n-gram counting over a process pool (utils/film_tfidf.py).
     """
 
-    def __init__(self):
+    def __init__(self, n_neighbors=50, use_artifacts=True, cache_size=256, cache_ttl=600.0,
+                 similarity_backend='tfidf', backend_options=None, tfidf_jobs=None,
+                 chunk_size=DEFAULT_CHUNK_SIZE):
+        if similarity_backend not in SIMILARITY_BACKENDS:
+            raise ValueError(f"similarity_backend must be one of {SIMILARITY_BACKENDS}, got {similarity_backend!r}")
+
         self.df = None
-        self.cosine_sim = None
-        self.tfidf_matrix = None
+        self.similarity_model = None
+        self.title_index = None
+        self.filter_index = None
+        self.genre_vocab = []
+        self.actor_lists = None
+        self.n_neighbors = n_neighbors
+        self.similarity_backend = similarity_backend
+        self.backend_options = dict(backend_options or {})
+        self.tfidf_jobs = tfidf_jobs
+        self.chunk_size = chunk_size
+        self.use_artifacts = use_artifacts
+        self.data_version = None
+        self.artifact_store = FilmArtifactStore()
+        self.result_cache = QueryCache(maxsize=cache_size, ttl=cache_ttl)
         self.genres = []
         self.years = []
         self._load_data()
 
-    @st.cache_resource
-    def _load_data(_self):
-        """Load film dataset and compute similarity matrix (cached)"""
+    def _load_data(self):
+        """Load film dataset and build the similarity index (the pages cache the whole engine)"""
         try:
             # Get the correct path
             current_dir = os.path.dirname(__file__)
             data_dir = os.path.join(current_dir, "..", "data", "film")
             dataset_path = os.path.join(data_dir, "AllMovies_CLEANED.csv")
 
-            # Load dataset
-            _self.df = pd.read_csv(dataset_path)
+            # Prebuilt artifacts are keyed by the dataset content hash
+            self.data_version = dataset_key(dataset_path)
+
+            if not (self.use_artifacts and self._load_artifacts()):
+                # Stream the dataset: clean, build soups and count n-grams per chunk
+                vectorizer, tfidf_matrix = self._ingest(dataset_path)
 
-            # Clean data
-            _self._clean_data()
+                # Index of the selected similarity backend
+                self._compute_similarity(vectorizer, tfidf_matrix)
 
-            # Create soup for content-based filtering
-            _self._create_soup()
+                # Rating-ranked title search index
+                self.title_index = TitleIndex(self.df['title'], self.df['rating'])
 
-            # Compute TF-IDF and cosine similarity
-            _self._compute_similarity()
+                # Persist for the next cold start
+                self.save_artifacts()
 
             # Extract unique genres and years
-            _self._extract_metadata()
+            self._extract_metadata()
 
-            print(f"Film dataset loaded: {len(_self.df)} films")
+            # Rating-sorted order and year ranges for the filters
+            self.filter_index = FilmFilterIndex(self.df['rating'], self.df['release_year'])
+
+            print(f"Film dataset loaded: {len(self.df)} films")
 
         except Exception as e:
             print(f"Error loading film data: {e}")
             raise
 
-    def _clean_data(self):
-        """Clean and preprocess data"""
-        # Convert genres_list from string to actual list
-        self.df['genres_list'] = self.df['genres_list'].apply(eval)
-
-        # Handle missing values
-        self.df['description'] = self.df['description'].fillna('')
-        self.df['actors'] = self.df['actors'].fillna('Unknown')
-        self.df['directors'] = self.df['directors'].fillna('Unknown')
-
-    def _clean_text(self, text):
-        """Clean text for TF-IDF"""
-        if isinstance(text, str):
-            text = text.lower()
-            text = re.sub(r"[^a-zA-Z0-9\s]", " ", text)
-            text = re.sub(r"\s+", " ", text).strip()
-            return text
-        return ""
-
-    def _create_soup(self):
-        """Create 'soup' - combined features for content-based filtering"""
-        def clean_actors(x):
-            if isinstance(x, str):
-                return x.lower().replace(",", " ").replace(" ", "_")
-            return ""
-
-        def clean_directors(x):
-            if isinstance(x, str):
-                return x.lower().replace(",", " ").replace(" ", "_")
-            return ""
-
-        def clean_genres(x):
-            if isinstance(x, list):
-                return " ".join([g.lower().replace(" ", "_") for g in x])
-            return ""
-
-        # Create soup
-        self.df["soup"] = (
-            self.df["description"].apply(self._clean_text) + " " +
-            self.df["actors"].apply(clean_actors) + " " +
-            self.df["directors"].apply(clean_directors) + " " +
-            self.df["genres_list"].apply(clean_genres)
-        )
-
-    def _compute_similarity(self):
-        """Compute TF-IDF matrix and cosine similarity"""
+    def _ingest(self, dataset_path):
+        """
+        Read, clean and vectorize the dataset chunk by chunk
+
+        Only the display columns of each chunk are kept; soups go straight to
+        the vectorizer and the raw list text is dropped once parsed.
+
+        Returns:
+            tuple: (fitted TfidfVectorizer, TF-IDF matrix), or (None, None) on failure
+        """
+        genres = ListColumnBuilder()
+        actors = ListColumnBuilder()
+        frames = []
+        read_all = []
+
+        def soup_chunks():
+            for chunk in read_film_chunks(dataset_path, self.chunk_size):
+                chunk_genres = genres.append(chunk['genres_list'])
+                chunk_actors = actors.append(chunk['actors'])
+                chunk = chunk.drop(columns=LIST_COLUMNS)
+                clean_chunk(chunk)
+                frames.append(chunk)
+                yield film_soups(chunk, chunk_genres, chunk_actors)
+            read_all.append(True)
+
+        soups = soup_chunks()
         try:
-            # Create TF-IDF vectorizer
-            vectorizer = TfidfVectorizer(
-                stop_words='english',
-                ngram_range=(1, 3),
-                max_features=50000
-            )
+            vectorizer, tfidf_matrix = FilmSimilarityModel.fit_vectorizer_chunks(soups, n_jobs=self.tfidf_jobs)
+        except Exception as e:
+            # Finish reading the catalogue without vectorizing it; reading errors propagate
+            for _ in soups:
+                pass
+            if not read_all:
+                raise
+            print(f"Could not compute similarity: {e}")
+            vectorizer = tfidf_matrix = None
+
+        self.df = pd.concat(frames, ignore_index=True)
+        self._attach_lists(genres.finish(), actors.finish())
+        return vectorizer, tfidf_matrix
 
-            # Fit and transform
-            self.tfidf_matrix = vectorizer.fit_transform(self.df["soup"])
+    def _attach_lists(self, genres, actors):
+        """Add the parsed genre and actor columns to the full frame"""
+        # Genres as a uint64 bitmask per film, actors as interned CSR codes
+        self.genre_vocab = genres.vocab
+        self.df['genre_mask'] = list_bitmasks(genres)
 
-            # Compute cosine similarity
-            self.cosine_sim = cosine_similarity(self.tfidf_matrix, self.tfidf_matrix)
+        # Films with the same genres share one list object
+        genre_lists = {}
+        for i, mask in enumerate(self.df['genre_mask']):
+            if mask not in genre_lists:
+                genre_lists[mask] = genres.row(i)
+        self.df['genres_list'] = [genre_lists[mask] for mask in self.df['genre_mask']]
 
-            print("Similarity matrix computed successfully")
+        self.actor_lists = actors
+        self.df['actors'] = actors.join(", ", empty='Unknown')
+
+        # Source column order, derived columns last
+        self.df = self.df[FILM_COLUMNS + ['genre_mask']]
+
+    def _compute_similarity(self, vectorizer, tfidf_matrix):
+        """Fit the index of the selected similarity backend on the TF-IDF matrix"""
+        if vectorizer is None:
+            self.similarity_model = None
+            return
+
+        try:
+            if self.similarity_backend == 'embedding':
+                # Dense vectors only, the sparse matrix is dropped after the projection
+                index = FilmEmbeddings.fit(tfidf_matrix, **self.backend_options)
+            elif self.similarity_backend == 'ann':
+                # Approximate lists over the embeddings, no all-pairs pass
+                index = IVFNeighborIndex.build(tfidf_matrix, **self.backend_options)
+            else:
+                # Top-k neighbors only, no dense N x N matrix
+                index = SparseNeighborIndex(tfidf_matrix, k=self.n_neighbors)
+            self.similarity_model = FilmSimilarityModel(vectorizer, index)
+
+            memory_mb = self.similarity_model.memory_usage()['total'] / 1024 ** 2
+            print(f"Similarity index computed successfully ({memory_mb:.1f} MB)")
 
         except Exception as e:
             print(f"Could not compute similarity: {e}")
-            self.cosine_sim = None
+            self.similarity_model = None
+
+    def _load_artifacts(self):
+        """
+        Load the prebuilt model for the current dataset version
+
+        Returns:
+            bool: True if the artifacts were found and loaded
+        """
+        artifacts = self.artifact_store.load(self.data_version, self._build_spec())
+        if artifacts is None or not {'title_index', 'actor_lists', 'genre_vocab'} <= artifacts.keys():
+            return False
+
+        if self.similarity_backend == 'tfidf':
+            if artifacts['neighbors'].shape[1] != self.n_neighbors:
+                return False
+            index = SparseNeighborIndex.from_table(
+                artifacts['tfidf_matrix'], artifacts['neighbors'], artifacts['scores']
+            )
+        else:
+            index = artifacts.get(f"{self.similarity_backend}_index")
+            if index is None:
+                return False
+            if self.similarity_backend == 'ann':
+                # The pickled index leaves the TF-IDF matrix (used for re-ranking) to the cache
+                index.tfidf_matrix = artifacts['tfidf_matrix']
+                # Query-time options are not part of the build: apply the current ones
+                defaults = inspect.signature(IVFNeighborIndex.build).parameters
+                for option in QUERY_OPTIONS['ann']:
+                    setattr(index, option, self.backend_options.get(option, defaults[option].default))
+
+        self.df = artifacts['df']
+        self.title_index = artifacts['title_index']
+        self.actor_lists = artifacts['actor_lists']
+        self.genre_vocab = artifacts['genre_vocab']
+        self.similarity_model = FilmSimilarityModel(artifacts['vectorizer'], index)
+        print(f"Film artifacts loaded ({self.data_version[:16]})")
+        return True
+
+    def _build_spec(self):
+        """
+        Backend and build options of the similarity index, as recorded with the artifacts
+
+        Unset options are filled in from the builder's defaults, so passing a
+        default explicitly does not force a rebuild; query-time options
+        (QUERY_OPTIONS) are left out.
+        """
+        if self.similarity_backend == 'tfidf':
+            return build_spec('tfidf', {'n_neighbors': self.n_neighbors})
+
+        builder = FilmEmbeddings.fit if self.similarity_backend == 'embedding' else IVFNeighborIndex.build
+        options = {name: param.default for name, param in inspect.signature(builder).parameters.items()
+                   if param.default is not inspect.Parameter.empty}
+        options.update(self.backend_options)
+        for option in QUERY_OPTIONS.get(self.similarity_backend, ()):
+            options.pop(option, None)
+        return build_spec(self.similarity_backend, options)
+
+    def save_artifacts(self):
+        """Write the fitted model to the artifact cache"""
+        if self.similarity_model is None:
+            return
+        index = self.similarity_model.neighbor_index
+        extras = {
+            'title_index': self.title_index,
+            'actor_lists': self.actor_lists,
+            'genre_vocab': self.genre_vocab,
+        }
+        if self.similarity_backend == 'tfidf':
+            neighbors, scores = index.neighbors, index.scores
+        else:
+            # No neighbor table: the backend index is stored instead
+            neighbors = np.empty((len(self.df), 0), dtype=np.int32)
+            scores = np.empty((len(self.df), 0), dtype=np.float32)
+            extras[f"{self.similarity_backend}_index"] = index
+        try:
+            self.artifact_store.save(
+                self.data_version, self.df, self.similarity_model.vectorizer,
+                index.tfidf_matrix, neighbors, scores, extras=extras, build=self._build_spec()
+            )
+        except OSError as e:
+            print(f"Could not save film artifacts: {e}")
 
     def _extract_metadata(self):
         """Extract unique genres and years"""
-        # Get all unique genres
-        all_genres = []
-        for genres in self.df['genres_list']:
-            all_genres.extend(genres)
-        self.genres = sorted(list(set(all_genres)))
+        # Genres that occur in at least one film (vocab is already sorted)
+        self.genres = [g for g, count in zip(self.genre_vocab, self._genre_counts()) if count]
 
         # Get unique years (sorted)
         self.years = sorted(self.df['release_year'].dropna().unique().astype(int).tolist(), reverse=True)
@@ -142,52 +294,104 @@ class FilmRecommendationEngine:
             fuzzy (bool): Allow fuzzy matching
 
         Returns:
-            DataFrame: Matching films
+            FilmResultCursor: Matching films, highest rating first
         """
-        if fuzzy:
-            # Case-insensitive partial match
-            mask = self.df['title'].str.contains(title, case=False, na=False)
-        else:
+        def compute():
+            if fuzzy:
+                # Case-insensitive partial match
+                return self.title_index.search(title)
             # Exact match
-            mask = self.df['title'].str.lower() == title.lower()
+            return self.title_index.exact(title)
+
+        # Both lookups are case-insensitive, so the key is too
+        rows = self._cached('title', (str(title).lower(), bool(fuzzy)), compute)
 
-        results = self.df[mask]
-        return results.sort_values('rating', ascending=False)
+        # Postings are pre-ranked by rating, no per-query sort needed
+        return FilmResultCursor(self.df, rows)
+
+    def match_titles(self, title, n=5):
+        """
+        Typo-tolerant title lookup ("did you mean")
+
+        Args:
+            title (str): Possibly misspelled film title
+            n (int): Number of candidates
+
+        Returns:
+            DataFrame: Best matching films with a 'match_score' column
+        """
+        rows, scores = self.title_index.fuzzy(title, limit=n)
+        result = self.df.iloc[rows].copy()
+        result['match_score'] = scores
+        return result
 
     def filter_by_rating(self, min_rating=0, max_rating=10):
-        """Filter films by rating range"""
-        filtered = self.df[
-            (self.df['rating'] >= min_rating) &
-            (self.df['rating'] <= max_rating)
-        ]
-        return filtered.sort_values('rating', ascending=False)
+        """Filter films by rating range (lazy FilmResultCursor)"""
+        # Binary search over the pre-sorted rating order
+        return FilmResultCursor(self.df, self.filter_index.query(min_rating, max_rating))
 
     def filter_by_year(self, year):
-        """Filter films by release year"""
-        filtered = self.df[self.df['release_year'] == year]
-        return filtered.sort_values('rating', ascending=False)
+        """Filter films by release year (lazy FilmResultCursor)"""
+        start, stop = self.filter_index.year_range(year)
+        return FilmResultCursor(self.df, self.filter_index.year_order[start:stop])
+
+    def genre_query_mask(self, genres):
+        """
+        Bitmask for a set of genre names
+
+        Args:
+            genres (list): Genre names
 
-    def filter_by_genre(self, genres):
+        Returns:
+            tuple: (uint64 mask of the known genres, True if any name was unknown)
+        """
+        bits = {genre: i for i, genre in enumerate(self.genre_vocab)}
+        mask = np.uint64(0)
+        unknown = False
+        for genre in genres:
+            if genre in bits:
+                mask |= np.uint64(1) << np.uint64(bits[genre])
+            else:
+                unknown = True
+        return mask, unknown
+
+    def _genre_rows(self, genres, match='any', rows=None):
+        """Boolean mask over `rows` (default: all rows) for a genre query (see filter_by_genre)"""
+        if match not in GENRE_MATCH_MODES:
+            raise ValueError(f"match must be one of {GENRE_MATCH_MODES}, got {match!r}")
+
+        query, unknown = self.genre_query_mask(genres)
+        masks = self.df['genre_mask'].to_numpy(dtype=np.uint64)
+        hits = (masks if rows is None else masks[rows]) & query
+
+        if match == 'any':
+            return hits != 0
+        if match == 'all':
+            # A film can never have a genre that is not in the vocabulary
+            if unknown:
+                return np.zeros(len(hits), dtype=bool)
+            return hits == query
+        return hits == 0
+
+    def filter_by_genre(self, genres, match='any'):
         """
         Filter films by genres
 
         Args:
             genres (list): List of genre names
+            match (str): 'any' (at least one genre), 'all' (every genre)
+                or 'none' (none of the genres)
 
         Returns:
-            DataFrame: Filtered films
+            FilmResultCursor: Filtered films, highest rating first
         """
+        rows = self.filter_index.order
         if not genres:
-            return self.df
+            return FilmResultCursor(self.df, rows)
 
-        # Filter films that contain ANY of the selected genres
-        mask = self.df['genres_list'].apply(
-            lambda x: any(genre in x for genre in genres)
-        )
-        filtered = self.df[mask]
-        return filtered.sort_values('rating', ascending=False)
+        return FilmResultCursor(self.df, rows[self._genre_rows(genres, match, rows)])
 
-    def filter_combined(self, min_rating=0, max_rating=10, year=None, genres=None):
+    def filter_combined(self, min_rating=0, max_rating=10, year=None, genres=None, genre_match='any'):
         """
         Apply multiple filters at once
 
@@ -196,30 +400,27 @@ class FilmRecommendationEngine:
             max_rating (float): Maximum rating
             year (int, optional): Release year
             genres (list, optional): List of genres
+            genre_match (str): 'any', 'all' or 'none' (see filter_by_genre)
 
         Returns:
-            DataFrame: Filtered films
+            FilmResultCursor: Filtered films, highest rating first
         """
-        filtered = self.df.copy()
-
-        # Rating filter
-        filtered = filtered[
-            (filtered['rating'] >= min_rating) &
-            (filtered['rating'] <= max_rating)
-        ]
-
-        # Year filter
-        if year:
-            filtered = filtered[filtered['release_year'] == year]
-
-        # Genre filter
-        if genres:
-            mask = filtered['genres_list'].apply(
-                lambda x: any(genre in x for genre in genres)
-            )
-            filtered = filtered[mask]
+        def compute():
+            # Rating and year filters: one slice of the pre-sorted order
+            rows = self.filter_index.query(min_rating, max_rating, year=year or None)
 
-        return filtered.sort_values('rating', ascending=False)
+            # Genre filter keeps the rating order
+            if genres:
+                rows = rows[self._genre_rows(genres, genre_match, rows)]
+            return rows
+
+        # Genre order and duplicates do not change the result
+        key = (float(min_rating), float(max_rating), int(year) if year else None,
+               tuple(sorted(set(genres or ()))), genre_match if genres else None)
+        rows = self._cached('filter', key, compute)
+
+        # Rows are only materialized page by page, already sorted by rating
+        return FilmResultCursor(self.df, rows)
 
     def get_similar_films(self, title, n=5):
         """
@@ -232,45 +433,74 @@ class FilmRecommendationEngine:
         Returns:
             DataFrame: Similar films
         """
-        if self.cosine_sim is None:
-            print("Similarity matrix not available")
+        if self.similarity_model is None:
+            print("Similarity index not available")
             return pd.DataFrame()
 
-        try:
-            # Create index mapping
-            indices = pd.Series(self.df.index, index=self.df['title']).drop_duplicates()
-
-            # Get index of the film
-            if title not in indices:
-                # Try fuzzy search
-                search_results = self.search_by_title(title, fuzzy=True)
-                if search_results.empty:
-                    return pd.DataFrame()
-                title = search_results.iloc[0]['title']
+        match = self._cached('similar', (str(title), int(n)), lambda: self._similar_rows(title, n))
+        if match is None:
+            return pd.DataFrame()
 
-            idx = indices[title]
+        # Return similar films with similarity scores
+        film_indices, scores = match
+        result = self.df.iloc[film_indices].copy()
+        result['similarity_score'] = scores
+        return result
 
-            # Get similarity scores
-            sim_scores = list(enumerate(self.cosine_sim[idx]))
+    def get_similar_films_batch(self, titles, n=5):
+        """
+        Get similar films for many titles in one pass
 
-            # Sort by similarity
-            sim_scores = sorted(sim_scores, key=lambda x: x[1], reverse=True)
+        Args:
+            titles (list): Film titles
+            n (int): Number of recommendations per title
 
-            # Get top N similar films (excluding itself)
-            sim_scores = sim_scores[1:n+1]
+        Returns:
+            dict: Title -> DataFrame of similar films (empty if the title is unknown)
+        """
+        if self.similarity_model is None:
+            print("Similarity index not available")
+            return {title: pd.DataFrame() for title in titles}
 
-            # Get film indices
-            film_indices = [i[0] for i in sim_scores]
+        rows = {title: self._title_row(title) for title in titles}
+        known = [title for title in titles if rows[title] is not None]
+        neighbors, scores = self.similarity_model.most_similar_batch([rows[t] for t in known], n)
 
-            # Return similar films with similarity scores
+        results = {title: pd.DataFrame() for title in titles}
+        for title, film_indices, film_scores in zip(known, neighbors, scores):
             result = self.df.iloc[film_indices].copy()
-            result['similarity_score'] = [score[1] for score in sim_scores]
+            result['similarity_score'] = film_scores
+            results[title] = result
+        return results
+
+    def _title_row(self, title):
+        """Row position of a title: exact (case-insensitive, best rated) match, else typo-tolerant"""
+        rows = self.title_index.exact(title)
+        if len(rows) == 0:
+            rows, _ = self.title_index.fuzzy(title, limit=1)
+        return int(rows[0]) if len(rows) else None
+
+    def _similar_rows(self, title, n):
+        """Row positions and scores of the n films most similar to a title (None if not found)"""
+        try:
+            idx = self._title_row(title)
+            if idx is None:
+                return None
 
-            return result
+            # Get top N similar films (excluding itself)
+            return self.similarity_model.most_similar(idx, n)
 
         except Exception as e:
             print(f"Error getting similar films: {e}")
-            return pd.DataFrame()
+            return None
+
+    def _cached(self, kind, key, compute):
+        """Query result from the cache, computed on a miss; entries expire with the dataset version"""
+        return self.result_cache.get_or_compute((kind,) + key, compute, version=self.data_version)
+
+    def cache_stats(self):
+        """Hit/miss counters of the query result cache"""
+        return self.result_cache.stats()
 
     def get_platform_recommendation(self, film_data):
         """
@@ -322,15 +552,16 @@ class FilmRecommendationEngine:
         """Get top rated films"""
         return self.df.nlargest(n, 'rating')
 
+    def _genre_counts(self):
+        """Number of films per genre_vocab entry, from the genre bitmasks"""
+        masks = self.df['genre_mask'].to_numpy(dtype=np.uint64)
+        bits = np.arange(len(self.genre_vocab), dtype=np.uint64)
+        return [int(np.count_nonzero(masks & (np.uint64(1) << bit))) for bit in bits]
+
     def get_genre_distribution(self):
         """Get genre distribution"""
-        all_genres = []
-        for genres in self.df['genres_list']:
-            all_genres.extend(genres)
-
-        from collections import Counter
-        genre_counts = Counter(all_genres)
-        return dict(genre_counts.most_common(20))
+        counts = sorted(zip(self.genre_vocab, self._genre_counts()), key=lambda item: -item[1])
+        return {genre: count for genre, count in counts[:20] if count}
 
     def get_dataset_info(self):
         """Get dataset information"""
@@ -341,6 +572,8 @@ class FilmRecommendationEngine:
             'year_range': (int(self.df['release_year'].min()),
                           int(self.df['release_year'].max())),
             'avg_rating': round(self.df['rating'].mean(), 2),
+            'similarity_memory_mb': (round(self.similarity_model.memory_usage()['total'] / 1024 ** 2, 1)
+                                     if self.similarity_model is not None else 0.0),
             'genre_distribution': self.get_genre_distribution()
         }
 
@@ -0,0 +1,86 @@
+"""
+Film Filter Index
+Pre-sorted row orders for rating and year queries
+
+Rows are ranked by rating once (highest first, NaN last). Rating-range and
+year queries are answered with np.searchsorted over these orders, so every
+result is a contiguous slice that is already sorted by rating.
+"""
+
+import numpy as np
+
+
+class FilmFilterIndex:
+    """
+    Rating permutation plus a year -> row-range index
+    """
+
+    def __init__(self, ratings, years):
+        """
+        Build the index
+
+        Args:
+            ratings (array-like): Film rating per row
+            years (array-like): Release year per row (NaN allowed)
+        """
+        ratings = np.asarray(ratings, dtype=np.float64)
+        years = np.asarray(years, dtype=np.float64)
+
+        # Negated ratings ascend along the order; NaN sorts last as +inf
+        neg_ratings = np.where(np.isnan(ratings), np.inf, -ratings)
+        self.order = np.argsort(neg_ratings, kind='stable').astype(np.int32)
+        self._neg_ratings = neg_ratings[self.order]
+
+        # Within each year the rating order is kept, so year slices are pre-sorted too
+        ranked_years = years[self.order]
+        has_year = ~np.isnan(ranked_years)
+        by_year = np.argsort(ranked_years[has_year], kind='stable')
+        ranks = np.flatnonzero(has_year)[by_year]
+        self.year_order = self.order[ranks]
+        self._year_neg_ratings = self._neg_ratings[ranks]
+        self._year_keys, self._year_starts = np.unique(ranked_years[has_year][by_year], return_index=True)
+        self._year_stops = np.append(self._year_starts[1:], len(ranks))
+
+    def __len__(self):
+        return len(self.order)
+
+    @staticmethod
+    def _rating_slice(neg_ratings, min_rating, max_rating):
+        lo = np.searchsorted(neg_ratings, -max_rating, side='left')
+        hi = np.searchsorted(neg_ratings, -min_rating, side='right')
+        return lo, max(lo, hi)
+
+    def year_range(self, year):
+        """
+        Position of a release year in year_order
+
+        Args:
+            year (int): Release year
+
+        Returns:
+            tuple: (start, stop) into year_order, empty if the year is unknown
+        """
+        i = np.searchsorted(self._year_keys, year)
+        if i == len(self._year_keys) or self._year_keys[i] != year:
+            return 0, 0
+        return int(self._year_starts[i]), int(self._year_stops[i])
+
+    def query(self, min_rating=0, max_rating=10, year=None):
+        """
+        Rows with min_rating <= rating <= max_rating (and the given year)
+
+        Args:
+            min_rating (float): Minimum rating
+            max_rating (float): Maximum rating
+            year (int, optional): Release year
+
+        Returns:
+            ndarray: Row positions, highest rating first
+        """
+        if year is None:
+            lo, hi = self._rating_slice(self._neg_ratings, min_rating, max_rating)
+            return self.order[lo:hi]
+
+        start, stop = self.year_range(year)
+        lo, hi = self._rating_slice(self._year_neg_ratings[start:stop], min_rating, max_rating)
+        return self.year_order[start + lo:start + hi]
@@ -0,0 +1,110 @@
+"""
+Film Dataset Ingestion
+Chunked reading of AllMovies_CLEANED.csv with explicit dtypes
+
+The CSV is read DEFAULT_CHUNK_SIZE rows at a time. Each chunk is cleaned and
+turned into TF-IDF soups right away, and the raw list text (genres_list,
+actors) is dropped as soon as it has been parsed, so only the display columns
+of earlier chunks stay in memory while the rest of the file streams through.
+"""
+
+import re
+
+import numpy as np
+import pandas as pd
+
+from utils.film_parsing import parse_list_column
+
+# Column order and dtypes of AllMovies_CLEANED.csv (votes and runtime_minutes
+# are free text such as "690.0" or "94 minutes" and stay strings)
+FILM_DTYPES = {
+    'title': str,
+    'description': str,
+    'release_year': np.float64,
+    'genres_list': str,
+    'rating': np.float64,
+    'votes': str,
+    'directors': str,
+    'actors': str,
+    'runtime_minutes': str,
+}
+FILM_COLUMNS = list(FILM_DTYPES)
+
+# Raw list text, parsed into InternedListColumns and not kept per chunk
+LIST_COLUMNS = ['genres_list', 'actors']
+
+DEFAULT_CHUNK_SIZE = 2000
+
+
+def read_film_chunks(path, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Read the film dataset in chunks
+
+    Args:
+        path (str): Path to AllMovies_CLEANED.csv
+        chunk_size (int): Rows per chunk
+
+    Yields:
+        DataFrame: Consecutive chunks with FILM_COLUMNS and a running index
+    """
+    reader = pd.read_csv(path, usecols=FILM_COLUMNS, dtype=FILM_DTYPES, chunksize=chunk_size)
+    with reader:
+        for chunk in reader:
+            # usecols keeps file order; pin the documented order
+            yield chunk[FILM_COLUMNS]
+
+
+def clean_chunk(chunk):
+    """Fill missing text of one chunk in place"""
+    chunk['description'] = chunk['description'].fillna('')
+    chunk['directors'] = chunk['directors'].fillna('Unknown')
+
+
+def clean_text(text):
+    """Lowercase alphanumeric words for TF-IDF"""
+    if isinstance(text, str):
+        text = text.lower()
+        text = re.sub(r"[^a-zA-Z0-9\s]", " ", text)
+        text = re.sub(r"\s+", " ", text).strip()
+        return text
+    return ""
+
+
+def _token(value):
+    """One soup token per multi-word name (e.g. "Tom Hanks" -> "tom_hanks")"""
+    return value.lower().replace(" ", "_")
+
+
+def film_soups(chunk, genres, actors):
+    """
+    Combined text per film for content-based filtering
+
+    Args:
+        chunk (DataFrame): Cleaned rows (description and directors filled)
+        genres (InternedListColumn): Parsed genres of the same rows
+        actors (InternedListColumn): Parsed actors of the same rows
+
+    Returns:
+        list: description + actors + directors + genres per film
+    """
+    descriptions = chunk['description'].map(clean_text)
+    directors = chunk['directors'].map(lambda x: x.lower().replace(",", " ").replace(" ", "_"))
+    actor_tokens = actors.join(" ", transform=_token)
+    genre_tokens = genres.join(" ", transform=_token)
+
+    return [
+        f"{description} {actor} {director} {genre}"
+        for description, actor, director, genre in zip(descriptions, actor_tokens, directors, genre_tokens)
+    ]
+
+
+def iter_film_soups(path, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Soups of the dataset chunk by chunk, without keeping any rows
+
+    Yields:
+        list: Soups of consecutive chunks
+    """
+    for chunk in read_film_chunks(path, chunk_size):
+        clean_chunk(chunk)
+        yield film_soups(chunk, parse_list_column(chunk['genres_list']), parse_list_column(chunk['actors']))
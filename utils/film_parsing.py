@@ -0,0 +1,168 @@
+"""
+Film List Column Parser
+Safe, vectorized parsing of the stringified Python lists in AllMovies_CLEANED.csv
+
+The genres_list and actors columns hold text such as "['Drama', 'Romance']" or
+"['Adipati Dolken', \"D'Ratu\", nan]". Instead of running eval on every row,
+all quoted items are extracted with one regex pass, interned into a sorted
+vocabulary and stored CSR-style (offsets + int32 codes). Unquoted tokens such
+as nan are skipped; cells that are plain text rather than a list (some actors
+rows are space-joined names) are kept as a single item.
+"""
+
+import numpy as np
+import pandas as pd
+
+# A single- or double-quoted Python string literal
+LIST_ITEM_PATTERN = r"'((?:[^'\\]|\\.)*)'|\"((?:[^\"\\]|\\.)*)\""
+
+
+class InternedListColumn:
+    """
+    List-valued column stored as CSR arrays over an interned vocabulary
+
+    Row i holds vocab[codes[offsets[i]:offsets[i + 1]]].
+    """
+
+    def __init__(self, offsets, codes, vocab):
+        self.offsets = offsets
+        self.codes = codes
+        self.vocab = vocab
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def row_codes(self, i):
+        """Vocabulary codes of row i"""
+        return self.codes[self.offsets[i]:self.offsets[i + 1]]
+
+    def row(self, i):
+        """Items of row i as strings"""
+        return [self.vocab[c] for c in self.row_codes(i)]
+
+    def to_lists(self):
+        """All rows as Python lists of strings"""
+        items = np.asarray(self.vocab, dtype=object)[self.codes]
+        return [items[start:stop].tolist() for start, stop in zip(self.offsets[:-1], self.offsets[1:])]
+
+    def join(self, sep=", ", transform=None, empty=""):
+        """
+        Render every row as one string
+
+        Args:
+            sep (str): Separator between items
+            transform (callable, optional): Applied once per vocabulary item
+            empty (str): Value for rows without items
+
+        Returns:
+            list: One string per row
+        """
+        vocab = [transform(v) for v in self.vocab] if transform else self.vocab
+        items = np.asarray(vocab, dtype=object)[self.codes]
+        return [sep.join(items[start:stop]) or empty for start, stop in zip(self.offsets[:-1], self.offsets[1:])]
+
+    def nbytes(self):
+        """Bytes used by the CSR arrays (excluding the vocabulary)"""
+        return self.offsets.nbytes + self.codes.nbytes
+
+
+def parse_list_column(series):
+    """
+    Parse a column of stringified Python lists without eval
+
+    Args:
+        series (Series): Text such as "['a', 'b', nan]" per row (NaN allowed)
+
+    Returns:
+        InternedListColumn: Parsed rows with a sorted vocabulary
+    """
+    text = series.reset_index(drop=True).fillna("").astype(str).str.strip()
+    is_list = text.str.startswith("[")
+    matches = text.where(is_list, "").str.extractall(LIST_ITEM_PATTERN)
+
+    items = matches[0].fillna(matches[1])
+    if items.str.contains("\\", regex=False).any():
+        items = items.str.replace(r"\\(.)", r"\1", regex=True)
+    rows = matches.index.get_level_values(0).to_numpy(dtype=np.int64)
+
+    # Plain-text cells become one item each, merged back in row order
+    plain = text[~is_list & (text != "")]
+    if len(plain):
+        items = pd.concat([items.reset_index(drop=True), plain.reset_index(drop=True)], ignore_index=True)
+        rows = np.concatenate([rows, plain.index.to_numpy()])
+        order = np.argsort(rows, kind='stable')
+        items, rows = items.iloc[order].reset_index(drop=True), rows[order]
+
+    codes, vocab = pd.factorize(items, sort=True)
+
+    offsets = np.zeros(len(text) + 1, dtype=np.int64)
+    np.cumsum(np.bincount(rows, minlength=len(text)), out=offsets[1:])
+
+    return InternedListColumn(offsets, codes.astype(np.int32), vocab.tolist())
+
+
+def list_bitmasks(column):
+    """
+    Encode each row's items as a uint64 bitmask (bit i = vocab[i])
+
+    Args:
+        column (InternedListColumn): Parsed column with at most 64 distinct items
+
+    Returns:
+        ndarray: uint64 mask per row
+    """
+    if len(column.vocab) > 64:
+        raise ValueError(f"Bitmask encoding supports at most 64 values, got {len(column.vocab)}")
+
+    rows = np.repeat(np.arange(len(column)), np.diff(column.offsets))
+    masks = np.zeros(len(column), dtype=np.uint64)
+    np.bitwise_or.at(masks, rows, np.left_shift(np.uint64(1), column.codes.astype(np.uint64)))
+    return masks
+
+
+class ListColumnBuilder:
+    """
+    Parse a list column chunk by chunk into one InternedListColumn
+
+    Each chunk is parsed with parse_list_column; its local codes are mapped to
+    global ids as they arrive and re-coded against the sorted vocabulary in
+    finish(), so the result equals parsing the whole column at once.
+    """
+
+    def __init__(self):
+        self._ids = {}
+        self._codes = []
+        self._counts = []
+
+    def append(self, series):
+        """
+        Parse one chunk of the column
+
+        Args:
+            series (Series): Text such as "['a', 'b', nan]" per row
+
+        Returns:
+            InternedListColumn: The chunk on its own (local vocabulary)
+        """
+        chunk = parse_list_column(series)
+        local_ids = np.array([self._ids.setdefault(item, len(self._ids)) for item in chunk.vocab], dtype=np.int32)
+        self._codes.append(local_ids[chunk.codes])
+        self._counts.append(np.diff(chunk.offsets))
+        return chunk
+
+    def finish(self):
+        """
+        Combine the appended chunks
+
+        Returns:
+            InternedListColumn: All rows with a sorted vocabulary
+        """
+        vocab = sorted(self._ids)
+        rank = np.empty(len(vocab), dtype=np.int32)
+        rank[[self._ids[item] for item in vocab]] = np.arange(len(vocab), dtype=np.int32)
+
+        counts = np.concatenate(self._counts) if self._counts else np.zeros(0, dtype=np.int64)
+        offsets = np.zeros(len(counts) + 1, dtype=np.int64)
+        np.cumsum(counts, out=offsets[1:])
+        codes = rank[np.concatenate(self._codes)] if self._codes else np.zeros(0, dtype=np.int32)
+        return InternedListColumn(offsets, codes, vocab)
@@ -0,0 +1,72 @@
+"""
+Film Result Cursor
+Lazy, paginated view over the rows matched by a film filter or search
+
+Filters resolve to an array of row positions (already in display order);
+the cursor only slices the film DataFrame for the rows that are asked for,
+so the total count is free and a page costs O(page size).
+"""
+
+import numpy as np
+
+DEFAULT_PAGE_SIZE = 20
+
+
+class FilmResultCursor:
+    """
+    Ordered row positions over a film DataFrame, materialized page by page
+    """
+
+    def __init__(self, df, rows, page_size=DEFAULT_PAGE_SIZE):
+        """
+        Args:
+            df (DataFrame): Film data
+            rows (array-like): Matching row positions in display order
+            page_size (int): Default rows per page
+        """
+        self.df = df
+        self.rows = np.asarray(rows, dtype=np.int64)
+        self.page_size = page_size
+
+    @property
+    def total(self):
+        """Number of matching films"""
+        return len(self.rows)
+
+    def __len__(self):
+        return self.total
+
+    @property
+    def empty(self):
+        return self.total == 0
+
+    @property
+    def n_pages(self):
+        """Number of pages at the default page size"""
+        return -(-self.total // self.page_size)
+
+    def page(self, number, page_size=None):
+        """
+        One page of results
+
+        Args:
+            number (int): Page number, starting at 0
+            page_size (int, optional): Rows per page (default: self.page_size)
+
+        Returns:
+            DataFrame: Films on the page (empty past the last page)
+        """
+        size = page_size or self.page_size
+        start = max(number, 0) * size
+        return self.df.iloc[self.rows[start:start + size]]
+
+    def head(self, n=5):
+        """First n films"""
+        return self.df.iloc[self.rows[:max(n, 0)]]
+
+    def to_frame(self):
+        """All matching films (materializes every row)"""
+        return self.df.iloc[self.rows]
+
+    def __repr__(self):
+        return f"FilmResultCursor(total={self.total}, page_size={self.page_size})"
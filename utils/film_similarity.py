@@ -0,0 +1,393 @@
+"""
+Film Similarity Backend
+Sparse top-k neighbor engine for content-based film recommendations
+
+Replaces the dense N x N cosine similarity matrix with a k-NN table that is
+computed block by block from sparse row-times-matrix products.
+FilmSimilarityModel bundles the fitted vectorizer and the neighbor index into
+one read-only object shared by the engine and the film chatbot.
+"""
+
+import numpy as np
+from sklearn.feature_extraction.text import TfidfVectorizer
+
+from utils.film_tfidf import VECTORIZER_PARAMS, fit_vectorizer_chunks, parallel_fit_vectorizer, resolve_workers
+
+# Upper bound for the dense scratch block of a blocked similarity product
+DEFAULT_BLOCK_BYTES = 32 * 1024 ** 2
+
+
+def top_k(scores, k, exclude=None):
+    """
+    Positions and values of the k largest scores, for one query or a batch
+
+    Uses np.argpartition, so the cost is O(n) per query plus O(k log k) to
+    order the winners, instead of sorting all n scores.
+
+    Args:
+        scores (ndarray): (n,) scores for one query or (q, n) for a batch
+        k (int): Results per query (capped at the number of candidates)
+        exclude (int or array-like, optional): Position to leave out per query,
+            e.g. the query film itself; one value per row for a batch
+
+    Returns:
+        tuple: (int32 positions, float32 scores), best first, shaped (k,) or (q, k);
+            equal scores are ordered by position (which of several tied scores
+            at the cut-off is kept is unspecified)
+    """
+    scores = np.asarray(scores)
+    single = scores.ndim == 1
+    scores = np.atleast_2d(scores)
+    n_queries, n_items = scores.shape
+
+    if exclude is not None:
+        exclude = np.broadcast_to(np.asarray(exclude, dtype=np.int64), (n_queries,))
+    k = max(0, min(k, n_items - (exclude is not None)))
+
+    if k == 0:
+        top = np.empty((n_queries, 0), dtype=np.int32)
+        top_scores = np.empty((n_queries, 0), dtype=np.float32)
+    else:
+        # One spare candidate per query in case the excluded position makes the cut
+        m = min(k + (exclude is not None), n_items)
+        if m < n_items:
+            # Partition from the top end, avoiding a negated copy of the scores
+            top = np.argpartition(scores, n_items - m, axis=1)[:, n_items - m:]
+        else:
+            top = np.broadcast_to(np.arange(n_items), (n_queries, n_items))
+        top_scores = np.take_along_axis(scores, top, axis=1)
+
+        order = np.lexsort((top, -top_scores), axis=-1)
+        top = np.take_along_axis(top, order, axis=1)
+        top_scores = np.take_along_axis(top_scores, order, axis=1)
+
+        if exclude is not None:
+            keep = top != exclude[:, None]
+            # Excluded position not among the candidates: drop the spare instead
+            keep[keep.all(axis=1), -1] = False
+            top = top[keep].reshape(n_queries, k)
+            top_scores = top_scores[keep].reshape(n_queries, k)
+        else:
+            top, top_scores = top[:, :k], top_scores[:, :k]
+
+        top = top.astype(np.int32)
+        top_scores = top_scores.astype(np.float32)
+
+    if single:
+        return top[0], top_scores[0]
+    return top, top_scores
+
+
+class SparseNeighborIndex:
+    """
+    Top-k cosine neighbors over an L2-normalized sparse TF-IDF matrix
+
+    Only the k best neighbors of every film are kept (as int32 ids and
+    float32 scores). Requests for more than k neighbors fall back to a single
+    on-demand sparse row product, so memory grows linearly with the catalogue.
+    """
+
+    def __init__(self, tfidf_matrix, k=50, block_bytes=DEFAULT_BLOCK_BYTES):
+        """
+        Build the neighbor table
+
+        Args:
+            tfidf_matrix: Sparse TF-IDF matrix (rows L2-normalized)
+            k (int): Number of neighbors to precompute per film
+            block_bytes (int): Upper bound for the dense scratch block
+        """
+        self.tfidf_matrix = tfidf_matrix.tocsr()
+        self._matrix_t = self.tfidf_matrix.T.tocsr()
+        n_films = self.tfidf_matrix.shape[0]
+        self.k = max(0, min(k, n_films - 1))
+        self.block_bytes = block_bytes
+        self.neighbors, self.scores = self._build_table(block_bytes)
+
+    @classmethod
+    def from_table(cls, tfidf_matrix, neighbors, scores):
+        """
+        Rebuild the index from a previously computed neighbor table
+
+        Args:
+            tfidf_matrix: Sparse TF-IDF matrix the table was computed from
+            neighbors (ndarray): (n_films, k) neighbor row positions
+            scores (ndarray): (n_films, k) neighbor similarity scores
+
+        Returns:
+            SparseNeighborIndex: Index ready for queries
+        """
+        index = cls.__new__(cls)
+        index.tfidf_matrix = tfidf_matrix.tocsr()
+        index._matrix_t = index.tfidf_matrix.T.tocsr()
+        index.k = neighbors.shape[1]
+        index.block_bytes = DEFAULT_BLOCK_BYTES
+        index.neighbors = neighbors
+        index.scores = scores
+        return index
+
+    def __len__(self):
+        return self.tfidf_matrix.shape[0]
+
+    def __getitem__(self, idx):
+        """Dense similarity row for one film (drop-in for cosine_sim[idx])"""
+        return self.similarity_row(idx)
+
+    def _build_table(self, block_bytes):
+        """Compute the top-k table in row blocks of bounded size"""
+        n_films = len(self)
+        neighbors = np.empty((n_films, self.k), dtype=np.int32)
+        scores = np.empty((n_films, self.k), dtype=np.float32)
+        if self.k == 0:
+            return neighbors, scores
+
+        rows = np.arange(n_films)
+        for start, stop, top, top_scores in self._blocked_top_k(rows, self.k, block_bytes):
+            neighbors[start:stop] = top
+            scores[start:stop] = top_scores
+
+        return neighbors, scores
+
+    def _blocked_top_k(self, rows, n, block_bytes):
+        """Yield (start, stop, positions, scores) of the top-n neighbors per block of query rows"""
+        rows_per_block = max(1, block_bytes // (8 * len(self)))
+        for start in range(0, len(rows), rows_per_block):
+            stop = min(start + rows_per_block, len(rows))
+            block = (self.tfidf_matrix[rows[start:stop]] @ self._matrix_t).toarray()
+
+            # Exclude each film from its own neighbor list
+            top, top_scores = top_k(block, n, exclude=rows[start:stop])
+            yield start, stop, top, top_scores
+
+    def similarity_row(self, idx):
+        """
+        Cosine similarity of one film against the whole catalogue
+
+        Args:
+            idx (int): Row position of the film
+
+        Returns:
+            ndarray: Similarity scores, one per film
+        """
+        return (self.tfidf_matrix[idx] @ self._matrix_t).toarray().ravel()
+
+    def most_similar(self, idx, n=5):
+        """
+        Get the n most similar films (excluding the film itself)
+
+        Args:
+            idx (int): Row position of the film
+            n (int): Number of neighbors
+
+        Returns:
+            tuple: (row positions, similarity scores), best first
+        """
+        if n <= self.k:
+            return self.neighbors[idx, :n], self.scores[idx, :n]
+
+        # Beyond the precomputed table: one sparse row product
+        return top_k(self.similarity_row(idx), n, exclude=idx)
+
+    def most_similar_batch(self, indices, n=5):
+        """
+        Get the n most similar films for many films at once
+
+        Args:
+            indices (array-like): Row positions of the query films
+            n (int): Number of neighbors per film
+
+        Returns:
+            tuple: (row positions, similarity scores), each (len(indices), n), best first
+        """
+        indices = np.asarray(indices, dtype=np.int64)
+        if n <= self.k:
+            return self.neighbors[indices, :n], self.scores[indices, :n]
+
+        # Beyond the precomputed table: blocked sparse products over the query rows
+        n = max(0, min(n, len(self) - 1))
+        neighbors = np.empty((len(indices), n), dtype=np.int32)
+        scores = np.empty((len(indices), n), dtype=np.float32)
+        for start, stop, top, top_scores in self._blocked_top_k(indices, n, self.block_bytes):
+            neighbors[start:stop] = top
+            scores[start:stop] = top_scores
+        return neighbors, scores
+
+    def search_query(self, query_tfidf, n=3):
+        """
+        Top-n films for a TF-IDF query row (e.g. free text)
+
+        Args:
+            query_tfidf: (1, n_features) sparse TF-IDF row
+            n (int): Number of films
+
+        Returns:
+            tuple: (row positions, similarity scores), best first
+        """
+        return top_k((query_tfidf @ self._matrix_t).toarray().ravel(), n)
+
+    def readonly_arrays(self):
+        """Arrays shared with consumers (frozen by FilmSimilarityModel)"""
+        arrays = [self.neighbors, self.scores]
+        for matrix in (self.tfidf_matrix, self._matrix_t):
+            arrays.extend([matrix.data, matrix.indices, matrix.indptr])
+        return arrays
+
+    def memory_usage(self):
+        """
+        Memory held by the index
+
+        Returns:
+            dict: Bytes used by the TF-IDF matrix and the neighbor table
+        """
+        def csr_bytes(m):
+            return m.data.nbytes + m.indices.nbytes + m.indptr.nbytes
+
+        usage = {
+            'tfidf_matrix': csr_bytes(self.tfidf_matrix) + csr_bytes(self._matrix_t),
+            'neighbor_table': self.neighbors.nbytes + self.scores.nbytes,
+        }
+        usage['total'] = sum(usage.values())
+        return usage
+
+
+class FilmSimilarityModel:
+    """
+    Fitted TF-IDF vectorizer plus neighbor index, shared read-only
+
+    One instance is built (or loaded from the artifact cache) by
+    FilmRecommendationEngine and reused by the film chatbot for both
+    film-to-film recommendations and free-text retrieval.
+    """
+
+    def __init__(self, vectorizer, neighbor_index):
+        """
+        Args:
+            vectorizer: Fitted TfidfVectorizer
+            neighbor_index: Index over the vectorizer output (SparseNeighborIndex,
+                or any backend with the same query methods, e.g. IVFNeighborIndex)
+        """
+        self._vectorizer = vectorizer
+        self._index = neighbor_index
+        self._freeze()
+
+    @classmethod
+    def fit(cls, soup, n_neighbors=50, n_jobs=None):
+        """
+        Fit the TF-IDF model and neighbor index on film soups
+
+        Args:
+            soup (Series or list): One combined text document per film
+            n_neighbors (int): Neighbors to precompute per film
+            n_jobs (int): Processes for the TF-IDF build (see fit_vectorizer)
+
+        Returns:
+            FilmSimilarityModel: Fitted model
+        """
+        vectorizer, tfidf_matrix = cls.fit_vectorizer(soup, n_jobs=n_jobs)
+        return cls(vectorizer, SparseNeighborIndex(tfidf_matrix, k=n_neighbors))
+
+    @staticmethod
+    def fit_vectorizer(soup, n_jobs=None):
+        """
+        Fit the TF-IDF vectorizer on film soups
+
+        Args:
+            soup (Series or list): One combined text document per film
+            n_jobs (int): Processes counting n-grams (None or 1 = in process,
+                -1 = all cores, see utils/film_tfidf.py)
+
+        Returns:
+            tuple: (fitted TfidfVectorizer, sparse TF-IDF matrix)
+        """
+        if resolve_workers(n_jobs) > 1:
+            vectorizer, tfidf_matrix = parallel_fit_vectorizer(soup, n_jobs=n_jobs, **VECTORIZER_PARAMS)
+        else:
+            vectorizer = TfidfVectorizer(**VECTORIZER_PARAMS)
+            tfidf_matrix = vectorizer.fit_transform(soup)
+
+        # Pruned-term list is only kept for introspection and can be huge
+        if hasattr(vectorizer, 'stop_words_'):
+            del vectorizer.stop_words_
+
+        return vectorizer, tfidf_matrix
+
+    @staticmethod
+    def fit_vectorizer_chunks(chunks, n_jobs=None):
+        """
+        Fit the TF-IDF vectorizer on film soups that arrive in chunks
+
+        Args:
+            chunks (iterable): Lists of soups in row order, consumed lazily
+            n_jobs (int): Processes counting n-grams (None or 1 = in process)
+
+        Returns:
+            tuple: (fitted TfidfVectorizer, sparse TF-IDF matrix)
+        """
+        return fit_vectorizer_chunks(chunks, n_jobs=n_jobs, **VECTORIZER_PARAMS)
+
+    def _freeze(self):
+        """Mark the shared arrays read-only so no consumer can mutate them"""
+        for array in self._index.readonly_arrays():
+            if array.flags.writeable:
+                array.flags.writeable = False
+
+    @property
+    def vectorizer(self):
+        return self._vectorizer
+
+    @property
+    def neighbor_index(self):
+        return self._index
+
+    @property
+    def tfidf_matrix(self):
+        return self._index.tfidf_matrix
+
+    def __len__(self):
+        return len(self._index)
+
+    def __getitem__(self, idx):
+        """Dense similarity row for one film (drop-in for cosine_sim[idx])"""
+        return self._index.similarity_row(idx)
+
+    def most_similar(self, idx, n=5):
+        """
+        Get the n most similar films (excluding the film itself)
+
+        Args:
+            idx (int): Row position of the film
+            n (int): Number of neighbors
+
+        Returns:
+            tuple: (row positions, similarity scores), best first
+        """
+        return self._index.most_similar(idx, n)
+
+    def most_similar_batch(self, indices, n=5):
+        """
+        Get the n most similar films for many films at once
+
+        Args:
+            indices (array-like): Row positions of the query films
+            n (int): Number of neighbors per film
+
+        Returns:
+            tuple: (row positions, similarity scores), each (len(indices), n), best first
+        """
+        return self._index.most_similar_batch(indices, n)
+
+    def search_text(self, text, top_k=3):
+        """
+        Retrieve the films closest to a free-text query
+
+        Args:
+            text (str): Query text
+            top_k (int): Number of films to return
+
+        Returns:
+            tuple: (row positions, similarity scores), best first
+        """
+        return self._index.search_query(self._vectorizer.transform([text]), top_k)
+
+    def memory_usage(self):
+        """Bytes held by the TF-IDF matrix and neighbor table"""
+        return self._index.memory_usage()
@@ -0,0 +1,277 @@
+"""
+Parallel TF-IDF
+Multi-process build of the film TF-IDF model for large catalogues
+
+The soups are split into chunks and each worker process tokenizes its chunk
+once with a CountVectorizer using the same analyzer settings. Workers return
+their local vocabulary and term counts; the parent merges them into
+global term and document frequencies, applies the same
+min_df / max_df / max_features selection as scikit-learn, remaps the chunk
+counts onto the kept vocabulary and fits the IDF weights. Chunks may also
+come from a lazy reader (fit_vectorizer_chunks) and are counted as they arrive.
+
+Vocabulary, IDF weights, counts and sparsity pattern equal a single-process
+TfidfVectorizer.fit_transform. Rows come out with sorted column indices, so
+the L2 row norms are summed in a different order and values may differ in
+the last bit (~1e-16); the output itself does not depend on the number of
+workers or the chunk size.
+"""
+
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from numbers import Integral
+
+import numpy as np
+import scipy.sparse as sp
+from sklearn.feature_extraction.text import CountVectorizer, TfidfTransformer, TfidfVectorizer
+
+# Settings shared by the serial and the parallel build
+VECTORIZER_PARAMS = {
+    'stop_words': 'english',
+    'ngram_range': (1, 3),
+    'max_features': 50000,
+}
+
+# Chunks per worker, so one slow chunk does not hold up the pool
+CHUNKS_PER_WORKER = 4
+
+# Vectorizer settings that only affect the global vocabulary selection
+_SELECTION_PARAMS = ('max_features', 'min_df', 'max_df', 'vocabulary')
+
+
+def resolve_workers(n_jobs):
+    """Number of worker processes for n_jobs (None or 1 = serial, -1 = all cores)"""
+    if n_jobs is None:
+        return 1
+    if n_jobs < 0:
+        return max(1, (os.cpu_count() or 1) + 1 + n_jobs)
+    return max(1, n_jobs)
+
+
+def _count_chunk(docs, params, vocabulary=None):
+    """
+    Tokenize and count one chunk of documents
+
+    Mirrors CountVectorizer._count_vocab; sorting and pruning are left to the
+    caller, which sees every chunk. In a worker process the chunk gets its own
+    vocabulary; in process the caller's global vocabulary is extended directly.
+
+    Returns:
+        tuple: (terms in first-seen order, or None when counted into the given
+            vocabulary; CSR counts with columns in vocabulary order)
+    """
+    counter = CountVectorizer(**params)
+    analyze = counter.build_analyzer()
+    local = vocabulary is None
+    if local:
+        vocabulary = {}
+    indices = []
+    values = []
+    indptr = [0]
+    for doc in docs:
+        feature_counter = {}
+        for term in analyze(doc):
+            index = vocabulary.setdefault(term, len(vocabulary))
+            feature_counter[index] = feature_counter.get(index, 0) + 1
+        indices.extend(feature_counter.keys())
+        values.extend(feature_counter.values())
+        indptr.append(len(indices))
+
+    counts = sp.csr_matrix(
+        (np.asarray(values, dtype=counter.dtype), np.asarray(indices, dtype=np.int32), np.asarray(indptr)),
+        shape=(len(docs), len(vocabulary)),
+    )
+    if counter.binary:
+        counts.data.fill(1)
+    return (list(vocabulary) if local else None), counts
+
+
+def _select_features(dfs, tfs, n_docs, params):
+    """Mask of kept terms, following CountVectorizer._limit_features"""
+    max_df = params.get('max_df', 1.0)
+    min_df = params.get('min_df', 1)
+    max_features = params.get('max_features')
+    max_doc_count = max_df if isinstance(max_df, Integral) else max_df * n_docs
+    min_doc_count = min_df if isinstance(min_df, Integral) else min_df * n_docs
+    if max_doc_count < min_doc_count:
+        raise ValueError("max_df corresponds to < documents than min_df")
+
+    mask = (dfs <= max_doc_count) & (dfs >= min_doc_count)
+    if max_features is not None and mask.sum() > max_features:
+        # Same (unstable) argsort over the same alphabetical order as scikit-learn,
+        # so ties on the cut-off resolve identically
+        mask_inds = (-tfs[mask]).argsort()[:max_features]
+        new_mask = np.zeros(len(dfs), dtype=bool)
+        new_mask[np.where(mask)[0][mask_inds]] = True
+        mask = new_mask
+
+    if not mask.any():
+        raise ValueError("After pruning, no terms remain. Try a lower min_df or a higher max_df.")
+    return mask
+
+
+def _split(soup, workers, chunk_size=None):
+    """Split documents into chunks (default: CHUNKS_PER_WORKER chunks per worker)"""
+    docs = list(soup)
+    if chunk_size is None:
+        chunk_size = -(-len(docs) // (workers * CHUNKS_PER_WORKER))
+    chunk_size = max(1, chunk_size)
+    return [docs[start:start + chunk_size] for start in range(0, len(docs), chunk_size)]
+
+
+def _map_chunks(chunks, params, workers, vocabulary):
+    """
+    Count chunks in order, in process or over a pool
+
+    At most two chunks per worker are in flight, so a lazy chunk iterator is
+    never read far ahead of the workers.
+    """
+    if workers == 1:
+        for chunk in chunks:
+            yield _count_chunk(chunk, params, vocabulary)
+        return
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending = deque()
+        for chunk in chunks:
+            pending.append(pool.submit(_count_chunk, chunk, params))
+            if len(pending) >= 2 * workers:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+
+def parallel_count(soup, n_jobs=-1, chunk_size=None, **params):
+    """
+    Count n-grams over a process pool and merge the chunk vocabularies
+
+    Args:
+        soup (Series or list): One text document per film
+        n_jobs (int): Worker processes (-1 = all cores)
+        chunk_size (int): Documents per chunk (default: split evenly over
+            CHUNKS_PER_WORKER chunks per worker)
+        **params: CountVectorizer settings (vocabulary is not supported)
+
+    Returns:
+        tuple: (vocabulary dict, CSR term-count matrix)
+    """
+    chunks = _split(soup, resolve_workers(n_jobs), chunk_size)
+    return count_chunks(chunks, n_jobs=n_jobs, **params)
+
+
+def count_chunks(chunks, n_jobs=None, **params):
+    """
+    Count n-grams over an iterable of document chunks
+
+    Chunks are consumed as they are counted, so they can come from a lazy
+    reader (see utils/film_ingest.py) without the whole corpus in memory.
+
+    Args:
+        chunks (iterable): Lists of documents, in row order
+        n_jobs (int): Worker processes (None or 1 = in process, -1 = all cores)
+        **params: CountVectorizer settings (vocabulary is not supported)
+
+    Returns:
+        tuple: (vocabulary dict, CSR term-count matrix)
+    """
+    if params.get('vocabulary') is not None:
+        raise ValueError("parallel_count learns the vocabulary, a fixed vocabulary is not supported")
+
+    # Workers only tokenize; term selection needs the global counts.
+    # Columns are first-seen ids in one shared vocabulary, so every term string
+    # is held once however many chunks contain it
+    analyzer_params = {key: value for key, value in params.items() if key not in _SELECTION_PARAMS}
+    vocabulary = {}
+    blocks = []
+    for terms, counts in _map_chunks(chunks, analyzer_params, resolve_workers(n_jobs), vocabulary):
+        if terms is not None:
+            ids = np.fromiter((vocabulary.setdefault(term, len(vocabulary)) for term in terms),
+                              dtype=np.int32, count=len(terms))
+            counts.indices = ids[counts.indices]
+        blocks.append(counts)
+    if not vocabulary:
+        raise ValueError("empty vocabulary; perhaps the documents only contain stop words")
+    n_docs = sum(counts.shape[0] for counts in blocks)
+
+    # Global alphabetical order, as CountVectorizer._sort_features
+    terms = sorted(vocabulary)
+    sorted_ids = np.fromiter((vocabulary[term] for term in terms), dtype=np.int64, count=len(terms))
+    del vocabulary
+
+    # Term totals keep the dtype of X.sum(axis=0) so the argsort matches
+    dfs = np.zeros(len(terms), dtype=np.int64)
+    tfs = np.zeros(len(terms), dtype=np.asarray(blocks[0][:1].sum(axis=0)).dtype)
+    for counts in blocks:
+        dfs += np.bincount(counts.indices, minlength=len(terms))
+        tfs += np.bincount(counts.indices, weights=counts.data, minlength=len(terms)).astype(tfs.dtype)
+    dfs, tfs = dfs[sorted_ids], tfs[sorted_ids]
+
+    mask = _select_features(dfs, tfs, n_docs, params)
+    new_indices = np.cumsum(mask) - 1
+    n_features = int(mask.sum())
+    column_map = np.full(len(terms), -1, dtype=np.int64)
+    column_map[sorted_ids[mask]] = new_indices[mask]
+
+    # Remap chunk columns onto the kept vocabulary, releasing each chunk as it goes
+    for i, counts in enumerate(blocks):
+        columns = column_map[counts.indices]
+        keep = columns >= 0
+        row_ends = np.concatenate([[0], np.cumsum(keep)])[counts.indptr]
+        blocks[i] = sp.csr_matrix((counts.data[keep], columns[keep].astype(np.int32), row_ends),
+                                  shape=(counts.shape[0], n_features), dtype=counts.dtype)
+
+    counts = sp.vstack(blocks, format='csr')
+    counts.sort_indices()
+    kept_terms = [term for term, keep in zip(terms, mask) if keep]
+    return dict(zip(kept_terms, new_indices[mask])), counts
+
+
+def parallel_fit_vectorizer(soup, n_jobs=-1, chunk_size=None, **params):
+    """
+    Fit a TfidfVectorizer with the counting spread over a process pool
+
+    Args:
+        soup (Series or list): One text document per film
+        n_jobs (int): Worker processes (-1 = all cores)
+        chunk_size (int): Documents per chunk
+        **params: TfidfVectorizer settings
+
+    Returns:
+        tuple: (fitted TfidfVectorizer, sparse TF-IDF matrix), equivalent to
+            TfidfVectorizer(**params).fit_transform(soup)
+    """
+    chunks = _split(soup, resolve_workers(n_jobs), chunk_size)
+    return fit_vectorizer_chunks(chunks, n_jobs=n_jobs, **params)
+
+
+def fit_vectorizer_chunks(chunks, n_jobs=None, **params):
+    """
+    Fit a TfidfVectorizer on documents arriving in chunks
+
+    Args:
+        chunks (iterable): Lists of documents, in row order
+        n_jobs (int): Worker processes (None or 1 = in process, -1 = all cores)
+        **params: TfidfVectorizer settings
+
+    Returns:
+        tuple: (fitted TfidfVectorizer, sparse TF-IDF matrix), equivalent to
+            fitting on the concatenated chunks
+    """
+    vectorizer = TfidfVectorizer(**params)
+    count_params = {
+        key: value for key, value in vectorizer.get_params().items()
+        if key not in ('norm', 'use_idf', 'smooth_idf', 'sublinear_tf')
+    }
+    vocabulary, counts = count_chunks(chunks, n_jobs=n_jobs, **count_params)
+
+    # Same state TfidfVectorizer.fit_transform leaves behind
+    vectorizer.fixed_vocabulary_ = False
+    vectorizer.vocabulary_ = vocabulary
+    vectorizer._tfidf = TfidfTransformer(
+        norm=vectorizer.norm,
+        use_idf=vectorizer.use_idf,
+        smooth_idf=vectorizer.smooth_idf,
+        sublinear_tf=vectorizer.sublinear_tf,
+    ).fit(counts)
+    return vectorizer, vectorizer._tfidf.transform(counts, copy=False)
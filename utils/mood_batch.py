@@ -0,0 +1,192 @@
+"""
+Batch Mood Prediction
+Labels large track feeds with music_mood_model.pkl, chunk by chunk
+
+Reads CSV or Parquet in chunks, predicts one chunk per model.predict call
+(optionally across a process pool) and streams the labelled rows to CSV or
+Parquet. Falls back to the valence/energy rules when the model is missing.
+
+Usage:
+    python -m utils.mood_batch tracks.csv moods.csv [--chunksize 50000] [--workers 4]
+"""
+
+import argparse
+import os
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+import joblib
+import pandas as pd
+
+from utils.mood_rules import classify_moods
+
+DATA_DIR = os.path.normpath(os.path.join(os.path.dirname(__file__), "..", "data", "music"))
+DEFAULT_MODEL_PATH = os.path.join(DATA_DIR, "music_mood_model.pkl")
+DEFAULT_ENCODER_PATH = os.path.join(DATA_DIR, "label_encoder.pkl")
+
+# Feature order the model was trained on
+MOOD_FEATURES = [
+    'danceability', 'energy', 'valence', 'tempo',
+    'acousticness', 'instrumentalness', 'loudness', 'speechiness'
+]
+
+# Per-process model, loaded once by _init_worker
+_model = None
+_label_encoder = None
+
+
+def _init_worker(model_path, encoder_path):
+    """Load the model and encoder once per process"""
+    global _model, _label_encoder
+    try:
+        _model = joblib.load(model_path)
+        _label_encoder = joblib.load(encoder_path)
+    except Exception as e:
+        print(f"Mood model not available ({e}), using rule-based moods")
+        _model = None
+        _label_encoder = None
+
+
+def predict_chunk(chunk):
+    """
+    Add a 'mood' column to one chunk of tracks
+
+    Args:
+        chunk (DataFrame): Tracks with the MOOD_FEATURES columns
+
+    Returns:
+        DataFrame: The same chunk with a 'mood' column
+    """
+    if _model is not None and _label_encoder is not None:
+        chunk['mood'] = _label_encoder.inverse_transform(_model.predict(chunk[MOOD_FEATURES]))
+    else:
+        chunk['mood'] = classify_moods(chunk['valence'], chunk['energy'])
+    return chunk
+
+
+def _is_parquet(path):
+    return os.path.splitext(path)[1].lower() in ('.parquet', '.pq')
+
+
+def iter_chunks(input_path, chunksize):
+    """
+    Stream a CSV or Parquet file as DataFrame chunks
+
+    Args:
+        input_path (str): Input file
+        chunksize (int): Rows per chunk
+
+    Yields:
+        DataFrame: Next chunk of rows
+    """
+    if _is_parquet(input_path):
+        try:
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise ImportError("Reading Parquet requires pyarrow: pip install pyarrow")
+        for batch in pq.ParquetFile(input_path).iter_batches(batch_size=chunksize):
+            yield batch.to_pandas()
+    else:
+        yield from pd.read_csv(input_path, chunksize=chunksize)
+
+
+class _ChunkWriter:
+    """Append labelled chunks to a CSV or Parquet file"""
+
+    def __init__(self, output_path):
+        self.output_path = output_path
+        self._parquet_writer = None
+        self._first = True
+
+    def write(self, chunk):
+        if _is_parquet(self.output_path):
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+            table = pa.Table.from_pandas(chunk, preserve_index=False)
+            if self._parquet_writer is None:
+                self._parquet_writer = pq.ParquetWriter(self.output_path, table.schema)
+            self._parquet_writer.write_table(table)
+        else:
+            chunk.to_csv(self.output_path, mode='w' if self._first else 'a', header=self._first, index=False)
+        self._first = False
+
+    def close(self):
+        if self._parquet_writer is not None:
+            self._parquet_writer.close()
+
+
+def predict_moods_batch(input_path, output_path, chunksize=50000, workers=1,
+                        model_path=DEFAULT_MODEL_PATH, encoder_path=DEFAULT_ENCODER_PATH, verbose=True):
+    """
+    Label every track in a feed with its predicted mood
+
+    Args:
+        input_path (str): CSV or Parquet file with the MOOD_FEATURES columns
+        output_path (str): CSV or Parquet file to write (input columns + 'mood')
+        chunksize (int): Rows per model.predict call
+        workers (int): Worker processes (1 = predict in this process)
+        model_path (str): Trained mood model
+        encoder_path (str): Label encoder for the model classes
+        verbose (bool): Print progress per chunk
+
+    Returns:
+        dict: 'rows', 'chunks', 'seconds' and 'rows_per_sec'
+    """
+    writer = _ChunkWriter(output_path)
+    rows = chunks = 0
+    start = time.perf_counter()
+
+    def record(chunk):
+        nonlocal rows, chunks
+        writer.write(chunk)
+        rows += len(chunk)
+        chunks += 1
+        if verbose:
+            elapsed = time.perf_counter() - start
+            print(f"chunk {chunks}: {rows:,} rows, {rows / elapsed:,.0f} rows/sec")
+
+    try:
+        if workers <= 1:
+            _init_worker(model_path, encoder_path)
+            for chunk in iter_chunks(input_path, chunksize):
+                record(predict_chunk(chunk))
+        else:
+            with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                     initargs=(model_path, encoder_path)) as pool:
+                # Bounded window of in-flight chunks keeps memory flat and output ordered
+                pending = deque()
+                for chunk in iter_chunks(input_path, chunksize):
+                    pending.append(pool.submit(predict_chunk, chunk))
+                    if len(pending) >= 2 * workers:
+                        record(pending.popleft().result())
+                while pending:
+                    record(pending.popleft().result())
+    finally:
+        writer.close()
+
+    seconds = time.perf_counter() - start
+    return {
+        'rows': rows,
+        'chunks': chunks,
+        'seconds': round(seconds, 3),
+        'rows_per_sec': round(rows / seconds, 1) if seconds > 0 else 0.0,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Batch mood prediction over CSV/Parquet track feeds")
+    parser.add_argument("input", help="Input CSV or Parquet file")
+    parser.add_argument("output", help="Output CSV or Parquet file")
+    parser.add_argument("--chunksize", type=int, default=50000, help="Rows per prediction chunk")
+    parser.add_argument("--workers", type=int, default=1, help="Worker processes")
+    parser.add_argument("--model", default=DEFAULT_MODEL_PATH, help="Path to music_mood_model.pkl")
+    parser.add_argument("--encoder", default=DEFAULT_ENCODER_PATH, help="Path to label_encoder.pkl")
+    args = parser.parse_args()
+
+    stats = predict_moods_batch(args.input, args.output, args.chunksize, args.workers, args.model, args.encoder)
+    print(f"Done: {stats['rows']:,} rows in {stats['seconds']}s ({stats['rows_per_sec']:,.0f} rows/sec)")
+
+
+if __name__ == "__main__":
+    main()
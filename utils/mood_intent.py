@@ -0,0 +1,257 @@
+"""
+Mood Intent Router
+Local intent classification for the music chatbot
+
+Most chat messages are plain mood statements ("saya sedih", "I'm happy"):
+the system prompt maps them to one of four moods and the agent calls
+recommend_music. MoodIntentRouter resolves those without the LLM. It combines
+the prompt's mood lexicon (plus English equivalents) with a small character
+n-gram model trained on phrases generated from the same lexicon. A message is
+answered locally only when both agree on one mood and nothing else in the
+message (negation, mixed feelings, an artist/genre/feature request, a long
+story) needs the agent. Everything else goes to the LLM as before.
+"""
+
+import re
+import threading
+from collections import Counter, namedtuple
+from itertools import product
+
+from sklearn.feature_extraction.text import TfidfVectorizer
+from sklearn.linear_model import LogisticRegression
+from sklearn.pipeline import make_pipeline
+
+MOODS = ['Happy', 'Sad', 'Calm', 'Tense']
+OTHER = 'Other'
+
+# DETEKSI MOOD OTOMATIS from the system prompt, plus English equivalents
+MOOD_LEXICON = {
+    'Sad': {
+        'id': ['sedih', 'galau', 'patah hati', 'kecewa', 'ditinggal', 'nangis', 'sendu', 'kangen'],
+        'en': ['heartbroken', 'broken heart', 'lonely', 'depressed', 'down', 'upset', 'crying', 'unhappy'],
+    },
+    'Happy': {
+        'id': ['senang', 'seneng', 'excited', 'bahagia', 'semangat', 'gembira', 'ceria'],
+        'en': ['glad', 'joyful', 'cheerful', 'good mood', 'thrilled'],
+    },
+    'Calm': {
+        'id': ['capek', 'cape', 'lelah', 'ingin tenang', 'butuh ketenangan', 'relax', 'santai', 'tenang'],
+        'en': ['tired', 'relaxed', 'chill', 'peaceful', 'exhausted', 'unwind', 'sleepy'],
+    },
+    'Tense': {
+        'id': ['stres', 'stress', 'cemas', 'panik', 'tertekan', 'pusing kuliah', 'pusing', 'gelisah', 'takut'],
+        'en': ['stressed', 'anxious', 'nervous', 'panic', 'overwhelmed', 'worried', 'tense'],
+    },
+}
+
+# Mood names themselves ("lagu untuk mood calm") are used in both languages
+MOOD_NAMES = {mood.lower(): mood for mood in MOODS}
+
+# Words that mean the message is not a plain "I feel <mood>" request
+NEGATIONS = ['tidak', 'tdk', 'nggak', 'ngga', 'gak', 'ga', 'enggak', 'bukan', 'jangan', 'belum',
+             'not', "don't", 'dont', "isn't", "aren't", 'no', 'never', 'without', 'tanpa']
+CONTRASTS = ['tapi', 'tetapi', 'namun', 'padahal', 'but', 'although', 'though', 'however']
+SLOT_WORDS = ['artis', 'artist', 'penyanyi', 'singer', 'band', 'genre', 'album', 'judul', 'title',
+              'prediksi', 'predict', 'fitur', 'feature', 'features', 'danceability', 'valence', 'energy',
+              'tempo', 'acousticness', 'loudness', 'mirip', 'similar', 'like', 'seperti', 'kenapa', 'why',
+              'lain', 'other', 'another', 'more']
+
+# Marks an English message (the reply template follows the user's language)
+ENGLISH_MARKERS = ['i', "i'm", 'im', 'am', 'feel', 'feeling', 'me', 'my', 'some', 'song', 'songs',
+                   'music', 'please', 'recommend', 'today', 'so', 'very', 'really']
+
+# Phrases the classifier is trained on; {kw} is a lexicon entry
+TEMPLATES = {
+    'id': ['{kw}', 'saya {kw}', 'aku {kw}', 'aku lagi {kw}', 'saya sedang {kw}', 'aku lagi {kw} banget',
+           'hari ini aku {kw}', 'lagi {kw} nih', 'aku merasa {kw}', 'rekomendasi lagu buat yang lagi {kw}',
+           'lagu untuk orang {kw}', 'lagi {kw}, ada lagu?', 'putar lagu {kw} dong', 'aku {kw} banget hari ini',
+           'lagu untuk mood {kw}', 'rekomendasikan lagu, aku {kw}'],
+    'en': ['{kw}', "i'm {kw}", 'i am {kw}', 'i feel {kw}', "i'm feeling {kw}", 'feeling {kw} today',
+           'so {kw} right now', 'songs for when you are {kw}', "i'm so {kw}, recommend some music",
+           'music for a {kw} day', 'play something, i am {kw}', 'mood {kw}'],
+}
+
+# Non-mood requests and off-topic messages (class "Other")
+OTHER_EXAMPLES = [
+    'prediksi mood lagu dengan danceability 0.7 energy 0.8', 'predict the mood of these features',
+    'lagu dari taylor swift', 'songs by the beatles', 'rekomendasi lagu genre rock', 'recommend jazz songs',
+    'lagu yang mirip dengan bohemian rhapsody', 'siapa presiden indonesia', 'bagaimana cuaca hari ini',
+    'what is the capital of france', 'apa itu valence', 'what does energy mean', 'halo', 'hai', 'hello',
+    'terima kasih', 'thanks', 'yang lain dong', 'lagi dong', 'another one', 'kenapa lagu itu',
+    'siapa penyanyinya', 'album apa itu', 'lagu terbaru', 'lagu paling populer', 'top songs this year',
+    'ceritakan sejarah musik', 'tell me about hip hop', 'berapa jumlah lagu di dataset', 'how many songs',
+    'genre apa saja yang ada', 'what genres are there', 'apa kabar', 'how are you', 'rekomendasi lagu dong',
+    'recommend me a song', 'kasih lagu random', 'musik apa yang bagus', 'aku suka lagu pop',
+    'i like rock music', 'artis favoritku adele', 'putar spotify', 'lagu untuk olahraga', 'music for studying',
+    'lagu buat nyetir', 'songs for a party', 'lagu bahasa jepang', 'korean songs', 'lagu anak anak',
+]
+
+RouteDecision = namedtuple('RouteDecision', ['mood', 'confidence', 'language', 'reason'])
+RouteDecision.__doc__ = """
+Routing outcome for one message
+
+mood is None when the message goes to the LLM; reason says why
+('local', 'no_mood', 'mixed_moods', 'negation', 'contrast', 'slot',
+'too_long', 'low_confidence' or 'disagree').
+"""
+
+
+def normalize(text):
+    """Lowercase, collapse stretched letters ("sediiih" -> "sedih") and squeeze whitespace"""
+    text = text.lower()
+    text = re.sub(r"([^\W\d_])\1{2,}", r"\1", text)
+    text = re.sub(r"[^\w\s']", " ", text)
+    return re.sub(r"\s+", " ", text).strip()
+
+
+def _phrase_pattern(phrases):
+    """Whole-word regex matching any of the phrases"""
+    alternatives = sorted({re.escape(p) for p in phrases}, key=len, reverse=True)
+    return re.compile(r"(?<![\w'])(?:" + "|".join(alternatives) + r")(?![\w'])")
+
+
+def training_phrases():
+    """
+    Labelled phrases generated from the lexicon
+
+    Returns:
+        tuple: (texts, labels) covering the four moods and OTHER
+    """
+    texts, labels = [], []
+    for mood, languages in MOOD_LEXICON.items():
+        for lang, keywords in languages.items():
+            for template, keyword in product(TEMPLATES[lang], keywords + [mood.lower()]):
+                texts.append(template.format(kw=keyword))
+                labels.append(mood)
+    texts.extend(OTHER_EXAMPLES)
+    labels.extend([OTHER] * len(OTHER_EXAMPLES))
+    return [normalize(t) for t in texts], labels
+
+
+def build_classifier():
+    """Character n-gram logistic regression over training_phrases() (deterministic, ~100 ms)"""
+    texts, labels = training_phrases()
+    classifier = make_pipeline(
+        TfidfVectorizer(analyzer='char_wb', ngram_range=(2, 4), sublinear_tf=True),
+        LogisticRegression(C=10.0, class_weight='balanced', max_iter=2000),
+    )
+    return classifier.fit(texts, labels)
+
+
+class MoodIntentRouter:
+    """
+    Decide whether a chat message can be answered locally, and with which mood
+
+    Thread-safe: the chatbot is shared across Streamlit sessions, so the
+    routing counters are updated under a lock.
+    """
+
+    def __init__(self, threshold=0.6, max_words=20):
+        """
+        Args:
+            threshold (float): Minimum classifier probability for the lexicon mood
+            max_words (int): Longer messages always go to the LLM
+        """
+        self.threshold = threshold
+        self.max_words = max_words
+        self.classifier = build_classifier()
+        self._classes = list(self.classifier.classes_)
+
+        self._mood_patterns = {
+            mood: {lang: _phrase_pattern(keywords) for lang, keywords in languages.items()}
+            for mood, languages in MOOD_LEXICON.items()
+        }
+        self._mood_names = _phrase_pattern(MOOD_NAMES)
+        self._negations = _phrase_pattern(NEGATIONS)
+        self._contrasts = _phrase_pattern(CONTRASTS)
+        self._slots = _phrase_pattern(SLOT_WORDS)
+        self._english = _phrase_pattern(ENGLISH_MARKERS)
+
+        self._lock = threading.Lock()
+        self.routed = Counter()
+
+    def lexicon_moods(self, text):
+        """
+        Moods whose lexicon entries occur in a normalized message
+
+        Returns:
+            tuple: (set of moods, True if an English lexicon entry matched)
+        """
+        moods, english = set(), False
+        for mood, patterns in self._mood_patterns.items():
+            for lang, pattern in patterns.items():
+                if pattern.search(text):
+                    moods.add(mood)
+                    english = english or lang == 'en'
+        moods.update(MOOD_NAMES[name] for name in self._mood_names.findall(text))
+        return moods, english
+
+    def predict(self, text):
+        """
+        Classifier label and probability for a normalized message
+
+        Returns:
+            tuple: (label, probability) where label is a mood or OTHER
+        """
+        proba = self.classifier.predict_proba([text])[0]
+        best = int(proba.argmax())
+        return self._classes[best], float(proba[best])
+
+    def _decide(self, text):
+        moods, english = self.lexicon_moods(text)
+        language = 'en' if english or self._english.search(text) else 'id'
+
+        if not moods:
+            return RouteDecision(None, 0.0, language, 'no_mood')
+        if len(moods) > 1:
+            return RouteDecision(None, 0.0, language, 'mixed_moods')
+        if len(text.split()) > self.max_words:
+            return RouteDecision(None, 0.0, language, 'too_long')
+        if self._negations.search(text):
+            return RouteDecision(None, 0.0, language, 'negation')
+        if self._contrasts.search(text):
+            return RouteDecision(None, 0.0, language, 'contrast')
+        if self._slots.search(text):
+            return RouteDecision(None, 0.0, language, 'slot')
+
+        mood = moods.pop()
+        label, confidence = self.predict(text)
+        if label != mood:
+            return RouteDecision(None, confidence, language, 'disagree')
+        if confidence < self.threshold:
+            return RouteDecision(None, confidence, language, 'low_confidence')
+        return RouteDecision(mood, confidence, language, 'local')
+
+    def route(self, message):
+        """
+        Route one chat message
+
+        Args:
+            message (str): Raw user message
+
+        Returns:
+            RouteDecision: mood set when the message can be answered locally
+        """
+        decision = self._decide(normalize(message))
+        with self._lock:
+            self.routed[decision.reason] += 1
+        return decision
+
+    def stats(self):
+        """
+        Routing counters since start-up
+
+        Returns:
+            dict: messages, local, llm, local_fraction and llm messages per reason
+        """
+        with self._lock:
+            routed = dict(self.routed)
+        messages = sum(routed.values())
+        local = routed.pop('local', 0)
+        return {
+            'messages': messages,
+            'local': local,
+            'llm': messages - local,
+            'local_fraction': local / messages if messages else 0.0,
+            'llm_reasons': routed,
+        }
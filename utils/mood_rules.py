@@ -0,0 +1,57 @@
+"""
+Mood Rules
+Rule-based mood classification from the valence/energy quadrants
+
+Shared by the music engine, the music chatbot and the Predict Mood tab
+whenever the trained mood model is not available.
+"""
+
+import numpy as np
+
+VALENCE_THRESHOLD = 0.5
+ENERGY_THRESHOLD = 0.5
+
+
+def classify_moods(valence, energy, valence_threshold=VALENCE_THRESHOLD, energy_threshold=ENERGY_THRESHOLD):
+    """
+    Classify many tracks at once
+
+    Happy = high valence + high energy, Sad = low + low,
+    Calm = high valence + low energy, anything else is Tense.
+
+    Args:
+        valence (array-like): Valence per track
+        energy (array-like): Energy per track
+        valence_threshold (float): Valence at or above this counts as high
+        energy_threshold (float): Energy at or above this counts as high
+
+    Returns:
+        ndarray: Mood label per track
+    """
+    v = np.asarray(valence, dtype=np.float64)
+    e = np.asarray(energy, dtype=np.float64)
+
+    high_v, low_v = v >= valence_threshold, v < valence_threshold
+    high_e, low_e = e >= energy_threshold, e < energy_threshold
+
+    return np.select(
+        [high_v & high_e, low_v & low_e, high_v & low_e],
+        ['Happy', 'Sad', 'Calm'],
+        default='Tense'
+    )
+
+
+def classify_mood(valence, energy, valence_threshold=VALENCE_THRESHOLD, energy_threshold=ENERGY_THRESHOLD):
+    """
+    Classify a single track
+
+    Args:
+        valence (float): Track valence
+        energy (float): Track energy
+        valence_threshold (float): Valence at or above this counts as high
+        energy_threshold (float): Energy at or above this counts as high
+
+    Returns:
+        str: Mood label
+    """
+    return str(classify_moods([valence], [energy], valence_threshold, energy_threshold)[0])
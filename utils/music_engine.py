@@ -8,19 +8,30 @@ import pandas as pd
 import numpy as np
 import joblib
 import os
-import streamlit as st
+
+from utils.music_index import MoodGenreIndex
+from utils.mood_rules import ENERGY_THRESHOLD, VALENCE_THRESHOLD, classify_moods
+from utils.music_snapshot import DEFAULT_SNAPSHOT_DIR, read_snapshot, source_key
 
 class MusicRecommendationEngine:
-    def __init__(self):
+    def __init__(self, use_snapshot=True, valence_threshold=VALENCE_THRESHOLD, energy_threshold=ENERGY_THRESHOLD):
         self.df = None
         self.model = None
         self.label_encoder = None
         self.genres = []
         self.moods = ['Happy', 'Sad', 'Calm', 'Tense']
+        self.use_snapshot = use_snapshot
+        self.valence_threshold = valence_threshold
+        self.energy_threshold = energy_threshold
+        self.data_version = None
+        self.revision = 0
+        self.loaded_from_snapshot = False
+        self.index = None
+        self._track_keys = None
+        self._rng = np.random.default_rng()
         self._load_data()
 
-    @st.cache_resource
-    def _load_data(_self):
+    def _load_data(self):
         try:
             # current_dir adalah folder 'utils'
             current_dir = os.path.dirname(__file__)
@@ -28,56 +39,166 @@ class MusicRecommendationEngine:
             # Keluar dari utils (..), masuk ke data/music
             data_dir = os.path.normpath(os.path.join(current_dir, "..", "data", "music"))
             dataset_path = os.path.join(data_dir, "dataset.csv")
+            model_path = os.path.join(data_dir, "music_mood_model.pkl")
+            encoder_path = os.path.join(data_dir, "label_encoder.pkl")
 
-            if not os.path.exists(dataset_path):
-                raise FileNotFoundError(f"File tidak ditemukan di: {dataset_path}")
+            # 1. LOAD MODEL & ENCODER (Lokasi sesuai struktur Anda)
+            try:
+                self.model = joblib.load(model_path)
+                self.label_encoder = joblib.load(encoder_path)
+            except:
+                self.model = None
+                self.label_encoder = None
 
-            raw_df = pd.read_csv(dataset_path)
+            # 2. SNAPSHOT KOLOMNAR (hasil `python -m utils.music_snapshot`)
+            # Snapshot dipakai jika hash CSV + model + threshold mood masih sama;
+            # tanpa CSV, snapshot apa pun dengan threshold yang sama diterima
+            has_csv = os.path.exists(dataset_path)
+            thresholds = (self.valence_threshold, self.energy_threshold)
+            self.data_version = source_key(dataset_path, model_path, encoder_path, thresholds=thresholds)
+            if self.use_snapshot:
+                self.df = read_snapshot(DEFAULT_SNAPSHOT_DIR, key=self.data_version if has_csv else None,
+                                         thresholds=thresholds)
+                self.loaded_from_snapshot = self.df is not None
 
-            # 1. DEDUPLIKASI GLOBAL (Penting: Nama + Artis harus unik)
-            # Menjamin lagu seperti 'La Bachata' hanya muncul 1x meski punya banyak genre
-            _self.df = (
-                raw_df.sort_values('popularity', ascending=False)
-                      .drop_duplicates(subset=['track_name', 'artists'], keep='first')
-                      .reset_index(drop=True)
-                      .copy()
-            )
+            if self.df is None:
+                if not has_csv:
+                    raise FileNotFoundError(f"File tidak ditemukan di: {dataset_path}")
+                self._load_from_csv(dataset_path)
+                if self.use_snapshot:
+                    print("Music snapshot missing or stale, run `python -m utils.music_snapshot`")
 
-            # 2. LOAD MODEL & ENCODER (Lokasi sesuai struktur Anda)
-            try:
-                model_path = os.path.join(data_dir, "music_mood_model.pkl")
-                encoder_path = os.path.join(data_dir, "label_encoder.pkl")
-                _self.model = joblib.load(model_path)
-                _self.label_encoder = joblib.load(encoder_path)
-            except:
-                _self.model = None
-                _self.label_encoder = None
+            # 3. LIST GENRE DARI DATA YANG SUDAH BERSIH
+            self.genres = sorted(self.df['track_genre'].unique().tolist())
 
-            # 3. PROSES MOOD
-            _self._add_mood_column()
-            
-            # 4. LIST GENRE DARI DATA YANG SUDAH BERSIH
-            _self.genres = sorted(_self.df['track_genre'].unique().tolist())
+            # 4. INDEX MOOD/GENRE -> POSISI BARIS (dibangun sekali)
+            self.index = MoodGenreIndex(self.df['mood'], self.df['track_genre'])
             
         except Exception as e:
             raise RuntimeError(f"Gagal memuat data. Error: {e}")
 
-    def _classify_mood_rule_based(self, row):
-        v, e = row['valence'], row['energy']
-        if v >= 0.5 and e >= 0.5: return 'Happy'
-        elif v < 0.5 and e < 0.5: return 'Sad'
-        elif v >= 0.5 and e < 0.5: return 'Calm'
-        else: return 'Tense'
+    def _load_from_csv(self, dataset_path):
+        raw_df = pd.read_csv(dataset_path)
 
-    def _add_mood_column(self):
+        # DEDUPLIKASI GLOBAL (Penting: Nama + Artis harus unik)
+        # Menjamin lagu seperti 'La Bachata' hanya muncul 1x meski punya banyak genre
+        self.df = (
+            raw_df.sort_values('popularity', ascending=False)
+                  .drop_duplicates(subset=['track_name', 'artists'], keep='first')
+                  .reset_index(drop=True)
+                  .copy()
+        )
+
+        # PROSES MOOD
+        self._add_mood_column()
+
+    def _classify_mood_rule_based(self, df):
+        # Kuadran valence/energy dihitung sekaligus untuk semua baris (tanpa apply per baris)
+        return classify_moods(df['valence'], df['energy'], self.valence_threshold, self.energy_threshold)
+
+    def _predict_moods(self, df):
         if self.model and self.label_encoder:
             try:
                 features = ['danceability', 'energy', 'valence', 'tempo', 
                             'acousticness', 'instrumentalness', 'loudness', 'speechiness']
-                self.df['mood'] = self.label_encoder.inverse_transform(self.model.predict(self.df[features]))
-                return
+                return self.label_encoder.inverse_transform(self.model.predict(df[features]))
             except: pass
-        self.df['mood'] = self.df.apply(self._classify_mood_rule_based, axis=1)
+        return self._classify_mood_rule_based(df)
+
+    def _add_mood_column(self):
+        self.df['mood'] = self._predict_moods(self.df)
+
+    # ===============================================================
+    # INGEST INKREMENTAL (TANPA RELOAD DATASET)
+    # ===============================================================
+
+    def add_tracks(self, new_rows):
+        """
+        Upsert a batch of tracks into the loaded catalogue
+
+        Tracks are unique on (track_name, artists); when a key already exists the
+        higher-popularity version is kept. Only new or replaced rows are mood
+        classified, and the mood/genre index is updated in place. revision is
+        incremented whenever the catalogue changes.
+
+        Args:
+            new_rows (DataFrame or list of dict): Tracks with the dataset columns
+
+        Returns:
+            dict: Number of tracks 'added', 'updated' and 'skipped'
+        """
+        batch = pd.DataFrame(new_rows)
+        if batch.empty:
+            return {'added': 0, 'updated': 0, 'skipped': 0}
+
+        # Dedup di dalam batch dulu (popularity tertinggi menang), sama seperti saat load
+        batch = (
+            batch.sort_values('popularity', ascending=False)
+                 .drop_duplicates(subset=['track_name', 'artists'], keep='first')
+                 .reset_index(drop=True)
+        )
+        batch = batch[[c for c in self.df.columns if c in batch.columns and c != 'mood']]
+
+        if self._track_keys is None:
+            self._track_keys = {key: pos for pos, key in enumerate(zip(self.df['track_name'], self.df['artists']))}
+
+        existing = np.array([self._track_keys.get(key, -1) for key in zip(batch['track_name'], batch['artists'])],
+                            dtype=np.int64)
+        is_new = existing < 0
+        is_better = ~is_new
+        is_better[~is_new] = (batch.loc[~is_new, 'popularity'].to_numpy()
+                              > self.df['popularity'].to_numpy()[existing[~is_new]])
+
+        changed = batch[is_new | is_better].copy()
+        changed['mood'] = self._predict_moods(changed)
+        self._add_categories(changed)
+
+        updates = changed[is_better[is_new | is_better]]
+        additions = changed[is_new[is_new | is_better]]
+
+        # Update: keluarkan dulu dari index lama, timpa baris, lalu daftarkan lagi
+        if not updates.empty:
+            positions = existing[is_better]
+            self.index.remove(positions, self.df['mood'].to_numpy()[positions],
+                              self.df['track_genre'].to_numpy()[positions])
+            for col in updates.columns:
+                self.df.loc[positions, col] = updates[col].astype(self.df[col].dtype).values
+            self.index.add(positions, updates['mood'], updates['track_genre'])
+
+        # Append: lagu baru ditempel di akhir
+        if not additions.empty:
+            start = len(self.df)
+            additions = additions.reindex(columns=self.df.columns)
+            for col in self.df.columns:
+                # Samakan dtype agar concat tidak meng-upcast kolom (mis. float32 -> float64)
+                try:
+                    additions[col] = additions[col].astype(self.df[col].dtype)
+                except (TypeError, ValueError):
+                    pass
+            self.df = pd.concat([self.df, additions], ignore_index=True)
+
+            positions = np.arange(start, len(self.df))
+            self.index.add(positions, additions['mood'], additions['track_genre'])
+            self._track_keys.update(zip(zip(additions['track_name'], additions['artists']), positions))
+
+        self.genres = sorted(set(self.genres) | set(changed['track_genre'].tolist()))
+        if not changed.empty:
+            # Rows may have been overwritten in place, so df identity/length is not enough
+            self.revision += 1
+
+        return {
+            'added': int(is_new.sum()),
+            'updated': int(is_better.sum()),
+            'skipped': int(len(batch) - is_new.sum() - is_better.sum()),
+        }
+
+    def _add_categories(self, batch):
+        # Kolom kategorikal (dari snapshot) harus mengenal nilai baru sebelum ditulis
+        for col in batch.columns:
+            if col in self.df and isinstance(self.df[col].dtype, pd.CategoricalDtype):
+                missing = pd.Index(batch[col].dropna().unique()).difference(self.df[col].cat.categories)
+                if len(missing):
+                    self.df[col] = self.df[col].cat.add_categories(missing)
 
     # ===============================================================
     # REKOMENDASI: ACAK TOTAL (TIDAK BOLEH PAKAI SORT DI AKHIR)
@@ -86,47 +207,42 @@ class MusicRecommendationEngine:
 
     def get_mood_distribution(self):
         """Menghitung jumlah lagu per mood untuk statistik dan Pie Chart"""
-        if self.df is not None:
-            return self.df['mood'].value_counts().to_dict()
+        if self.index is not None:
+            return self.index.mood_counts()
         return {mood: 0 for mood in self.moods}
 
     def get_genre_distribution(self, mood=None):
         """Menghitung distribusi genre untuk Bar Chart"""
-        df_to_use = self.df
+        if self.index is None:
+            return {}
         if mood and mood != "All Moods":
-            df_to_use = self.df[self.df['mood'] == mood]
-        
-        if df_to_use is not None:
-            # Mengambil 10 genre teratas agar grafik tidak berantakan
-            return df_to_use['track_genre'].value_counts().to_dict()
-        return {}
+            return self.index.genre_counts(mood)
+        return self.index.genre_counts()
 
     def get_mood_stats(self):
         """Menghitung rata-rata fitur audio per mood untuk Radar Chart"""
         if self.df is not None:
             features = ['danceability', 'energy', 'valence', 'acousticness', 'instrumentalness']
             # Mengelompokkan berdasarkan mood dan mengambil rata-rata fitur audionya
-            stats = self.df.groupby('mood')[features].mean()
+            stats = self.df.groupby('mood', observed=True)[features].mean()
             return stats
         return pd.DataFrame()
         
     def get_recommendations_by_mood(self, mood, n=10):
-        filtered = self.df[self.df['mood'] == mood].copy()
-        if filtered.empty: return pd.DataFrame()
-        
-        # Ambil n sampel secara acak dari seluruh dataset yang cocok
-        # random_state=None memastikan hasil berbeda setiap kali diklik
-        return filtered.sample(n=min(n, len(filtered)), random_state=None)[self._output_columns()]
+        # Ambil n posisi acak langsung dari index (tanpa mask + copy seluruh DataFrame)
+        # Generator tanpa seed memastikan hasil berbeda setiap kali diklik
+        return self._sample_rows(n, mood=mood)
 
     def get_recommendations_by_genre(self, genre, n=10):
-        filtered = self.df[self.df['track_genre'] == genre].copy()
-        if filtered.empty: return pd.DataFrame()
-        return filtered.sample(n=min(n, len(filtered)), random_state=None)[self._output_columns()]
+        return self._sample_rows(n, genre=genre)
 
     def get_recommendations_by_mood_and_genre(self, mood, genre, n=10):
-        filtered = self.df[(self.df['mood'] == mood) & (self.df['track_genre'] == genre)].copy()
-        if filtered.empty: return pd.DataFrame()
-        return filtered.sample(n=min(n, len(filtered)), random_state=None)[self._output_columns()]
+        return self._sample_rows(n, mood=mood, genre=genre)
+
+    def _sample_rows(self, n, mood=None, genre=None):
+        positions = self.index.sample(n, mood=mood, genre=genre, rng=self._rng)
+        if len(positions) == 0: return pd.DataFrame()
+        return self.df.iloc[positions][self._output_columns()]
 
     # ===============================================================
     # HELPERS
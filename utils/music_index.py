@@ -0,0 +1,124 @@
+"""
+Music Mood/Genre Index
+Inverted index from mood, genre and (mood, genre) to row positions
+
+Built once when the catalogue is loaded so recommendations can sample k rows
+directly instead of masking and copying the whole DataFrame on every click.
+"""
+
+import numpy as np
+import pandas as pd
+
+
+def _group_positions(keys, by):
+    """Map each key (or key tuple) to an int32 array of row positions"""
+    groups = keys.groupby(by, observed=True, sort=False).indices
+    return {key: np.asarray(pos, dtype=np.int32) for key, pos in groups.items()}
+
+
+class MoodGenreIndex:
+    """
+    Row positions per mood, per genre and per (mood, genre) pair
+    """
+
+    def __init__(self, moods, genres):
+        """
+        Build the index
+
+        Args:
+            moods (array-like): Mood label per row
+            genres (array-like): Genre label per row
+        """
+        keys = pd.DataFrame({'mood': np.asarray(moods, dtype=object), 'genre': np.asarray(genres, dtype=object)})
+        self.by_mood = _group_positions(keys, 'mood')
+        self.by_genre = _group_positions(keys, 'genre')
+        self.by_mood_genre = _group_positions(keys, ['mood', 'genre'])
+
+    def add(self, positions, moods, genres):
+        """
+        Register new rows without rebuilding the index
+
+        Args:
+            positions (array-like): Row positions of the new rows
+            moods (array-like): Mood label per new row
+            genres (array-like): Genre label per new row
+        """
+        self._update(positions, moods, genres, lambda old, new: np.concatenate([old, new]))
+
+    def remove(self, positions, moods, genres):
+        """
+        Unregister rows (e.g. before they are overwritten with new labels)
+
+        Args:
+            positions (array-like): Row positions to drop
+            moods (array-like): Mood label the rows were indexed under
+            genres (array-like): Genre label the rows were indexed under
+        """
+        self._update(positions, moods, genres, lambda old, gone: np.setdiff1d(old, gone, assume_unique=True))
+
+    def _update(self, positions, moods, genres, merge):
+        keys = pd.DataFrame({
+            'mood': np.asarray(moods, dtype=object),
+            'genre': np.asarray(genres, dtype=object),
+            'pos': np.asarray(positions, dtype=np.int32),
+        })
+        for groups, by in ((self.by_mood, 'mood'), (self.by_genre, 'genre'), (self.by_mood_genre, ['mood', 'genre'])):
+            for key, rows in keys.groupby(by, sort=False)['pos']:
+                key = key[0] if isinstance(key, tuple) and len(key) == 1 else key
+                old = groups.get(key, np.empty(0, dtype=np.int32))
+                groups[key] = merge(old, rows.to_numpy(dtype=np.int32)).astype(np.int32, copy=False)
+
+    def positions(self, mood=None, genre=None):
+        """
+        Row positions matching a mood and/or genre
+
+        Args:
+            mood (str, optional): Mood label
+            genre (str, optional): Genre label
+
+        Returns:
+            ndarray: Row positions (empty if nothing matches)
+        """
+        if mood is not None and genre is not None:
+            found = self.by_mood_genre.get((mood, genre))
+        elif mood is not None:
+            found = self.by_mood.get(mood)
+        elif genre is not None:
+            found = self.by_genre.get(genre)
+        else:
+            raise ValueError("mood or genre is required")
+        return found if found is not None else np.empty(0, dtype=np.int32)
+
+    def sample(self, n, mood=None, genre=None, rng=None):
+        """
+        Draw up to n distinct random row positions matching the filters
+
+        Args:
+            n (int): Number of rows
+            mood (str, optional): Mood label
+            genre (str, optional): Genre label
+            rng (Generator, optional): Random generator
+
+        Returns:
+            ndarray: Row positions in random order
+        """
+        positions = self.positions(mood, genre)
+        if len(positions) == 0:
+            return positions
+        rng = rng if rng is not None else np.random.default_rng()
+        return rng.choice(positions, size=min(n, len(positions)), replace=False)
+
+    def mood_counts(self):
+        """Number of rows per mood, largest first"""
+        return self._sorted_counts(self.by_mood)
+
+    def genre_counts(self, mood=None):
+        """Number of rows per genre (optionally within one mood), largest first"""
+        if mood is None:
+            return self._sorted_counts(self.by_genre)
+        return self._sorted_counts({g: pos for (m, g), pos in self.by_mood_genre.items() if m == mood})
+
+    @staticmethod
+    def _sorted_counts(groups):
+        counts = {key: len(pos) for key, pos in groups.items() if len(pos)}
+        return dict(sorted(counts.items(), key=lambda item: item[1], reverse=True))
@@ -0,0 +1,211 @@
+"""
+Music Dataset Snapshot
+Compiles the deduplicated, mood-labelled music table into a typed columnar bundle
+
+The snapshot lives in data/music/snapshot/ and is a raw NumPy bundle:
+    - <column>.npy            numeric columns with compact dtypes (memory-mapped on load)
+    - <column>.codes.npy      categorical codes for track_genre, mood and artists
+    - <column>.categories.txt NUL-separated category values
+    - <column>.txt            NUL-separated values for free-text string columns
+    - <column>.null.npy       missing-value mask of a string column that has any
+    - manifest.json           column layout, the source hash and the mood thresholds
+
+Compile it with:
+    python -m utils.music_snapshot [--force]
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import shutil
+
+import numpy as np
+import pandas as pd
+
+# Bump when the column layout or preprocessing changes
+SNAPSHOT_VERSION = 2
+
+DEFAULT_SNAPSHOT_DIR = os.path.normpath(
+    os.path.join(os.path.dirname(__file__), "..", "data", "music", "snapshot")
+)
+
+CATEGORICAL_COLUMNS = ['track_genre', 'mood', 'artists']
+STRING_COLUMNS = ['track_id', 'track_name', 'album_name']
+NUMERIC_DTYPES = {
+    'popularity': np.int16,
+    'duration_ms': np.int32,
+    'explicit': np.bool_,
+    'danceability': np.float32,
+    'energy': np.float32,
+    'key': np.int8,
+    'loudness': np.float32,
+    'mode': np.int8,
+    'speechiness': np.float32,
+    'acousticness': np.float32,
+    'instrumentalness': np.float32,
+    'liveness': np.float32,
+    'valence': np.float32,
+    'tempo': np.float32,
+    'time_signature': np.int8,
+}
+
+SEPARATOR = "\x00"
+
+
+def source_key(*paths, thresholds=None, chunk_size=1024 * 1024):
+    """
+    Content hash of the snapshot inputs (dataset, mood model and mood thresholds)
+
+    Args:
+        *paths (str): Input files; missing files are skipped
+        thresholds (tuple, optional): (valence, energy) thresholds of the rule-based moods
+
+    Returns:
+        str: Hex digest identifying the snapshot
+    """
+    digest = hashlib.sha256(f"music-snapshot-v{SNAPSHOT_VERSION}".encode())
+    if thresholds is not None:
+        digest.update(json.dumps([float(t) for t in thresholds]).encode())
+    for path in paths:
+        if not os.path.exists(path):
+            continue
+        digest.update(os.path.basename(path).encode())
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(chunk_size), b""):
+                digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _write_strings(path, values):
+    """Write a sequence of strings as one NUL-separated UTF-8 file"""
+    values = [str(v) for v in values]
+    if any(SEPARATOR in v for v in values):
+        raise ValueError(f"String column contains the separator character: {path}")
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(SEPARATOR.join(values))
+
+
+def _read_strings(path):
+    """Read strings written by _write_strings"""
+    with open(path, encoding="utf-8") as f:
+        text = f.read()
+    return text.split(SEPARATOR) if text else []
+
+
+def write_snapshot(df, key, snapshot_dir=DEFAULT_SNAPSHOT_DIR, thresholds=None):
+    """
+    Write the music table as a columnar snapshot
+
+    Args:
+        df (DataFrame): Deduplicated, mood-labelled music data
+        key (str): Source hash from source_key()
+        snapshot_dir (str): Target directory (replaced atomically)
+        thresholds (tuple, optional): (valence, energy) thresholds the moods were labelled with
+    """
+    tmp_dir = snapshot_dir + ".tmp"
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+    os.makedirs(tmp_dir)
+
+    columns = {}
+    nulls = []
+    for col in df.columns:
+        if col in CATEGORICAL_COLUMNS:
+            cat = df[col].astype('category')
+            np.save(os.path.join(tmp_dir, f"{col}.codes.npy"), cat.cat.codes.to_numpy(dtype=np.int32))
+            _write_strings(os.path.join(tmp_dir, f"{col}.categories.txt"), cat.cat.categories)
+            columns[col] = 'category'
+        elif col in NUMERIC_DTYPES:
+            np.save(os.path.join(tmp_dir, f"{col}.npy"), df[col].to_numpy(dtype=NUMERIC_DTYPES[col]))
+            columns[col] = np.dtype(NUMERIC_DTYPES[col]).name
+        elif col in STRING_COLUMNS:
+            # Missing values stay missing on load (as after read_csv): the
+            # text file holds '' in their place and the mask marks them
+            missing = df[col].isna().to_numpy()
+            _write_strings(os.path.join(tmp_dir, f"{col}.txt"), df[col].where(~missing, ''))
+            if missing.any():
+                np.save(os.path.join(tmp_dir, f"{col}.null.npy"), missing)
+                nulls.append(col)
+            columns[col] = 'string'
+        # Anything else (e.g. the CSV's unnamed index column) is not needed at runtime
+
+    # Manifest last, so a half-written snapshot is never picked up
+    with open(os.path.join(tmp_dir, "manifest.json"), "w") as f:
+        json.dump({
+            'key': key,
+            'version': SNAPSHOT_VERSION,
+            'rows': int(len(df)),
+            'thresholds': [float(t) for t in thresholds] if thresholds is not None else None,
+            'columns': columns,
+            'nulls': nulls,
+        }, f, indent=2)
+
+    shutil.rmtree(snapshot_dir, ignore_errors=True)
+    os.replace(tmp_dir, snapshot_dir)
+
+
+def read_snapshot(snapshot_dir=DEFAULT_SNAPSHOT_DIR, key=None, thresholds=None):
+    """
+    Load a columnar snapshot
+
+    Args:
+        snapshot_dir (str): Snapshot directory
+        key (str, optional): Expected source hash; None accepts any snapshot
+        thresholds (tuple, optional): Expected (valence, energy) mood thresholds;
+            checked even without a key, since moods labelled with other
+            thresholds are stale
+
+    Returns:
+        DataFrame or None: Music table, or None if missing or stale
+    """
+    manifest_path = os.path.join(snapshot_dir, "manifest.json")
+    if not os.path.exists(manifest_path):
+        return None
+    with open(manifest_path) as f:
+        manifest = json.load(f)
+    if manifest.get('version') != SNAPSHOT_VERSION:
+        return None
+    if key is not None and manifest.get('key') != key:
+        return None
+    if thresholds is not None and manifest.get('thresholds') != [float(t) for t in thresholds]:
+        return None
+
+    data = {}
+    nulls = set(manifest.get('nulls', []))
+    for col, kind in manifest['columns'].items():
+        if kind == 'category':
+            codes = np.load(os.path.join(snapshot_dir, f"{col}.codes.npy"), mmap_mode='r')
+            categories = _read_strings(os.path.join(snapshot_dir, f"{col}.categories.txt"))
+            data[col] = pd.Categorical.from_codes(codes, categories=categories)
+        elif kind == 'string':
+            values = np.array(_read_strings(os.path.join(snapshot_dir, f"{col}.txt")), dtype=object)
+            if col in nulls:
+                values[np.load(os.path.join(snapshot_dir, f"{col}.null.npy"))] = np.nan
+            data[col] = values
+        else:
+            data[col] = np.load(os.path.join(snapshot_dir, f"{col}.npy"), mmap_mode='r')
+
+    return pd.DataFrame(data)
+
+
+def main():
+    """Compile data/music/dataset.csv into the columnar snapshot"""
+    parser = argparse.ArgumentParser(description="Compile the music dataset snapshot")
+    parser.add_argument("--force", action="store_true", help="Recompile even if the snapshot is up to date")
+    args = parser.parse_args()
+
+    # Imported here to avoid a circular import with the engine
+    from utils.music_engine import MusicRecommendationEngine
+
+    engine = MusicRecommendationEngine(use_snapshot=not args.force)
+    if engine.loaded_from_snapshot:
+        print(f"Music snapshot already up to date: {engine.data_version[:16]}")
+        return
+
+    write_snapshot(engine.df, engine.data_version,
+                   thresholds=(engine.valence_threshold, engine.energy_threshold))
+    print(f"Music snapshot written: {len(engine.df)} tracks ({engine.data_version[:16]})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,201 @@
+"""
+Chat Response Cache
+Semantic LRU + TTL cache for complete chatbot turns
+
+Users keep sending near-identical messages ("rekomendasi musik energik",
+"rekomendasi musik energik dong"), and each one costs a full agent run. A
+cached entry holds the turn's tool calls, tool results and rendered answer.
+It is keyed on the normalized message and the conversation context, which is
+the tool calls the previous turn resolved to, so follow-ups like "yang lain
+dong" only match after an equivalent previous turn. The previous message's
+wording is left out, so a question repeated later in the same thread can hit.
+
+Lookups try the exact normalized message first. If that misses, they fall
+back to cosine similarity over hashed character n-grams, a local embedding
+that needs no fitting. A similar message only counts as a hit when it has the
+same content words, up to typos, and the same numbers as the cached one.
+"""
+
+import json
+import re
+import time
+from difflib import SequenceMatcher
+
+import numpy as np
+import scipy.sparse as sp
+from langchain_core.messages import HumanMessage
+from sklearn.feature_extraction.text import HashingVectorizer
+
+from utils.mood_intent import normalize
+from utils.result_cache import QueryCache
+
+# Words that do not change what a chat message asks for
+FILLER_WORDS = {
+    'dong', 'deh', 'ya', 'yah', 'nih', 'sih', 'kok', 'yuk', 'ayo', 'tolong', 'please', 'pls', 'plz',
+    'aku', 'saya', 'gue', 'gw', 'kamu', 'mau', 'ingin', 'pengen', 'pingin', 'minta', 'kasih', 'berikan',
+    'yang', 'untuk', 'buat', 'ke', 'di', 'dan', 'itu', 'ini', 'apa', 'ada', 'bisa', 'coba', 'cariin',
+    'carikan', 'rekomendasikan', 'sarankan', 'the', 'a', 'an', 'some', 'me', 'can', 'could', 'you',
+    'give', 'show', 'find', 'i', 'want', 'need', 'for', 'to', 'of', 'any', 'recommend',
+}
+
+
+def content_tokens(text):
+    """Words of a normalized message that carry meaning (FILLER_WORDS removed)"""
+    return [token for token in text.split() if token not in FILLER_WORDS]
+
+
+def _has_match(token, candidates, ratio):
+    return token in candidates or any(SequenceMatcher(None, token, other).ratio() >= ratio for other in candidates)
+
+
+def same_content(a, b, ratio=0.8):
+    """
+    Whether two normalized messages ask for the same thing
+
+    Every content word must have a counterpart in the other message (typos
+    allowed down to ratio) and the numbers must be identical, so "film 2010"
+    never matches "film 2012" however close their n-grams are.
+    """
+    tokens_a, tokens_b = set(content_tokens(a)), set(content_tokens(b))
+    if re.findall(r"\d+", a) != re.findall(r"\d+", b):
+        return False
+    return (all(_has_match(t, tokens_b, ratio) for t in tokens_a)
+            and all(_has_match(t, tokens_a, ratio) for t in tokens_b))
+
+
+def tool_signature(messages):
+    """Resolved tool calls of a turn as a hashable, order-preserving tuple"""
+    return tuple(
+        (call["name"], json.dumps(call["args"], sort_keys=True, ensure_ascii=False))
+        for message in messages
+        for call in getattr(message, "tool_calls", None) or []
+    )
+
+
+def thread_context(messages):
+    """
+    Context a new turn is asked in: the tool calls of the previous turn
+
+    Two previous turns that asked the same thing in different words resolve to
+    the same calls, so they give the same context.
+
+    Args:
+        messages: Checkpointed messages of the thread so far
+
+    Returns:
+        tuple: () for a new thread, else ("turn", tool_signature of the previous turn)
+    """
+    for i in range(len(messages) - 1, -1, -1):
+        if isinstance(messages[i], HumanMessage):
+            return ("turn", tool_signature(messages[i + 1:]))
+    return ()
+
+
+class ResponseCache(QueryCache):
+    """
+    QueryCache of chat turns with a similarity fallback for near-identical messages
+
+    Keys are (context, normalized message) pairs; values are whatever the
+    chatbot stores for the turn (its messages and reply dict).
+    """
+
+    def __init__(self, maxsize=256, ttl=600.0, threshold=0.85, n_features=2 ** 18):
+        """
+        Args:
+            maxsize (int): Maximum number of cached turns (least recently used evicted first)
+            ttl (float): Seconds a turn stays valid (None = no expiry)
+            threshold (float): Minimum cosine similarity for a near-identical hit
+            n_features (int): Hashed n-gram dimensions of the embedding
+        """
+        super().__init__(maxsize=maxsize, ttl=ttl)
+        self.threshold = threshold
+        self.embedder = HashingVectorizer(analyzer='char_wb', ngram_range=(3, 5), n_features=n_features,
+                                          alternate_sign=False, norm='l2')
+        self.similar_hits = 0
+
+    def embed(self, text):
+        """L2-normalized hashed n-grams of a normalized message's content words"""
+        return self.embedder.transform([" ".join(content_tokens(text))])
+
+    @staticmethod
+    def _similarities(vectors, query):
+        """Cosine similarity of each stored vector to the query (rows stacked without sp.vstack overhead)"""
+        indptr = np.zeros(len(vectors) + 1, dtype=np.int64)
+        np.cumsum([v.nnz for v in vectors], out=indptr[1:])
+        matrix = sp.csr_matrix((np.concatenate([v.data for v in vectors]),
+                                np.concatenate([v.indices for v in vectors]), indptr),
+                               shape=(len(vectors), query.shape[1]))
+        return (matrix @ query.T).toarray().ravel()
+
+    def lookup(self, message, context=(), version=None):
+        """
+        Cached turn for a message
+
+        Args:
+            message (str): User message (normalized here)
+            context (hashable): Conversation context the turn was produced in
+            version (hashable, optional): Current data version
+
+        Returns:
+            The stored value, or None on a miss
+        """
+        text = normalize(message)
+        vector = self.embed(text)
+        now = time.monotonic()
+
+        with self._lock:
+            self._check_version(version)
+
+            entry = self._entries.get((context, text))
+            if entry is not None and (entry[0] is None or entry[0] > now):
+                self._entries.move_to_end((context, text))
+                self.hits += 1
+                return entry[1]['value']
+
+            # Near-identical messages in the same context
+            candidates = []
+            for key, (expires, record) in list(self._entries.items()):
+                if expires is not None and expires <= now:
+                    del self._entries[key]
+                elif key[0] == context:
+                    candidates.append((key, record))
+
+            if candidates:
+                similarities = self._similarities([record['vector'] for _, record in candidates], vector)
+                for i in similarities.argsort()[::-1]:
+                    if similarities[i] < self.threshold:
+                        break
+                    key, record = candidates[i]
+                    if same_content(text, key[1]):
+                        self._entries.move_to_end(key)
+                        self.hits += 1
+                        self.similar_hits += 1
+                        return record['value']
+
+            self.misses += 1
+            return None
+
+    def store(self, message, value, context=(), version=None):
+        """
+        Cache a completed turn
+
+        Args:
+            message (str): User message (normalized here)
+            value: What lookup() returns for this message
+            context (hashable): Conversation context the turn was produced in
+            version (hashable, optional): Current data version
+        """
+        text = normalize(message)
+        record = {'vector': self.embed(text), 'value': value}
+        self.put((context, text), record, version=version)
+
+    def stats(self):
+        """
+        Cache counters
+
+        Returns:
+            dict: QueryCache.stats() plus similar_hits (hits that were not exact)
+        """
+        stats = super().stats()
+        stats['similar_hits'] = self.similar_hits
+        return stats
@@ -0,0 +1,127 @@
+"""
+Query Result Cache
+Bounded LRU + TTL cache for engine query results
+
+The engines are shared across Streamlit sessions (st.cache_resource), so
+the cache is thread-safe. Every entry belongs to a data version: when the
+caller passes a different version the whole cache is dropped, so results
+never outlive the dataset they were computed from.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+
+
+class QueryCache:
+    """
+    Thread-safe LRU cache with per-entry time-to-live and hit/miss counters
+    """
+
+    def __init__(self, maxsize=256, ttl=600.0):
+        """
+        Args:
+            maxsize (int): Maximum number of entries (least recently used evicted first)
+            ttl (float): Seconds an entry stays valid (None = no expiry)
+        """
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.version = None
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def _check_version(self, version):
+        # Caller holds the lock
+        if version != self.version:
+            if self._entries:
+                self.invalidations += 1
+            self._entries.clear()
+            self.version = version
+
+    def get(self, key, version=None, default=None):
+        """
+        Cached value for a key
+
+        Args:
+            key (hashable): Normalized query key
+            version (hashable, optional): Current data version
+            default: Returned on a miss
+
+        Returns:
+            Cached value, or default on a miss or expired entry
+        """
+        now = time.monotonic()
+        with self._lock:
+            self._check_version(version)
+            entry = self._entries.get(key)
+            if entry is not None and (entry[0] is None or entry[0] > now):
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+            if entry is not None:
+                del self._entries[key]
+            self.misses += 1
+            return default
+
+    def put(self, key, value, version=None):
+        """Store a value, evicting the least recently used entries if full"""
+        expires = time.monotonic() + self.ttl if self.ttl is not None else None
+        with self._lock:
+            self._check_version(version)
+            self._entries[key] = (expires, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def get_or_compute(self, key, compute, version=None):
+        """
+        Cached value for a key, computing and storing it on a miss
+
+        Args:
+            key (hashable): Normalized query key
+            compute (callable): Produces the value on a miss
+            version (hashable, optional): Current data version
+
+        Returns:
+            The cached or freshly computed value
+        """
+        missing = object()
+        value = self.get(key, version=version, default=missing)
+        if value is missing:
+            # Computed outside the lock; concurrent misses may both compute
+            value = compute()
+            self.put(key, value, version=version)
+        return value
+
+    def clear(self):
+        """Drop every entry (counters are kept)"""
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        """
+        Cache counters
+
+        Returns:
+            dict: size, maxsize, ttl, hits, misses, hit_rate, evictions, invalidations
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'size': len(self._entries),
+                'maxsize': self.maxsize,
+                'ttl': self.ttl,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': round(self.hits / lookups, 4) if lookups else 0.0,
+                'evictions': self.evictions,
+                'invalidations': self.invalidations,
+            }
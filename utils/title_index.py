@@ -0,0 +1,218 @@
+"""
+Film Title Index
+Prebuilt inverted index for title search
+
+Titles are ranked by rating once at build time and every posting list stores
+these ranks in ascending order, so intersecting postings yields matches that
+are already ordered by rating. Four lookups are supported:
+    - substring: character trigram postings, verified against the title
+    - token: normalized word postings (all words, any order)
+    - exact: case-insensitive full-title match
+    - fuzzy: typo-tolerant trigram overlap, re-ranked by edit similarity
+"""
+
+import re
+import time
+from difflib import SequenceMatcher
+
+import numpy as np
+
+GRAM_SIZE = 3
+
+
+def normalize_title(text):
+    """Lowercase and reduce a title to space-separated alphanumeric tokens"""
+    return re.sub(r"[^a-z0-9]+", " ", str(text).lower()).strip()
+
+
+def _grams(text, n=GRAM_SIZE):
+    return {text[i:i + n] for i in range(len(text) - n + 1)}
+
+
+class _Postings:
+    """Key -> sorted int32 rank array, stored CSR-style in one flat array"""
+
+    def __init__(self, keys_per_rank):
+        buckets = {}
+        for rank, keys in enumerate(keys_per_rank):
+            for key in keys:
+                buckets.setdefault(key, []).append(rank)
+
+        self.slices = {}
+        values = []
+        offset = 0
+        for key, ranks in buckets.items():
+            self.slices[key] = (offset, offset + len(ranks))
+            values.extend(ranks)
+            offset += len(ranks)
+        self.values = np.asarray(values, dtype=np.int32)
+
+    def get(self, key):
+        bounds = self.slices.get(key)
+        if bounds is None:
+            return None
+        return self.values[bounds[0]:bounds[1]]
+
+    def intersect(self, keys):
+        """Ranks present under every key (empty if any key is unknown)"""
+        lists = [self.get(key) for key in keys]
+        if not lists or any(ranks is None for ranks in lists):
+            return np.empty(0, dtype=np.int32)
+        lists.sort(key=len)
+        result = lists[0]
+        for ranks in lists[1:]:
+            if len(result) == 0:
+                break
+            result = np.intersect1d(result, ranks, assume_unique=True)
+        return result
+
+
+class TitleIndex:
+    """
+    Rating-ranked title index over a film DataFrame
+    """
+
+    def __init__(self, titles, ratings):
+        """
+        Build the index
+
+        Args:
+            titles (array-like): Film title per row
+            ratings (array-like): Film rating per row (used for ranking)
+        """
+        ratings = np.asarray(ratings, dtype=np.float64)
+
+        # rank -> row position, best rating first (NaN last, ties keep row order)
+        self.order = np.argsort(np.where(np.isnan(ratings), np.inf, -ratings), kind='stable').astype(np.int32)
+
+        titles = [str(t) for t in titles]
+        self._lower = [titles[row].lower() for row in self.order]
+        normalized = [normalize_title(t) for t in self._lower]
+
+        self._grams = _Postings(_grams(t) for t in self._lower)
+        self._tokens = _Postings(set(t.split()) for t in normalized)
+        self._exact = _Postings([t] for t in self._lower)
+
+        # Fuzzy lookup works on padded normalized titles so word edges count as grams
+        self._normalized = normalized
+        fuzzy_grams = [_grams(f" {t} ") for t in normalized]
+        self._fuzzy_gram_counts = np.array([len(g) for g in fuzzy_grams], dtype=np.int32)
+        self._fuzzy = _Postings(fuzzy_grams)
+
+    def __len__(self):
+        return len(self.order)
+
+    def search(self, query):
+        """
+        Case-insensitive substring search
+
+        Args:
+            query (str): Text that must appear in the title
+
+        Returns:
+            ndarray: Matching row positions, highest rating first
+        """
+        q = str(query).lower()
+        if not q:
+            return self.order
+
+        if len(q) < GRAM_SIZE:
+            # Too short for a trigram: scan the pre-sorted titles
+            ranks = [rank for rank, title in enumerate(self._lower) if q in title]
+        else:
+            candidates = self._grams.intersect(_grams(q))
+            ranks = [rank for rank in candidates if q in self._lower[rank]]
+        return self.order[np.asarray(ranks, dtype=np.int32)]
+
+    def search_tokens(self, query):
+        """
+        Titles containing every word of the query, in any order
+
+        Args:
+            query (str): Words to look for
+
+        Returns:
+            ndarray: Matching row positions, highest rating first
+        """
+        tokens = set(normalize_title(query).split())
+        if not tokens:
+            return np.empty(0, dtype=np.int32)
+        return self.order[self._tokens.intersect(tokens)]
+
+    def exact(self, title):
+        """
+        Case-insensitive exact title match
+
+        Args:
+            title (str): Full title
+
+        Returns:
+            ndarray: Matching row positions, highest rating first
+        """
+        ranks = self._exact.get(str(title).lower())
+        if ranks is None:
+            return np.empty(0, dtype=np.int32)
+        return self.order[ranks]
+
+    def fuzzy(self, query, limit=5, min_score=0.3, max_postings=20000, max_candidates=50, time_budget_ms=5.0):
+        """
+        Typo-tolerant title lookup with bounded work
+
+        Candidates are scored by trigram overlap (Dice coefficient) using at most
+        `max_postings` posting entries, rarest grams first. The best
+        `max_candidates` are re-ranked by edit similarity until the time budget
+        runs out; titles containing the query as a substring get a bonus.
+
+        Args:
+            query (str): Possibly misspelled title
+            limit (int): Number of matches to return
+            min_score (float): Minimum score (0-1) for a match
+            max_postings (int): Cap on posting entries scanned
+            max_candidates (int): Candidates re-ranked by edit similarity
+            time_budget_ms (float): Time allowed for re-ranking
+
+        Returns:
+            tuple: (row positions, scores), best match first
+        """
+        q = normalize_title(query)
+        empty = (np.empty(0, dtype=np.int32), np.empty(0, dtype=np.float32))
+        if not q:
+            return empty
+
+        # Rarest grams first; skip the rest once the posting budget is used up
+        lists = [p for p in (self._fuzzy.get(g) for g in _grams(f" {q} ")) if p is not None]
+        if not lists:
+            return empty
+        lists.sort(key=len)
+        budget, used = max_postings, []
+        for ranks in lists:
+            if used and len(ranks) > budget:
+                break
+            used.append(ranks)
+            budget -= len(ranks)
+
+        # Work is proportional to the postings scanned, not to the catalogue size
+        n_query_grams = len(_grams(f" {q} "))
+        candidates, overlap = np.unique(np.concatenate(used), return_counts=True)
+        dice = 2.0 * overlap / (n_query_grams + self._fuzzy_gram_counts[candidates])
+
+        if len(candidates) > max_candidates:
+            top = np.argpartition(-dice, max_candidates - 1)[:max_candidates]
+            candidates, dice = candidates[top], dice[top]
+
+        # Re-rank by edit similarity within the time budget (best trigram scores first)
+        order = np.argsort(-dice, kind='stable')
+        candidates, scores = candidates[order], dice[order].copy()
+        deadline = time.perf_counter() + time_budget_ms / 1000.0
+        for i, rank in enumerate(candidates):
+            title = self._normalized[rank]
+            ratio = SequenceMatcher(None, q, title).ratio()
+            bonus = 0.2 if q in title else 0.0
+            scores[i] = min(1.0, max(scores[i], ratio) + bonus)
+            if time.perf_counter() > deadline:
+                break
+
+        # Best score first; ties keep rating order (lower rank = higher rating)
+        best = np.lexsort((candidates, -scores))
+        best = best[scores[best] >= min_score][:limit]
+        return self.order[candidates[best]], scores[best].astype(np.float32)
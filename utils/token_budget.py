@@ -0,0 +1,236 @@
+"""
+Token Budget
+Prompt-size control for the chatbots' LangGraph agent loop
+
+Every agent step sends the system prompt, the thread history and the tool
+results so far. TokenBudget keeps that prompt small in three ways:
+
+- Tool payloads: the tools return (content, artifact) pairs. The content the
+  model reads is a compact JSON projection holding only the fields the
+  prompt's output format uses. The full result stays on ToolMessage.artifact
+  for the UI (see chat_stream.tool_content).
+- History: older turns inside the max_turns window are left out of the prompt
+  once they exceed max_history_tokens. The current turn is always sent whole,
+  and nothing is removed from the checkpointed thread.
+- System prompt: decoration lines (==== rules) are dropped.
+
+Each LLM call is counted twice with count_tokens_approximately (about four
+characters per token, no tokenizer download): the prompt that was sent, and
+the baseline prompt the agent would have sent without the budget (full
+payloads, full window, original system prompt). Input tokens reported by the
+provider (usage_metadata) are added when the model returns them.
+"""
+
+import json
+import re
+import threading
+
+import numpy as np
+from langchain_core.messages import HumanMessage, SystemMessage, ToolMessage
+from langchain_core.messages.utils import count_tokens_approximately
+
+DEFAULT_HISTORY_TOKENS = 2000
+
+# Lines that only draw a rule ("=====", "-----")
+_RULE_LINE = re.compile(r"^[ \t]*([=\-_*#~])\1{4,}[ \t]*\n", re.MULTILINE)
+
+
+def _plain(value):
+    """JSON-friendly scalar: numpy values unwrapped, whole floats as ints"""
+    if isinstance(value, np.generic):
+        value = value.item()
+    if isinstance(value, float) and value.is_integer():
+        return int(value)
+    return value
+
+
+def compact_json(value):
+    """JSON without padding whitespace (numpy values allowed)"""
+    return json.dumps(value, ensure_ascii=False, separators=(",", ":"),
+                      default=lambda o: o.tolist() if hasattr(o, "tolist") else str(o))
+
+
+def truncate(text, max_chars):
+    """Shorten a string to max_chars at a word boundary, marking the cut with an ellipsis"""
+    if not isinstance(text, str) or max_chars is None or len(text) <= max_chars:
+        return text
+    return text[:max_chars].rsplit(" ", 1)[0].rstrip(" ,;") + "…"
+
+
+def project(record, fields, max_chars=None):
+    """
+    Only the given fields of a tool record, in that order
+
+    Args:
+        record (dict): One tool result (e.g. a film or a song)
+        fields (list): Keys to keep; missing keys are skipped, an "error" key is always kept
+        max_chars (dict, optional): Per-field string length limits
+
+    Returns:
+        dict: The projected record
+    """
+    if "error" in record:
+        return {"error": record["error"]}
+    max_chars = max_chars or {}
+    return {key: truncate(_plain(record[key]), max_chars.get(key)) for key in fields if key in record}
+
+
+def tool_payload(result, projection):
+    """
+    (content, artifact) pair for a tool declared with response_format="content_and_artifact"
+
+    Args:
+        result: Full tool result
+        projection (callable): Maps the result to what the model needs to read
+
+    Returns:
+        tuple: (compact JSON of the projection, full result as plain JSON types,
+        which the checkpointer can store and the UI already expects)
+    """
+    return compact_json(projection(result)), json.loads(compact_json(result))
+
+
+def compact_prompt(text):
+    """System prompt without rule lines and repeated blank lines"""
+    text = _RULE_LINE.sub("", text)
+    return re.sub(r"\n{3,}", "\n\n", text)
+
+
+def count_tokens(messages):
+    """Approximate prompt tokens of a message list"""
+    return count_tokens_approximately(messages)
+
+
+def baseline_messages(messages):
+    """The messages as sent before the budget: tool results serialized whole"""
+    full = []
+    for message in messages:
+        if isinstance(message, ToolMessage) and message.artifact is not None:
+            message = message.model_copy(update={"content": json.dumps(message.artifact, ensure_ascii=False,
+                                                                       default=str)})
+        full.append(message)
+    return full
+
+
+def fit_history(messages, max_tokens=DEFAULT_HISTORY_TOKENS):
+    """
+    Newest turns of a conversation that fit in a token budget
+
+    The conversation is split at user messages; the current (last) turn is
+    always kept, older turns are added newest first while they fit.
+
+    Args:
+        messages: Conversation messages, oldest first (no system prompt)
+        max_tokens (int): Budget for the turns before the current one (None = no limit)
+
+    Returns:
+        list: A suffix of messages starting at a user message
+    """
+    starts = [i for i, message in enumerate(messages) if isinstance(message, HumanMessage)]
+    if max_tokens is None or len(starts) <= 1:
+        return list(messages)
+
+    keep = starts[-1]
+    used = 0
+    for start, end in zip(reversed(starts[:-1]), reversed(starts[1:])):
+        used += count_tokens(messages[start:end])
+        if used > max_tokens:
+            break
+        keep = start
+    return list(messages[keep:])
+
+
+def _empty_report():
+    return {'llm_calls': 0, 'prompt_tokens': 0, 'baseline_tokens': 0,
+            'reported_input_tokens': None, 'output_tokens': None}
+
+
+def _with_savings(counts):
+    saved = counts['baseline_tokens'] - counts['prompt_tokens']
+    counts['saved_tokens'] = saved
+    counts['saved_fraction'] = saved / counts['baseline_tokens'] if counts['baseline_tokens'] else 0.0
+    return counts
+
+
+class TokenBudget:
+    """
+    Builds budgeted prompts and reports the tokens they save
+
+    Thread-safe: the chatbots are shared across Streamlit sessions. Counts
+    are collected per thread while a turn runs and closed with end_turn().
+    """
+
+    def __init__(self, max_history_tokens=DEFAULT_HISTORY_TOKENS):
+        """
+        Args:
+            max_history_tokens (int): Tokens of earlier turns sent with each call (None = whole window)
+        """
+        self.max_history_tokens = max_history_tokens
+        self._lock = threading.Lock()
+        self._turns = {}
+        self.totals = {'turns': 0, 'llm_calls': 0, 'prompt_tokens': 0, 'baseline_tokens': 0}
+
+    def prompt(self, system_prompt, messages, thread_id=None):
+        """
+        Budgeted prompt for one LLM call, counted against its baseline
+
+        Args:
+            system_prompt (str): Full system prompt of this call
+            messages: Conversation messages in the max_turns window
+            thread_id (str, optional): Thread whose turn report the call is added to
+
+        Returns:
+            list: SystemMessage followed by the messages that fit the budget
+        """
+        prompt = [SystemMessage(content=compact_prompt(system_prompt))] + fit_history(messages, self.max_history_tokens)
+        baseline = [SystemMessage(content=system_prompt)] + baseline_messages(messages)
+        prompt_tokens, baseline_tokens = count_tokens(prompt), count_tokens(baseline)
+        with self._lock:
+            report = self._turns.setdefault(thread_id, _empty_report())
+            report['llm_calls'] += 1
+            report['prompt_tokens'] += prompt_tokens
+            report['baseline_tokens'] += baseline_tokens
+        return prompt
+
+    def record_usage(self, response, thread_id=None):
+        """Add the provider's input/output token counts of a response to the turn report"""
+        usage = getattr(response, "usage_metadata", None)
+        if not usage:
+            return
+        with self._lock:
+            report = self._turns.setdefault(thread_id, _empty_report())
+            report['reported_input_tokens'] = (report['reported_input_tokens'] or 0) + usage.get('input_tokens', 0)
+            report['output_tokens'] = (report['output_tokens'] or 0) + usage.get('output_tokens', 0)
+
+    def start_turn(self, thread_id=None):
+        """Forget counts left by an earlier turn of the thread that did not finish"""
+        with self._lock:
+            self._turns.pop(thread_id, None)
+
+    def end_turn(self, thread_id=None):
+        """
+        Close a thread's turn
+
+        Returns:
+            dict: llm_calls, prompt_tokens, baseline_tokens, saved_tokens,
+            saved_fraction, reported_input_tokens and output_tokens (None
+            when the model reports no usage)
+        """
+        with self._lock:
+            report = self._turns.pop(thread_id, None) or _empty_report()
+            self.totals['turns'] += 1
+            self.totals['llm_calls'] += report['llm_calls']
+            self.totals['prompt_tokens'] += report['prompt_tokens']
+            self.totals['baseline_tokens'] += report['baseline_tokens']
+        return _with_savings(report)
+
+    def stats(self):
+        """
+        Token counters of all agent turns since start-up
+
+        Returns:
+            dict: turns, llm_calls, prompt_tokens, baseline_tokens, saved_tokens and saved_fraction
+        """
+        with self._lock:
+            return _with_savings(dict(self.totals))
+